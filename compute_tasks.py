@@ -0,0 +1,251 @@
+# Dice_Tool/compute_tasks.py
+"""
+Worker-side task functions of the optimizer and the persistent worker pool.
+
+Process pools pickle a task by module and name, so a worker imports the module a task is
+defined in. Keeping the tasks here, next to the simulation modules only, means a worker
+never imports optimizer (pandas) or the UI; worker_pool preloads this module in its
+forkserver so new workers start with it already imported.
+"""
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from progress import ChannelLease, ProgressChannel
+from simulation_core import SimParams, run_many_trials, run_until_precision, set_worker_progress, worker_progress
+from sim_stats import BOOTSTRAP_METRICS, summarize_trials, bootstrap_cis, scale_trials
+
+try:
+    from shm_results import write_combo
+    _HAS_SHARED = True
+except Exception:
+    _HAS_SHARED = False
+
+try:
+    from vector_engine import run_lockstep
+    from fixed_point import run_fixed
+    _LOCKSTEP = {"vector": run_lockstep, "fixed": run_fixed}
+except Exception:
+    _LOCKSTEP = {}
+
+# rows of at least this many trials always get bootstrap intervals; below it only when the
+# combo's options ask for them (screening rungs of a time-budgeted run do not)
+CI_MIN_TRIALS = 50
+
+_progress_slots: Sequence[ProgressChannel] = ()
+
+
+def init_worker(slots: Sequence[ProgressChannel]) -> None:
+    """Persistent pool initializer: keeps the pool's progress channels, one per leased slot."""
+    global _progress_slots
+    _progress_slots = slots
+
+
+def run_in_slot(slot: Optional[int], lease: int, fn: Callable, *args):
+    """
+    Runs fn(*args) with rounds reported to progress slot `slot` (None: not reported) for as
+    long as the slot is still on lease `lease` (see ChannelLease).
+    """
+    set_worker_progress(ChannelLease(_progress_slots[slot], lease) if slot is not None else None)
+    try:
+        return fn(*args)
+    finally:
+        set_worker_progress(None)
+
+
+def _stop_event():
+    """Stop flag of the run this worker reports to (the channel's or lease's stop_event), or None."""
+    channel = worker_progress()
+    return channel.stop_event if channel is not None else None
+
+
+def worker_info() -> Tuple[int, Optional[int], float]:
+    """(pid, resident set size in bytes or None, time.time()) of the calling worker."""
+    return os.getpid(), rss_bytes(), time.time()
+
+
+def rss_bytes() -> Optional[int]:
+    """Resident memory of this process (Linux /proc, otherwise peak RSS from resource), or None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except Exception:
+        return None
+
+
+def _combo_params(args) -> SimParams:
+    (bet_div, profit_mult, w, l, buffer, starting_balance, n_trials, opts) = args
+    return SimParams(starting_balance, bet_div, profit_mult, w, l, buffer, n_trials,
+                     max_rounds=opts.get("max_rounds", 0), max_cycles=opts.get("max_cycles", 0),
+                     max_seconds=opts.get("max_seconds", 0.0),
+                     min_bet=opts.get("min_bet", 0.0), bet_decimals=opts.get("bet_decimals"))
+
+
+def _point_of(args) -> Tuple:
+    """A combo without its starting balance: combos of the same point can share one run."""
+    return tuple(args[:5]) + (args[6],)
+
+
+def _run_one_combo(args, reuse: Optional[Dict] = None):
+    """
+    Row of one combo. With a `reuse` dict shared by the combos of a batch, the trials of a
+    scale-invariant combo are kept by point, and later combos of that point at another
+    starting balance are rescaled from them instead of simulated again.
+    """
+    params = _combo_params(args)
+    opts = args[-1]
+    if opts.get("ci_width", 0) > 0:
+        results = run_until_precision(params, opts.get("ci_metric", "median_high"), opts["ci_width"],
+                                      stop_event=_stop_event(), parallel=False)
+        return _combo_row(args, results)
+    key = None
+    if reuse is not None and params.scale_invariant and params.starting_balance > 0:
+        key = _point_of(args)
+    if key is not None and key in reuse:
+        balance, base = reuse[key]
+        results = scale_trials(base, params.starting_balance / balance)
+    else:
+        results = run_many_trials(params, stop_event=_stop_event(), progress_callback=None, parallel=False)
+        if key is not None:
+            reuse[key] = (params.starting_balance, results)
+    return _combo_row(args, results)
+
+
+def _combo_row(args, results) -> Dict:
+    """
+    Optimizer result row of one combo from its trial results. The "±" columns are half widths
+    of the 95% bootstrap intervals of AvgHigh, CycleSuccess%, Bust% and Score (NaN when a
+    combo has fewer than two trials, or fewer than CI_MIN_TRIALS and opts["ci"] is False).
+    """
+    (bet_div, profit_mult, w, l, buffer, starting_balance, n_trials, opts) = args
+    params = _combo_params(args)
+    st = summarize_trials(results)
+    avg_high, std_high = st["median_high"], st["std_high"]
+    score = (avg_high - starting_balance) / std_high if std_high != 0 else 0.0
+    if opts.get("ci", True) or st["trials"] >= CI_MIN_TRIALS:
+        ci = bootstrap_cis(results, starting_balance)
+        pm = {metric: round((hi - lo) / 2, 2) for metric, (lo, hi) in ci.items()}
+    else:
+        pm = dict.fromkeys(BOOTSTRAP_METRICS, float("nan"))
+    return {
+        "StartingBalance": round(float(starting_balance), 2),
+        "Trials": int(st["trials"]),
+        "BetDiv": round(float(bet_div), 2),
+        "ProfitMult": round(float(profit_mult), 2),
+        "W%": round(w * 100, 2),
+        "L": int(l),
+        "Buffer%": round((buffer - 1) * 100, 2),
+        "AvgHigh": round(avg_high, 2),
+        "AvgHigh±": pm["median_high"],
+        "StdDev": round(std_high, 2),
+        "MaxHigh": round(st["max_high"], 2),
+        "AvgCycles": round(st["avg_cycles"], 2),
+        "AvgRounds": round(st["avg_rounds"], 2),
+        "CycleSuccess%": round(st["cycle_success_rate"], 2),
+        "CycleSuccess%±": pm["cycle_success_rate"],
+        "Bust%": round(st["bust_rate"], 2),
+        "Bust%±": pm["bust_rate"],
+        "Score": round(score, 2),
+        "Score±": pm["score"],
+        "Censored%": round(st["censored_rate"], 2),
+        "Caps": params.caps_label(),
+    }
+
+
+def _run_combo_batch(combos: List[Tuple], handle=None, first_slot: int = 0) -> Tuple[float, List[Dict]]:
+    """
+    Worker task: evaluate a batch of combos. Returns (elapsed seconds, rows); with a shared
+    array handle the rows are written to slots first_slot.. and the returned list is empty.
+    A combo that raises gets a _failed_result row without failing the rest of the batch; when
+    the batch's lock-step pass raises, its combos are retried one by one.
+    Once the run's stop flag is set, trials end early and the combos not started yet get
+    _failed_result rows; the parent has stopped reading the batch by then.
+    """
+    start = time.perf_counter()
+    rows = []
+    stop = _stop_event()
+    try:
+        lockstep = _lockstep_rows(combos)
+    except Exception:
+        lockstep = None     # evaluate the combos one by one, so only the failing ones lose their rows
+    reuse: Dict = {}
+    for i, combo in enumerate(combos):
+        try:
+            if stop is not None and stop.is_set():
+                row = _failed_result(combo)
+            else:
+                row = lockstep[i] if lockstep else _run_one_combo(combo, reuse)
+        except Exception:
+            row = _failed_result(combo)
+        if handle is not None:
+            write_combo(handle, first_slot + i, row)
+        else:
+            rows.append(row)
+    return time.perf_counter() - start, rows
+
+
+def _lockstep_rows(combos: List[Tuple]) -> Optional[List[Dict]]:
+    """
+    Rows of a whole batch from one lock-step pass when the batch asks for the vector or
+    fixed-point engine (opts["engine"]), or None to run the combos one by one. Sequential
+    stopping (ci_width > 0) needs per-combo trial counts and always uses the scalar engine.
+    A scale-invariant batch runs each point once at the first combo's starting balance and
+    rescales it to the others; with a bet model (or fixed-point units) every starting balance
+    gets its own pass.
+    """
+    opts = combos[0][-1] if combos else {}
+    kernel = _LOCKSTEP.get(opts.get("engine"))
+    if kernel is None or opts.get("ci_width", 0) > 0:
+        return None
+    first = _combo_params(combos[0])
+    invariant = first.scale_invariant and opts["engine"] == "vector" and first.starting_balance > 0
+    groups: Dict = {}
+    for i, combo in enumerate(combos):
+        groups.setdefault(None if invariant else combo[5], []).append(i)
+    rows: List[Optional[Dict]] = [None] * len(combos)
+    for members in groups.values():
+        params = first if invariant else _combo_params(combos[members[0]])
+        points = list(dict.fromkeys(tuple(combos[i][:5]) for i in members))
+        by_point = dict(zip(points, kernel(params, points, worker_progress(), stop_event=_stop_event())))
+        for i in members:
+            results = by_point[tuple(combos[i][:5])]
+            if combos[i][5] != params.starting_balance:
+                results = scale_trials(results, combos[i][5] / params.starting_balance)
+            rows[i] = _combo_row(combos[i], results)
+    return rows
+
+
+def _failed_result(args=None) -> Dict:
+    """
+    Placeholder row reported for a combo whose worker raised: the combo's parameters (when
+    `args` is given, otherwise NaN) with zero trials, so it has every column of a real row.
+    """
+    nan = float("nan")
+    row = {
+        "StartingBalance": nan, "Trials": 0, "BetDiv": nan, "ProfitMult": nan, "W%": nan, "L": 0, "Buffer%": nan,
+        "AvgHigh": 0.0, "AvgHigh±": nan, "StdDev": 0.0, "MaxHigh": 0.0, "AvgCycles": 0.0,
+        "AvgRounds": 0.0, "CycleSuccess%": 0.0, "CycleSuccess%±": nan, "Bust%": 100.0,
+        "Bust%±": nan, "Score": 0.0, "Score±": nan, "Censored%": 0.0, "Caps": "none"
+    }
+    if args is not None:
+        (bet_div, profit_mult, w, l, buffer, starting_balance, n_trials, opts) = args
+        row.update({
+            "StartingBalance": round(float(starting_balance), 2),
+            "BetDiv": round(float(bet_div), 2),
+            "ProfitMult": round(float(profit_mult), 2),
+            "W%": round(w * 100, 2),
+            "L": int(l),
+            "Buffer%": round((buffer - 1) * 100, 2),
+        })
+        try:
+            row["Caps"] = _combo_params(args).caps_label()
+        except Exception:
+            pass
+    return row
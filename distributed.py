@@ -0,0 +1,425 @@
+# Dice_Tool/distributed.py
+"""
+Coordinator/worker mode for spreading optimizer sweeps over several machines.
+
+The coordinator (the GUI process) listens on a TCP port. Workers connect with
+`python distributed.py worker --host <coordinator> --port <port> --authkey <key>`,
+pull batches of combos, run them with the same `_run_combo_batch` the local pool
+uses (so the engine and bet model travel with every combo) and send the result rows
+back. Workers send heartbeats while they compute; a batch leased to a worker that
+disconnects or stops heartbeating is put back in the queue and handed to the next
+worker that asks for work.
+
+multiprocessing.connection unpickles what it receives, so the auth key is all that keeps
+other machines from running code in the coordinator. There is no default key (the app
+generates one per session with new_authkey) and the coordinator only listens on loopback
+unless another host is chosen.
+"""
+import os
+import sys
+import time
+import queue
+import secrets
+import argparse
+import threading
+import multiprocessing
+from collections import deque
+from itertools import count
+from multiprocessing.connection import Listener, Client
+from typing import Dict, List, Optional, Tuple, Iterable
+
+import pandas as pd
+
+from optimizer import OptParams, RowStream, _iter_combos
+from compute_tasks import _run_combo_batch
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 50555
+DEFAULT_BATCH_SIZE = 4
+HEARTBEAT_INTERVAL = 2.0
+HEARTBEAT_TIMEOUT = 15.0
+IDLE_POLL_SECONDS = 0.5
+RECONNECT_SECONDS = 2.0
+
+
+def new_authkey() -> str:
+    """A random auth key for one session."""
+    return secrets.token_hex(16)
+
+
+def unsupported_options(opt_params: OptParams) -> List[str]:
+    """Settings a distributed sweep cannot honour; a sweep with any of them is refused."""
+    problems = []
+    if opt_params.time_budget > 0:
+        problems.append("Time Budget (budgeted runs plan around the local pool)")
+    if opt_params.refine_levels > 0:
+        problems.append("Refine Levels (only the first sweep is distributed)")
+    return problems
+
+
+class WorkCoordinator:
+    """
+    Thread-safe bookkeeping for one distributed sweep.
+    Combos are drawn lazily from `combos`; every batch handed out is leased to a
+    worker until its results arrive. Leases of dead workers are requeued.
+    """
+
+    def __init__(self, combos: Iterable[Tuple], total: int, batch_size: int = DEFAULT_BATCH_SIZE,
+                 heartbeat_timeout: float = HEARTBEAT_TIMEOUT):
+        self.total = total
+        self.batch_size = max(1, batch_size)
+        self.heartbeat_timeout = heartbeat_timeout
+        self._source = iter(combos)
+        self._source_done = False
+        self._requeued: deque = deque()
+        self._leases: Dict[int, Tuple[str, List[Tuple]]] = {}
+        self._last_seen: Dict[str, float] = {}
+        self._batch_ids = count()
+        self._worker_ids = count(1)
+        self._lock = threading.Lock()
+        self.results: List[Dict] = []
+        self.requeued_batches = 0
+        self.stopped = False
+
+    def register(self, host: str) -> str:
+        with self._lock:
+            worker_id = f"{host}#{next(self._worker_ids)}"
+            self._last_seen[worker_id] = time.monotonic()
+            return worker_id
+
+    def heartbeat(self, worker_id: str) -> None:
+        with self._lock:
+            self._last_seen[worker_id] = time.monotonic()
+
+    def lease(self, worker_id: str) -> Optional[Tuple[int, List[Tuple]]]:
+        """Hand out the next batch, or None when nothing is available right now."""
+        with self._lock:
+            self._last_seen[worker_id] = time.monotonic()
+            if self.stopped:
+                return None
+            if self._requeued:
+                batch = self._requeued.popleft()
+            else:
+                batch = []
+                while not self._source_done and len(batch) < self.batch_size:
+                    try:
+                        batch.append(next(self._source))
+                    except StopIteration:
+                        self._source_done = True
+                if not batch:
+                    return None
+            batch_id = next(self._batch_ids)
+            self._leases[batch_id] = (worker_id, batch)
+            return batch_id, batch
+
+    def complete(self, worker_id: str, batch_id: int, rows: List[Dict]) -> int:
+        """Store results of a leased batch; late results of a requeued batch are dropped."""
+        with self._lock:
+            self._last_seen[worker_id] = time.monotonic()
+            lease = self._leases.get(batch_id)
+            if lease is None or lease[0] != worker_id:
+                return 0
+            del self._leases[batch_id]
+            self.results.extend(rows)
+            return len(rows)
+
+    def release_worker(self, worker_id: str) -> None:
+        """Requeue every batch still leased to `worker_id` (disconnect or timeout)."""
+        with self._lock:
+            self._last_seen.pop(worker_id, None)
+            self._requeue_locked(worker_id)
+
+    def reap(self) -> List[str]:
+        """Release workers whose last heartbeat is older than the timeout."""
+        now = time.monotonic()
+        with self._lock:
+            dead = [wid for wid, seen in self._last_seen.items() if now - seen > self.heartbeat_timeout]
+            for wid in dead:
+                del self._last_seen[wid]
+                self._requeue_locked(wid)
+            return dead
+
+    def _requeue_locked(self, worker_id: str) -> None:
+        for batch_id in [b for b, (wid, _) in self._leases.items() if wid == worker_id]:
+            _, batch = self._leases.pop(batch_id)
+            self._requeued.append(batch)
+            self.requeued_batches += 1
+
+    @property
+    def finished(self) -> bool:
+        with self._lock:
+            return self._source_done and not self._requeued and not self._leases
+
+    @property
+    def done_count(self) -> int:
+        with self._lock:
+            return len(self.results)
+
+    @property
+    def worker_count(self) -> int:
+        with self._lock:
+            return len(self._last_seen)
+
+
+class CoordinatorServer:
+    """Accepts worker connections and serves a WorkCoordinator over them, one thread per worker."""
+
+    def __init__(self, coordinator: WorkCoordinator, authkey: str, host: str = DEFAULT_HOST,
+                 port: int = DEFAULT_PORT):
+        if not authkey:
+            raise ValueError("an auth key is required")
+        self.coordinator = coordinator
+        self.authkey = authkey.encode()
+        self.listener = Listener((host, port), authkey=self.authkey)
+        self.address = self.listener.address
+        self._closing = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        threading.Thread(target=self._reap_loop, daemon=True).start()
+
+    def close(self) -> None:
+        if self._closing.is_set():
+            return
+        self._closing.set()
+        # Wake the blocking accept() with a throwaway connection, then close the socket.
+        try:
+            host, port = self.address
+            Client(("127.0.0.1" if host in ("0.0.0.0", "") else host, port), authkey=self.authkey).close()
+        except Exception:
+            pass
+        try:
+            self.listener.close()
+        except Exception:
+            pass
+
+    def _accept_loop(self) -> None:
+        while not self._closing.is_set():
+            try:
+                conn = self.listener.accept()
+            except Exception:
+                if self._closing.is_set():
+                    return
+                continue
+            if self._closing.is_set():
+                conn.close()
+                return
+            t = threading.Thread(target=self._serve_worker, args=(conn,), daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def _reap_loop(self) -> None:
+        while not self._closing.wait(HEARTBEAT_INTERVAL):
+            self.coordinator.reap()
+
+    def _serve_worker(self, conn) -> None:
+        coord = self.coordinator
+        worker_id = None
+        try:
+            msg = conn.recv()
+            if not msg or msg[0] != "hello":
+                return
+            worker_id = coord.register(str(msg[1]))
+            conn.send(("welcome", worker_id, HEARTBEAT_INTERVAL))
+            while not self._closing.is_set():
+                msg = conn.recv()
+                kind = msg[0]
+                if kind == "heartbeat":
+                    coord.heartbeat(worker_id)
+                elif kind == "pull":
+                    if coord.stopped or coord.finished:
+                        conn.send(("bye",))
+                        return
+                    lease = coord.lease(worker_id)
+                    if lease is None:
+                        conn.send(("wait", IDLE_POLL_SECONDS))
+                    else:
+                        conn.send(("batch", lease[0], lease[1]))
+                elif kind == "result":
+                    coord.complete(worker_id, msg[1], msg[2])
+                elif kind == "bye":
+                    return
+        except (EOFError, OSError):
+            pass
+        finally:
+            if worker_id is not None:
+                coord.release_worker(worker_id)
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+def optimize_parameters_distributed(opt_params: OptParams,
+                                    q: queue.Queue,
+                                    stop_event: threading.Event,
+                                    authkey: str = "",
+                                    host: str = DEFAULT_HOST,
+                                    port: int = DEFAULT_PORT,
+                                    batch_size: int = DEFAULT_BATCH_SIZE,
+                                    local_workers: int = 0) -> None:
+    """
+    Distributed counterpart of optimize_parameters_manual with the same queue protocol
+    ("progress", fraction) / ("done", DataFrame), plus ("status", text) updates.
+    local_workers > 0 also spawns that many worker processes on this machine, which
+    connect over loopback like any remote worker. A sweep without an auth key, or with
+    settings from unsupported_options, is refused with a status message.
+    """
+    problems = unsupported_options(opt_params)
+    if not authkey:
+        problems.append("an empty Auth Key")
+    if problems:
+        q.put(("status", f"Distributed sweep not started: it does not support {', '.join(problems)}"))
+        q.put(("done", pd.DataFrame()))
+        return
+    total = opt_params.combo_count()
+    if total == 0:
+        q.put(("done", pd.DataFrame()))
+        return
+
+    coordinator = WorkCoordinator(_iter_combos(opt_params), total, batch_size=batch_size)
+    try:
+        server = CoordinatorServer(coordinator, authkey, host, port)
+    except OSError as e:
+        q.put(("status", f"Could not listen on {host}:{port}: {e}"))
+        q.put(("done", pd.DataFrame()))
+        return
+    server.start()
+    local_host = "127.0.0.1" if host in ("0.0.0.0", "") else host
+    procs = spawn_local_workers(local_workers, local_host, port, authkey) if local_workers > 0 else []
+
+    last_done = -1
+    streamed = 0
+    stream = RowStream(q)
+    try:
+        while not coordinator.finished:
+            if stop_event.is_set():
+                coordinator.stopped = True
+                break
+            done = coordinator.done_count
+            if done != last_done:
+                last_done = done
+                new_rows = coordinator.results[streamed:done]
+                streamed += len(new_rows)
+                stream.extend(new_rows)
+                q.put(("progress", done / total))
+                q.put(("status", f"Distributed: {done}/{total} combos, {coordinator.worker_count} workers"))
+            time.sleep(0.2)
+    finally:
+        coordinator.stopped = True
+        server.close()
+        for p in procs:
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+
+    stream.extend(coordinator.results[streamed:])
+    stream.flush()
+    q.put(("progress", coordinator.done_count / total))
+    df = pd.DataFrame(coordinator.results)
+    if not df.empty:
+        df = df.sort_values(by=["Score"], ascending=[False]).reset_index(drop=True)
+    q.put(("done", df))
+
+
+def run_worker(host: str, port: int, authkey: str, persistent: bool = False) -> int:
+    """
+    Connect to a coordinator, run batches until it says bye, and return the number of combos run.
+    With persistent=True the worker keeps reconnecting so it can serve successive sweeps.
+    """
+    processed = 0
+    while True:
+        try:
+            conn = Client((host, port), authkey=authkey.encode())
+        except (OSError, EOFError):
+            if not persistent:
+                return processed
+            time.sleep(RECONNECT_SECONDS)
+            continue
+        send_lock = threading.Lock()
+        stop_beats = threading.Event()
+
+        def send(msg):
+            with send_lock:
+                conn.send(msg)
+
+        def beat(interval: float):
+            while not stop_beats.wait(interval):
+                try:
+                    send(("heartbeat",))
+                except Exception:
+                    return
+
+        try:
+            send(("hello", f"{os.uname().nodename if hasattr(os, 'uname') else 'worker'}:{os.getpid()}"))
+            welcome = conn.recv()
+            threading.Thread(target=beat, args=(welcome[2],), daemon=True).start()
+            while True:
+                send(("pull",))
+                reply = conn.recv()
+                if reply[0] == "bye":
+                    break
+                if reply[0] == "wait":
+                    time.sleep(reply[1])
+                    continue
+                _, batch_id, combos = reply
+                _, rows = _run_combo_batch(combos)
+                send(("result", batch_id, rows))
+                processed += len(rows)
+            try:
+                send(("bye",))
+            except Exception:
+                pass
+        except (OSError, EOFError):
+            pass
+        finally:
+            stop_beats.set()
+            try:
+                conn.close()
+            except Exception:
+                pass
+        if not persistent:
+            return processed
+        time.sleep(RECONNECT_SECONDS)
+
+
+def spawn_local_workers(n: int, host: str, port: int, authkey: str) -> List[multiprocessing.Process]:
+    """Start n worker processes on this machine (used for local testing and to add local cores)."""
+    procs = []
+    for _ in range(n):
+        p = multiprocessing.Process(target=run_worker, args=(host, port, authkey), daemon=True)
+        p.start()
+        procs.append(p)
+    return procs
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Dice Tools distributed optimizer worker")
+    sub = parser.add_subparsers(dest="command", required=True)
+    w = sub.add_parser("worker", help="connect to a coordinator and run combos")
+    w.add_argument("--host", required=True)
+    w.add_argument("--port", type=int, default=DEFAULT_PORT)
+    w.add_argument("--authkey", required=True, help="the Auth Key shown in the coordinator's Settings tab")
+    w.add_argument("--procs", type=int, default=os.cpu_count() or 1,
+                   help="number of worker processes to run on this host")
+    w.add_argument("--once", action="store_true", help="exit after the current sweep instead of reconnecting")
+    args = parser.parse_args(argv)
+
+    persistent = not args.once
+    procs = [multiprocessing.Process(target=run_worker, args=(args.host, args.port, args.authkey, persistent))
+             for _ in range(max(1, args.procs))]
+    for p in procs:
+        p.start()
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        for p in procs:
+            p.terminate()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,275 @@
+# Dice_Tool/engine_check.py
+"""
+Equivalence checks of the simulation engines against the reference run_compounded_trial.
+
+Every fast path must play the same game as the scalar engine. For each parameter set in CASES
+(defaults, aggressive and cautious bets, a cycle cap, 8-decimal and coarse bet models) the
+reference plays --trials seeded trials, and every engine in ENGINE_CHECKS is checked once:
+- exact: on the same seed, engines that share the reference's roll streams must reproduce it
+  trial for trial (highest balance, cycles, rounds and censoring, bit for bit). This covers
+  declarative strategies too: an equivalent rule set of the case, run through SimParams.strategy
+  and as the first row of a compiled table with two other rows.
+- distribution: engines that round differently (fixed-point) play an independent seed instead;
+  two-sample KS tests on highest balance and rounds, a chi-square test on cycles, and
+  overlapping 95% bootstrap intervals of median peak, Bust% and CycleSuccess%. A test fails
+  when p < --alpha; the seeds are fixed, so a run is reproducible
+The importance-sampling estimate of per-cycle failure (estimate_cycle_failure, with its own
+tilt choice and with a forced tilt) is z-tested against plain Monte Carlo of the same cycles.
+A case is started only when the slowest case so far would still fit into --budget seconds;
+the rest are reported as skipped, and a skipped case fails the run like a failed check.
+The exit status is 1 when any check fails or any case is skipped.
+
+    python engine_check.py [--budget 300] [--trials 100] [--alpha 0.001] [--engines vector,fixed]
+
+The whole matrix at the defaults takes about 80 s on one core, well inside the default budget.
+"""
+import argparse
+import math
+import sys
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from simulation_core import SimParams, estimate_cycle_failure, run_compounded_trial, run_many_trials
+from sim_stats import bootstrap_cis, chi2_2samp, ks_2samp, scale_trials, trial_columns
+from vector_engine import run_lockstep, run_table, run_trials_vectorized
+from fixed_point import run_trials_fixed
+from strategy import Rule, Strategy, compile_table
+
+RESCALE_FACTOR = 4.0        # a power of two: rescaled balances are exact in float
+CI_METRICS = ("median_high", "bust_rate", "cycle_success_rate")
+IS_REL_ERROR = 0.1          # relative standard error both failure estimates run to
+FORCED_TILT = 0.85          # exercises the reweighting even where the estimator picks plain MC
+
+
+@dataclass
+class Case:
+    """A parameter set of the check matrix (trials, seed and caps are set by the run)."""
+    name: str
+    params: SimParams
+
+
+CASES = [
+    Case("baseline", SimParams(20, 100, 1.5, 0.30, 4, 1.02, 0)),
+    Case("aggressive", SimParams(20, 30, 2.0, 0.50, 3, 1.25, 0)),
+    Case("cautious", SimParams(20, 500, 1.2, 0.10, 8, 1.00, 0)),
+    Case("cycle cap", SimParams(20, 100, 1.5, 0.30, 4, 1.02, 0, max_cycles=5)),
+    Case("8 decimals", SimParams(0.01, 100, 1.5, 0.30, 4, 1.02, 0, min_bet=1e-8, bet_decimals=8)),
+    Case("coarse bets", SimParams(5, 100, 1.5, 0.30, 4, 1.02, 0, min_bet=0.01, bet_decimals=2)),
+]
+
+
+def _scalar(params: SimParams):
+    return [run_compounded_trial(params, trial_index=i) for i in range(params.n_trials)]
+
+
+def _lockstep_batch(params: SimParams):
+    """The case as the first lane group of a three-combo pass (rolls shared with its neighbours)."""
+    combo = (params.bet_div, params.profit_mult, params.w, params.l, params.buffer)
+    neighbours = [(params.bet_div * 2, params.profit_mult, params.w, params.l, params.buffer),
+                  (params.bet_div, params.profit_mult, params.w, params.l + 1, params.buffer)]
+    return run_lockstep(params, [combo] + neighbours)[0]
+
+
+def _chunked(params: SimParams):
+    return run_many_trials(replace(params, engine="vector"), parallel=True, executor="thread")
+
+
+def _rescaled(params: SimParams):
+    big = replace(params, starting_balance=params.starting_balance * RESCALE_FACTOR)
+    return scale_trials(run_trials_vectorized(big), 1 / RESCALE_FACTOR)
+
+
+def equivalent_strategy(bet_div: float, profit_mult: float, w: float, l: int, buffer: float) -> Strategy:
+    """
+    The reverse martingale written with other rules than the reverse_martingale() preset: the
+    loss reset as "set 1 x base bet", plus rules that leave the bet unchanged (add 0, multiply
+    by 1). It must play exactly like the preset.
+    """
+    return Strategy(
+        name="equivalent",
+        multiplier=((1 + w) * l) * buffer,
+        bet_div=bet_div,
+        profit_mult=profit_mult,
+        rules=[Rule("win", "multiply", 1 + w), Rule("win", "add", 0.0),
+               Rule("loss", "multiply", 1.0), Rule("loss", "set", 1.0, streak=int(l), mode="every")],
+    )
+
+
+def _strategy(params: SimParams):
+    strategy = equivalent_strategy(params.bet_div, params.profit_mult, params.w, params.l, params.buffer)
+    return run_trials_vectorized(replace(params, strategy=strategy))
+
+
+def _table(params: SimParams):
+    """The equivalent strategy as the first row of a three-row table (values differ per row)."""
+    rows = [equivalent_strategy(params.bet_div, params.profit_mult, params.w, params.l, params.buffer),
+            equivalent_strategy(params.bet_div * 2, params.profit_mult, params.w, params.l, params.buffer),
+            equivalent_strategy(params.bet_div, params.profit_mult, params.w, params.l + 1, params.buffer)]
+    return run_table(params, compile_table(rows))[0]
+
+
+@dataclass
+class EngineCheck:
+    """An engine under test: how it runs a case, and whether it must match the reference exactly."""
+    run: Callable[[SimParams], object]
+    exact: bool = True
+    applies: Callable[[SimParams], bool] = lambda params: True
+
+
+ENGINE_CHECKS: Dict[str, EngineCheck] = {
+    "vector": EngineCheck(run_trials_vectorized),
+    "lockstep": EngineCheck(_lockstep_batch),
+    "chunked": EngineCheck(_chunked),
+    "rescaled": EngineCheck(_rescaled, applies=lambda params: params.scale_invariant),
+    "strategy": EngineCheck(_strategy),
+    "table": EngineCheck(_table),
+    # integer units round differently from float, so only the distribution has to match
+    "fixed": EngineCheck(run_trials_fixed, exact=False),
+}
+
+
+def compare_failure_estimate(params: SimParams, tilt, seed: int, alpha: float) -> Tuple[bool, str]:
+    """(passed, detail): z-test of estimate_cycle_failure(tilt) against plain Monte Carlo."""
+    est = estimate_cycle_failure(params, tilt=tilt, target_rel_error=IS_REL_ERROR, seed=seed)
+    plain = estimate_cycle_failure(params, tilt=1.0, target_rel_error=IS_REL_ERROR, seed=seed + 1)
+    se = math.hypot(est.std_error, plain.std_error)
+    z = abs(est.probability - plain.probability) / se if se > 0 else 0.0
+    p = math.erfc(z / math.sqrt(2))
+    detail = (f"{est.probability:.4f} (tilt {est.tilt:g}, ESS {est.ess_fraction:.2f}) vs "
+              f"plain {plain.probability:.4f}, p={p:.3f}")
+    return p >= alpha, detail
+
+
+# estimator checks: name -> tilt passed to estimate_cycle_failure (None: its own choice)
+ESTIMATOR_CHECKS: Dict[str, Optional[float]] = {
+    "importance": None,
+    "tilted": FORCED_TILT,
+}
+
+
+@dataclass
+class CheckResult:
+    case: str
+    engine: str
+    check: str                  # "exact", "distribution", "estimate" or "skipped"
+    passed: bool
+    detail: str
+
+    def describe(self) -> str:
+        status = "SKIP" if self.check == "skipped" else ("PASS" if self.passed else "FAIL")
+        return f"{status}  {self.case:<12} {self.engine:<9} {self.check:<12} {self.detail}"
+
+
+def compare_exact(reference, results) -> str:
+    """Empty when both runs hold identical trials, otherwise a description of the first difference."""
+    ref_cols, cols = trial_columns(reference), trial_columns(results)
+    if len(ref_cols[0]) != len(cols[0]):
+        return f"{len(cols[0])} trials instead of {len(ref_cols[0])}"
+    names = ("highest balance", "cycles", "rounds", "censored")
+    for i in range(len(ref_cols[0])):
+        for name, ref_col, col in zip(names, ref_cols, cols):
+            if ref_col[i] != col[i]:
+                return f"trial {i}: {name} {col[i]} instead of {ref_col[i]}"
+    return ""
+
+
+def compare_distribution(reference, results, starting_balance: float, alpha: float) -> Tuple[bool, str]:
+    """(passed, detail): KS, chi-square and interval-overlap tests of two independent runs."""
+    ref_high, ref_cycles, ref_rounds, _ = trial_columns(reference)
+    high, cycles, rounds, _ = trial_columns(results)
+    tests = [("peak KS", ks_2samp(ref_high, high)[1]),
+             ("rounds KS", ks_2samp(ref_rounds, rounds)[1]),
+             ("cycles chi2", chi2_2samp(ref_cycles, cycles)[1])]
+    failures = [f"{name} p={p:.2g}" for name, p in tests if p < alpha]
+    ref_ci = bootstrap_cis(reference, starting_balance)
+    ci = bootstrap_cis(results, starting_balance)
+    for metric in CI_METRICS:
+        (lo_a, hi_a), (lo_b, hi_b) = ref_ci[metric], ci[metric]
+        # NaN bounds (too few trials for an interval) compare False and count as overlapping
+        if lo_a > hi_b or lo_b > hi_a:
+            failures.append(f"{metric} CI [{lo_b:.3g}, {hi_b:.3g}] vs [{lo_a:.3g}, {hi_a:.3g}]")
+    if failures:
+        return False, ", ".join(failures)
+    return True, ", ".join(f"{name} p={p:.3f}" for name, p in tests) + ", CIs overlap"
+
+
+def run_checks(cases: List[Case], engines: List[str], trials: int, max_rounds: int, alpha: float,
+               budget: float, seed: str = "engine-check",
+               report: Optional[Callable[[CheckResult], None]] = None,
+               estimators: Sequence[str] = ()) -> List[CheckResult]:
+    """Runs the check matrix and returns one CheckResult per case and engine check."""
+    started = time.monotonic()
+    results: List[CheckResult] = []
+
+    def add(result: CheckResult) -> None:
+        results.append(result)
+        if report is not None:
+            report(result)
+
+    slowest = 0.0
+    for case in cases:
+        case_started = time.monotonic()
+        if case_started - started + slowest > budget:
+            add(CheckResult(case.name, "-", "skipped", False, "time budget used up (raise --budget)"))
+            continue
+        base = replace(case.params, n_trials=trials, max_rounds=max_rounds)
+        shared = replace(base, seed=f"{seed}/{case.name}")
+        independent = replace(base, seed=f"{seed}/{case.name}/independent")
+        reference = _scalar(shared)
+        for name in engines:
+            check = ENGINE_CHECKS[name]
+            if not check.applies(base):
+                continue
+            # a bit-for-bit match already implies the same distribution
+            if check.exact:
+                difference = compare_exact(reference, check.run(shared))
+                add(CheckResult(case.name, name, "exact", not difference,
+                                difference or f"{trials}/{trials} trials identical"))
+            else:
+                passed, detail = compare_distribution(reference, check.run(independent), base.starting_balance, alpha)
+                add(CheckResult(case.name, name, "distribution", passed, detail))
+        for name in estimators:
+            # the estimator plays unrounded cycles, so bet-model cases do not apply
+            if not base.scale_invariant:
+                continue
+            passed, detail = compare_failure_estimate(base, ESTIMATOR_CHECKS[name], sum(map(ord, case.name)), alpha)
+            add(CheckResult(case.name, name, "estimate", passed, detail))
+        slowest = max(slowest, time.monotonic() - case_started)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check the simulation engines against the scalar reference.")
+    parser.add_argument("--budget", type=float, default=300.0, help="seconds; no new case starts after this")
+    parser.add_argument("--trials", type=int, default=100, help="trials per case and engine")
+    parser.add_argument("--max-rounds", type=int, default=2000, help="round cap per trial")
+    parser.add_argument("--alpha", type=float, default=0.001, help="significance level of each test")
+    checks = list(ENGINE_CHECKS) + list(ESTIMATOR_CHECKS)
+    parser.add_argument("--engines", default=",".join(checks),
+                        help=f"comma-separated subset of {', '.join(checks)}")
+    parser.add_argument("--cases", default="", help="comma-separated case names (default: all)")
+    parser.add_argument("--seed", default="engine-check")
+    args = parser.parse_args(argv)
+
+    engines = [e.strip() for e in args.engines.split(",") if e.strip()]
+    unknown = [e for e in engines if e not in checks]
+    if unknown:
+        parser.error(f"unknown engine(s): {', '.join(unknown)}")
+    wanted = {c.strip() for c in args.cases.split(",") if c.strip()}
+    cases = [c for c in CASES if not wanted or c.name in wanted]
+
+    started = time.perf_counter()
+    results = run_checks(cases, [e for e in engines if e in ENGINE_CHECKS], args.trials, args.max_rounds,
+                         args.alpha, args.budget, args.seed, report=lambda r: print(r.describe(), flush=True),
+                         estimators=[e for e in engines if e in ESTIMATOR_CHECKS])
+    ran = [r for r in results if r.check != "skipped"]
+    failed = [r for r in ran if not r.passed]
+    skipped = len(results) - len(ran)
+    print(f"{len(ran) - len(failed)}/{len(ran)} checks passed, {skipped} case(s) skipped, "
+          f"{time.perf_counter() - started:.1f}s")
+    return 1 if failed or skipped else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+# Dice_Tool/fixed_point.py
+"""
+Fixed-point lock-step engine: balances and bets as int64 counts of the smallest currency unit.
+
+The float engines multiply bets by (1 + w) and add payouts in float64, so a long trial builds
+up rounding drift that depends on the order of operations. Sites settle at a fixed number of
+decimals; this engine does the same. Every amount is an integer number of units of
+10**-decimals (params.bet_decimals, or FIXED_DECIMALS micro-units when no bet model is set),
+and every product is rounded explicitly (params.rounding, see ROUNDING_MODES):
+- bet = balance / bet_div, payout = bet * (m - 1) and next bet = bet * (1 + w) use the rounding
+  mode; bets are never below the smallest bet (params.bet_unit, at least one unit)
+- profit targets are rounded up: a cycle ends when the balance really covers the target
+- a trial busts once the balance cannot cover the smallest bet
+Ratios (bet_div, profit_mult, m - 1, 1 + w) are held in millionths (RATIO_SCALE), and products
+are split as (q * den + r) * num / den so the intermediate values stay inside int64. Amounts
+are checked against that bound every step; once one gets close (a long winning run, or many
+decimals on a large balance) the amounts switch to Python integers, which cannot overflow but
+are several times slower.
+
+Lanes, roll streams and caps work exactly as in vector_engine.run_lockstep, so with params.seed
+set every lane reads the same rolls as the scalar engine's trial. With a bet model and floor
+rounding both follow the same rules, and compare_with_float finds the same path in nearly every
+trial; the rest is float drift on the float side (a balance of exactly 0.01 held as
+0.0099999999999 busts there). Without a bet model they differ only by the unit rounding.
+
+    python fixed_point.py --decimals 8 --trials 200     # compare with the float engine
+"""
+import argparse
+import secrets
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from progress import ProgressChannel
+from shm_results import TRIAL_DTYPE
+from simulation_core import SimParams
+from vector_engine import CHECK_STEPS, ROLL_BATCH, RollBuffer, run_lockstep
+
+FIXED_DECIMALS = 6           # micro-units when params.bet_decimals is not set
+RATIO_SCALE = 1_000_000      # ratios (bet_div, profit_mult, m - 1, 1 + w) in millionths
+_INT64_MAX = np.iinfo(np.int64).max
+_AMOUNTS = ("balance", "peak", "target", "base_bet", "current")   # state arrays in currency units
+
+ROUNDING_MODES = {
+    "floor": "Round down (as sites settle)",
+    "half_even": "Round half to even",
+    "half_up": "Round half up",
+}
+
+
+def unit_decimals(params: SimParams) -> int:
+    """Decimals of the engine's currency unit for `params`."""
+    return FIXED_DECIMALS if params.bet_decimals is None else int(params.bet_decimals)
+
+
+def to_units(amount: float, decimals: int) -> int:
+    """Amount in whole units of 10**-decimals (nearest unit)."""
+    return int(round(amount * 10 ** decimals))
+
+
+def muldiv(a: np.ndarray, num, den, rounding: str = "floor") -> np.ndarray:
+    """
+    a * num / den for a >= 0, rounded by `rounding` (or "ceil"); num / den may be arrays. `a` is
+    int64, or an object array of Python integers (see run_fixed), which divmod does not take.
+    """
+    if a.dtype == object:
+        q, r = a // den, a % den
+        hi, lo = (r * num) // den, (r * num) % den
+    else:
+        q, r = np.divmod(a, den)
+        hi, lo = np.divmod(r * num, den)
+    out = q * num + hi
+    if rounding == "floor":
+        return out
+    if rounding == "ceil":
+        return out + (lo > 0)
+    twice = 2 * lo
+    if rounding == "half_up":
+        return out + (twice >= den)
+    if rounding == "half_even":
+        return out + ((twice > den) | ((twice == den) & (out % 2 == 1)))
+    raise ValueError(f"Unknown rounding mode: {rounding}")
+
+
+def _ratio(values) -> np.ndarray:
+    return np.rint(np.asarray(values, dtype=np.float64) * RATIO_SCALE).astype(np.int64)
+
+
+def run_fixed(params: SimParams, combos: Sequence[Tuple[float, float, float, int, float]],
+              progress: Optional[ProgressChannel] = None, first_trial: int = 0,
+              stop_event: Optional[threading.Event] = None) -> List[np.ndarray]:
+    """
+    Fixed-point counterpart of vector_engine.run_lockstep: params.n_trials trials of every
+    (bet_div, profit_mult, w, l, buffer) combo, one TRIAL_DTYPE array per combo (highest
+    balances converted back to currency). Amounts are int64 while every one of them stays
+    below the bound at which muldiv's products still fit; past it they become Python integers.
+    """
+    if params.rounding not in ROUNDING_MODES:
+        raise ValueError(f"Unknown rounding mode: {params.rounding}")
+    n_rows, n_trials = len(combos), max(0, params.n_trials)
+    n = n_rows * n_trials
+    out = np.zeros(n, dtype=TRIAL_DTYPE)
+    if n == 0:
+        return [out[:0] for _ in range(n_rows)]
+
+    decimals = unit_decimals(params)
+    scale = 10 ** decimals
+    rounding = params.rounding
+    bet_div, profit_mult, w, l, buffer = (np.array([c[i] for c in combos], dtype=np.float64) for i in range(5))
+    m = (1 + w) * l * buffer
+    with np.errstate(divide="ignore"):
+        threshold = np.where(m == 0, 0.0, np.clip((1 - 0.01) / m, 0.0, 1.0)) * 100
+    ratios = {"bet_div": _ratio(bet_div), "profit_mult": _ratio(profit_mult),
+              "m1": _ratio(m - 1), "grow": _ratio(1 + w)}
+    if (ratios["bet_div"] <= 0).any():
+        raise ValueError("bet_div must be positive")
+    # the next step's muldiv products and sums (targets included) stay inside int64 while
+    # balances and bets are below this
+    max_num = max(RATIO_SCALE, *(int(ratios[k].max()) for k in ("profit_mult", "m1", "grow")),
+                  -(-RATIO_SCALE * RATIO_SCALE // int(ratios["bet_div"].min())))
+    limit = _INT64_MAX // max_num * RATIO_SCALE // 4
+    unit = max(1, int(np.ceil(params.min_bet * scale - 1e-9)))
+
+    row_of = np.repeat(np.arange(n_rows), n_trials)
+    start = to_units(params.starting_balance, decimals)
+    wide = start >= limit
+    balance = np.full(n, start, dtype=object if wide else np.int64)
+    s = {
+        "lane": np.arange(n), "trial": np.tile(np.arange(n_trials), n_rows),
+        "bet_div": ratios["bet_div"][row_of], "profit_mult": ratios["profit_mult"][row_of],
+        "m1": ratios["m1"][row_of], "grow": ratios["grow"][row_of],
+        "l": l.astype(np.int64)[row_of], "threshold": threshold[row_of],
+        "balance": balance, "peak": balance.copy(),
+        "cycles": np.zeros(n, dtype=np.int64), "rounds": np.zeros(n, dtype=np.int64),
+        "losses": np.zeros(n, dtype=np.int64), "pos": np.zeros(n, dtype=np.int64),
+    }
+    if start < unit:
+        _write_out(out, s, np.ones(n, dtype=bool), False, scale)
+        return [out[c * n_trials:(c + 1) * n_trials] for c in range(n_rows)]
+    s["base_bet"] = np.maximum(muldiv(balance, RATIO_SCALE, s["bet_div"], rounding), unit)
+    s["target"] = balance + muldiv(s["base_bet"], s["profit_mult"], RATIO_SCALE, "ceil")
+    s["current"] = s["base_bet"].copy()
+    if not wide and int(s["base_bet"].max()) >= limit:
+        s, wide = _widen(s), True
+
+    buf = RollBuffer(params.seed or secrets.token_hex(16), n_trials, first_trial)
+    max_rounds = params.max_rounds if params.max_rounds > 0 else None
+    deadline = time.monotonic() + params.max_seconds if params.max_seconds > 0 else None
+    unreported = 0
+    step = 0
+
+    while len(s["lane"]):
+        roll = buf.read(s["trial"], s["pos"])
+        s["pos"] += 1
+        s["rounds"] += 1
+        unreported += len(roll)
+
+        win = roll < s["threshold"]
+        current = s["current"]
+        payout = muldiv(current, s["m1"], RATIO_SCALE, rounding)
+        s["balance"] = np.where(win, s["balance"] + payout, s["balance"] - current)
+        losses = np.where(win, 0, s["losses"] + 1)
+        reset = losses >= s["l"]
+        s["losses"] = np.where(reset, 0, losses)
+        grown = np.maximum(muldiv(current, s["grow"], RATIO_SCALE, rounding), unit)
+        s["current"] = np.where(win, grown, np.where(reset, s["base_bet"], current))
+        np.maximum(s["peak"], s["balance"], out=s["peak"])
+
+        busted = s["balance"] < unit
+        censored = np.zeros(len(roll), dtype=bool)
+        hit = s["balance"] >= s["target"]
+        if hit.any():
+            s["cycles"] += hit
+            if params.max_cycles > 0:
+                capped = hit & (s["cycles"] >= params.max_cycles)
+                censored |= capped
+                hit &= ~capped
+            # next cycle: new base bet and target, and a fresh roll batch
+            next_bet = np.maximum(muldiv(s["balance"], RATIO_SCALE, s["bet_div"], rounding), unit)
+            s["base_bet"] = np.where(hit, next_bet, s["base_bet"])
+            next_target = s["balance"] + muldiv(s["base_bet"], s["profit_mult"], RATIO_SCALE, "ceil")
+            s["target"] = np.where(hit, next_target, s["target"])
+            s["current"] = np.where(hit, s["base_bet"], s["current"])
+            s["losses"] = np.where(hit, 0, s["losses"])
+            s["pos"] = np.where(hit, -(-s["pos"] // ROLL_BATCH) * ROLL_BATCH, s["pos"])
+        if max_rounds is not None:
+            censored |= ~busted & (s["rounds"] >= max_rounds)
+        if not wide and max(int(s["balance"].max()), int(s["current"].max()), int(s["base_bet"].max())) >= limit:
+            s, wide = _widen(s), True
+
+        step += 1
+        if step % CHECK_STEPS == 0:
+            if progress is not None:
+                progress.add_rounds(unreported)
+                unreported = 0
+            if deadline is not None and time.monotonic() >= deadline:
+                censored |= ~busted
+            if stop_event is not None and stop_event.is_set():
+                break
+
+        done = busted | censored
+        if done.any():
+            _write_out(out, s, busted, False, scale)
+            _write_out(out, s, censored & ~busted, True, scale)
+            keep = ~done
+            s = {k: v[keep] for k, v in s.items()}
+
+    if progress is not None and unreported:
+        progress.add_rounds(unreported)
+    parts = [out[c * n_trials:(c + 1) * n_trials] for c in range(n_rows)]
+    return [p if p["done"].all() else p[p["done"]] for p in parts]
+
+
+def _widen(s: dict) -> dict:
+    """The lane state with its amounts as object arrays of Python integers."""
+    return {k: v.astype(object) if k in _AMOUNTS else v for k, v in s.items()}
+
+
+def _write_out(out: np.ndarray, s: dict, mask: np.ndarray, censored: bool, scale: int) -> None:
+    if not mask.any():
+        return
+    lanes = s["lane"][mask]
+    out["highest_balance"][lanes] = s["peak"][mask] / scale
+    out["cycles"][lanes] = s["cycles"][mask]
+    out["rounds"][lanes] = s["rounds"][mask]
+    out["censored"][lanes] = censored
+    out["done"][lanes] = True
+
+
+def run_trials_fixed(params: SimParams, progress: Optional[ProgressChannel] = None,
+                     first_trial: int = 0, stop_event: Optional[threading.Event] = None) -> np.ndarray:
+    """params.n_trials trials of one parameter set (indices first_trial..) in one fixed-point pass."""
+    combo = (params.bet_div, params.profit_mult, params.w, params.l, params.buffer)
+    return run_fixed(params, [combo], progress, first_trial, stop_event)[0]
+
+
+@dataclass
+class FloatComparison:
+    """Trial-by-trial comparison of the fixed-point and float engines on the same rolls."""
+    trials: int
+    same_path: int                  # trials with identical rounds, cycles and censoring
+    max_abs_diff: float             # largest |highest balance difference| in currency
+    max_rel_diff: float             # ... relative to the float engine's highest balance
+    fixed_seconds: float
+    float_seconds: float
+
+    def describe(self) -> str:
+        return (f"{self.same_path}/{self.trials} trials on the same path, highest balance differs by "
+                f"at most {self.max_abs_diff:.3g} ({self.max_rel_diff:.3g} relative); "
+                f"fixed {self.fixed_seconds:.2f}s, float {self.float_seconds:.2f}s")
+
+
+def compare_with_float(params: SimParams,
+                       combos: Optional[Sequence[Tuple[float, float, float, int, float]]] = None) -> FloatComparison:
+    """
+    Runs `combos` (default: the reverse martingale of params' bet fields) through this engine and
+    through vector_engine on the same seeded rolls and compares every trial. With a bet model and
+    floor rounding both should take the same path; without one the float engine is exact and the
+    difference is the drift the unit rounding introduces.
+    """
+    if combos is None:
+        combos = [(params.bet_div, params.profit_mult, params.w, params.l, params.buffer)]
+    if not params.seed:
+        params = replace(params, seed=secrets.token_hex(16))
+    started = time.perf_counter()
+    fixed = np.concatenate(run_fixed(params, combos))
+    fixed_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    floating = np.concatenate(run_lockstep(params, combos))
+    float_seconds = time.perf_counter() - started
+    same = ((fixed["rounds"] == floating["rounds"]) & (fixed["cycles"] == floating["cycles"])
+            & (fixed["censored"] == floating["censored"]))
+    diff = np.abs(fixed["highest_balance"] - floating["highest_balance"])
+    rel = diff / np.maximum(np.abs(floating["highest_balance"]), 1e-300)
+    return FloatComparison(len(fixed), int(same.sum()), float(diff.max(initial=0.0)), float(rel.max(initial=0.0)),
+                           fixed_seconds, float_seconds)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare the fixed-point engine with the float engine.")
+    parser.add_argument("--balance", type=float, default=20.0)
+    parser.add_argument("--bet-div", type=float, default=100.0)
+    parser.add_argument("--profit-mult", type=float, default=1.5)
+    parser.add_argument("--w", type=float, default=30.0, help="win increase in percent")
+    parser.add_argument("--l", type=int, default=4)
+    parser.add_argument("--buffer", type=float, default=2.0, help="buffer in percent")
+    parser.add_argument("--trials", type=int, default=200)
+    parser.add_argument("--max-rounds", type=int, default=100000)
+    parser.add_argument("--decimals", type=int, default=None, help="bet decimals (default: exact float)")
+    parser.add_argument("--min-bet", type=float, default=0.0)
+    parser.add_argument("--rounding", choices=list(ROUNDING_MODES), default="floor")
+    parser.add_argument("--seed", default="fixed-point-check")
+    args = parser.parse_args(argv)
+    params = SimParams(args.balance, args.bet_div, args.profit_mult, args.w / 100.0, args.l,
+                       1 + args.buffer / 100.0, args.trials, max_rounds=args.max_rounds, seed=args.seed,
+                       min_bet=args.min_bet, bet_decimals=args.decimals, rounding=args.rounding)
+    print(compare_with_float(params).describe())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+# Dice_Tool/heatmap.py
+"""
+Pivot aggregation of optimizer rows for the Results tab's heatmap.
+
+A Pivot groups one metric by the values of two parameter columns (the axes) and keeps
+running per-cell count, sum, min and max, so streamed rows are folded in with a few
+bincount / ufunc.at calls and the grid of any aggregate is ready without touching old rows.
+Medians cannot be updated that way: the pivot keeps every value sorted by (cell, value), merges
+new rows in with one searchsorted + insert when a median grid is asked for, and reads each
+cell's median at its offset, so a median grid costs one pass over the rows at most.
+PivotCache holds the most recently used pivots and feeds every new batch of rows to all of them.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from pareto import PARETO_METRICS
+
+HEATMAP_AXES = ("W%", "L", "BetDiv", "ProfitMult", "Buffer%", "StartingBalance")
+HEATMAP_METRICS = ("Score", "AvgHigh", "MaxHigh", "Bust%", "CycleSuccess%", "AvgCycles", "StdDev", "AvgRounds")
+AGGREGATES = ("max", "median", "mean", "min", "count")
+PIVOT_CACHE_SIZE = 8
+_CELL_STRIDE = 1 << 24      # x code step of a sort key; larger than any y code
+
+# dark blue -> teal -> yellow; cells are coloured by their rank between the grid's min and max
+_STOPS = np.array([(0x30, 0x12, 0x6b), (0x21, 0x6f, 0x8e), (0x22, 0xa8, 0x84), (0x90, 0xd7, 0x43), (0xfd, 0xe7, 0x25)])
+PALETTE_SIZE = 64
+
+
+def _palette() -> np.ndarray:
+    t = np.linspace(0, len(_STOPS) - 1, PALETTE_SIZE)
+    lo = np.minimum(t.astype(int), len(_STOPS) - 2)
+    frac = (t - lo)[:, None]
+    rgb = np.rint(_STOPS[lo] * (1 - frac) + _STOPS[lo + 1] * frac).astype(int)
+    return np.array([f"#{r:02x}{g:02x}{b:02x}" for r, g, b in rgb])
+
+
+PALETTE = _palette()
+EMPTY_COLOR = "#2d2d2d"
+
+
+@dataclass
+class PivotGrid:
+    """One aggregate of a pivot: values[i, j] belongs to x_values[j] and y_values[i] (NaN: no rows)."""
+    x_values: np.ndarray
+    y_values: np.ndarray
+    values: np.ndarray
+    counts: np.ndarray
+
+    def colors(self, higher_better: bool = True) -> np.ndarray:
+        """Fill colour of every cell; the better end of the range is the bright one."""
+        v = self.values
+        out = np.full(v.shape, EMPTY_COLOR, dtype=PALETTE.dtype)
+        finite = np.isfinite(v)
+        if not finite.any():
+            return out
+        lo, hi = v[finite].min(), v[finite].max()
+        scaled = (v[finite] - lo) / (hi - lo) if hi > lo else np.ones(int(finite.sum()))
+        if not higher_better:
+            scaled = 1 - scaled
+        out[finite] = PALETTE[np.minimum((scaled * PALETTE_SIZE).astype(int), PALETTE_SIZE - 1)]
+        return out
+
+
+class _Axis:
+    """Distinct values of one axis column, numbered in order of first appearance."""
+
+    def __init__(self):
+        self.index: Dict[float, int] = {}
+        self.keys: List[float] = []
+
+    def codes(self, values: np.ndarray) -> np.ndarray:
+        uniq, inverse = np.unique(values, return_inverse=True)
+        for u in uniq.tolist():
+            if u not in self.index:
+                self.index[u] = len(self.keys)
+                self.keys.append(u)
+        return np.array([self.index[u] for u in uniq.tolist()], dtype=np.int64)[inverse]
+
+    def order(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(sorted values, their codes)."""
+        keys = np.array(self.keys, dtype=np.float64)
+        perm = np.argsort(keys, kind="stable")
+        return keys[perm], perm
+
+
+class Pivot:
+    """Running aggregates of `metric` over the cells of the (x, y) axes."""
+
+    def __init__(self, x: str, y: str, metric: str):
+        self.x, self.y, self.metric = x, y, metric
+        self.rows = 0
+        self._xa, self._ya = _Axis(), _Axis()
+        self._shape = (0, 0)                    # (x codes, y codes) the arrays below cover
+        self._count = np.zeros(0)
+        self._sum = np.zeros(0)
+        self._min = np.zeros(0)
+        self._max = np.zeros(0)
+        # median support: cell + 1j * value of every row, sorted (complex numbers sort by real
+        # part, then imaginary part); rows not merged in yet wait in _pending
+        self._sorted = np.zeros(0, dtype=np.complex128)
+        self._pending: List[np.ndarray] = []
+        self._grids: Dict[str, PivotGrid] = {}
+
+    @property
+    def columns(self) -> Tuple[str, str, str]:
+        return self.x, self.y, self.metric
+
+    def _grow(self, nx: int, ny: int) -> None:
+        """Re-lays the per-cell arrays out for nx x ny codes (axes only ever gain values)."""
+        old_x, old_y = self._shape
+        if (nx, ny) == (old_x, old_y):
+            return
+
+        def regrid(a: np.ndarray, fill) -> np.ndarray:
+            out = np.full((nx, ny), fill, dtype=a.dtype)
+            out[:old_x, :old_y] = a.reshape(old_x, old_y)
+            return out.ravel()
+
+        self._count = regrid(self._count, 0.0)
+        self._sum = regrid(self._sum, 0.0)
+        self._min = regrid(self._min, np.inf)
+        self._max = regrid(self._max, -np.inf)
+        self._shape = (nx, ny)
+
+    def add(self, xs, ys, values) -> None:
+        """Folds in rows given as three equal-length sequences; rows with a NaN are skipped."""
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        keep = np.isfinite(xs) & np.isfinite(ys) & np.isfinite(values)
+        if not keep.all():
+            xs, ys, values = xs[keep], ys[keep], values[keep]
+        if len(values) == 0:
+            return
+        cx, cy = self._xa.codes(xs), self._ya.codes(ys)
+        self._grow(len(self._xa.keys), len(self._ya.keys))
+        size = self._shape[0] * self._shape[1]
+        flat = cx * self._shape[1] + cy
+        self._count += np.bincount(flat, minlength=size)
+        self._sum += np.bincount(flat, weights=values, minlength=size)
+        np.minimum.at(self._min, flat, values)
+        np.maximum.at(self._max, flat, values)
+        # (x code, y code) order is the flat cell order of every shape the axes grow to
+        self._pending.append((cx * _CELL_STRIDE + cy) + 1j * values)
+        self.rows += len(values)
+        self._grids.clear()
+
+    def _medians(self) -> np.ndarray:
+        if self._pending:
+            new = np.sort(np.concatenate(self._pending))
+            self._pending = []
+            if len(self._sorted):
+                self._sorted = np.insert(self._sorted, np.searchsorted(self._sorted, new), new)
+            else:
+                self._sorted = new
+        counts = self._count.astype(np.int64)
+        starts = np.cumsum(counts) - counts
+        values = self._sorted.imag
+        filled = counts > 0
+        out = np.full(len(counts), np.nan)
+        lo = starts[filled] + (counts[filled] - 1) // 2
+        hi = starts[filled] + counts[filled] // 2
+        out[filled] = (values[lo] + values[hi]) / 2
+        return out
+
+    def grid(self, aggregate: str) -> PivotGrid:
+        """The aggregate ("max", "median", "mean", "min" or "count") as a grid in ascending axis order."""
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"unknown aggregate {aggregate!r}")
+        cached = self._grids.get(aggregate)
+        if cached is not None:
+            return cached
+        count = self._count
+        empty = count == 0
+        if aggregate == "median":
+            flat = self._medians()
+        elif aggregate == "mean":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                flat = self._sum / count
+        elif aggregate == "count":
+            flat = count.astype(np.float64)
+        else:
+            flat = (self._max if aggregate == "max" else self._min).copy()
+        flat[empty] = np.nan
+        x_values, x_perm = self._xa.order()
+        y_values, y_perm = self._ya.order()
+        # rows of the grid are y values, columns x values
+        values = flat.reshape(self._shape)[np.ix_(x_perm, y_perm)].T
+        counts = count.reshape(self._shape)[np.ix_(x_perm, y_perm)].T
+        result = PivotGrid(x_values, y_values, values, counts)
+        self._grids[aggregate] = result
+        return result
+
+    def clear(self) -> None:
+        self.__init__(self.x, self.y, self.metric)
+
+
+class PivotCache:
+    """
+    The PIVOT_CACHE_SIZE most recently used pivots. A pivot missing from the cache is built
+    with `load(columns)`, which returns the three columns over every stored row; after that
+    it is kept current by add_rows.
+    """
+
+    def __init__(self, load: Callable[[Sequence[str]], Sequence[Sequence[float]]],
+                 size: int = PIVOT_CACHE_SIZE):
+        self._load = load
+        self._size = size
+        self._pivots: "OrderedDict[Tuple[str, str, str], Pivot]" = OrderedDict()
+
+    def get(self, x: str, y: str, metric: str) -> Pivot:
+        key = (x, y, metric)
+        pivot = self._pivots.get(key)
+        if pivot is not None:
+            self._pivots.move_to_end(key)
+            return pivot
+        pivot = Pivot(x, y, metric)
+        pivot.add(*self._load(pivot.columns))
+        self._pivots[key] = pivot
+        while len(self._pivots) > self._size:
+            self._pivots.popitem(last=False)
+        return pivot
+
+    def add_rows(self, rows: Sequence[Dict]) -> None:
+        """Folds streamed result rows (dicts) into every cached pivot."""
+        if not rows:
+            return
+        for pivot in self._pivots.values():
+            pivot.add(*([_number(r.get(c)) for r in rows] for c in pivot.columns))
+
+    def clear(self) -> None:
+        self._pivots.clear()
+
+
+def higher_is_better(metric: str, aggregate: str) -> bool:
+    """Whether larger cells of the grid are better (counts always are)."""
+    return aggregate == "count" or PARETO_METRICS.get(metric, True)
+
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
@@ -1,10 +1,10 @@
 # Dice_Tool/ui/main.py
 import multiprocessing
-import tkinter as tk
-from ui.main_window import MergedApp  # removed apply_global_theme import
 
 if __name__ == "__main__":
     multiprocessing.freeze_support()
+    # imported here so spawned worker processes, which re-import this module, skip the UI and pandas
+    from ui.main_window import MergedApp
     app = MergedApp()
     app.apply_theme("Original")  # apply default theme
     app.mainloop()
\ No newline at end of file
@@ -1,12 +1,35 @@
 # Dice_Tool/optimizer.py
 import os
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
 import pandas as pd
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 import queue
-from simulation_core import SimParams, run_trials_collect_stats
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from simulation_core import LOCKSTEP_ENGINES, resolve_executor, make_executor
+from progress import ProgressChannel
+from compute_tasks import _run_combo_batch, _failed_result
+from sampling import sample_box, sobol, scale_point
+from concurrent.futures import Executor, wait, FIRST_COMPLETED
 import threading
+import time
+from bisect import bisect_left
+from itertools import product, islice
+
+try:
+    from shm_results import SharedResults, COMBO_DTYPE, combo_row
+    _HAS_SHARED = True
+except Exception:
+    _HAS_SHARED = False
+
+ROW_STREAM_INTERVAL = 0.25  # seconds between ("rows", [...]) messages while a sweep runs
+IN_FLIGHT_PER_WORKER = 4    # queued tasks per pool worker; bounds memory and Stop latency
+STOP_POLL_SECONDS = 0.1
+TARGET_TASK_SECONDS = 0.25  # ComboBatcher aims for tasks of about this duration
+VECTOR_TASK_SECONDS = 2.0   # longer for the vector engine, whose per-step cost is shared by the batch
+MAX_COMBO_BATCH = 256      # also the lane-block size of a vector-engine task (x n_trials lanes)
+BUDGET_PROBE_COMBOS = 8     # combos timed before a time-budgeted run plans its rungs
+BUDGET_MIN_TRIALS = 10      # trials per combo in the coarsest rung of a budgeted run
+BUDGET_ETA = 2              # successive halving: keep 1/ETA of the combos, give them ETA x the trials
+BUDGET_REFINE_SHARE = 0.2   # part of the remaining budget left for refining the leaders
 
 @dataclass
 class OptParams:
@@ -18,6 +41,113 @@ class OptParams:
     l_range: List[int]
     buffer_range: List[float] 
     n_trials: int
+    max_rounds: int = 0
+    max_cycles: int = 0
+    max_seconds: float = 0.0
+    ci_metric: str = "median_high"   # sequential stopping metric, used when ci_width > 0
+    ci_width: float = 0.0            # 0 = always run exactly n_trials per combo
+    sampling: str = "grid"           # "grid", "sobol" or "lhs" (see sampling.SAMPLING_MODES)
+    samples: int = 0                 # sample budget for sobol / lhs; ranges then only give bounds
+    sample_seed: Optional[int] = None
+    refine_levels: int = 0           # zoom-in levels after the first sweep (0 = off)
+    refine_top_k: int = 5            # best rows refined at each level
+    refine_budget: int = 0           # max combos over all refinement levels (0 = no limit)
+    engine: str = "scalar"           # "vector" / "fixed": each task runs its whole batch in one lock-step pass
+    executor: str = "auto"           # "auto", "thread" or "process" (see simulation_core.resolve_executor)
+    time_budget: float = 0.0         # seconds; > 0 runs the time-budgeted search (see BudgetPlan)
+    starting_balance_range: List[float] = field(default_factory=list)  # empty = [starting_balance]
+    min_bet: float = 0.0             # bet model, see SimParams.min_bet / bet_decimals
+    bet_decimals: Optional[int] = None
+
+    def balances(self) -> List[float]:
+        """Starting balances every point is evaluated at."""
+        return list(self.starting_balance_range) or [self.starting_balance]
+
+    def bounds(self) -> List[Tuple[float, float]]:
+        """(min, max) of each range in combo order: bet_div, profit_mult, w, l, buffer."""
+        ranges = (self.bet_div_range, self.profit_mult_range, self.w_range, self.l_range, self.buffer_range)
+        return [(min(r), max(r)) for r in ranges]
+
+    def run_options(self) -> Dict:
+        """Per-combo settings that travel with every worker task."""
+        return {"max_rounds": self.max_rounds, "max_cycles": self.max_cycles, "max_seconds": self.max_seconds,
+                "ci_metric": self.ci_metric, "ci_width": self.ci_width, "engine": self.engine,
+                "min_bet": self.min_bet, "bet_decimals": self.bet_decimals}
+
+    def point_count(self) -> int:
+        """Size of the parameter grid, or the sample budget in a sampling mode."""
+        if self.sampling != "grid":
+            return max(0, self.samples)
+        return (len(self.bet_div_range) * len(self.profit_mult_range) *
+                len(self.w_range) * len(self.l_range) * len(self.buffer_range))
+
+    def combo_count(self) -> int:
+        """Rows of the sweep: every point at every starting balance."""
+        return self.point_count() * len(self.balances())
+
+class RowStream:
+    """
+    Buffers finished result rows and forwards them as ("rows", [row, ...]) messages at most
+    every ROW_STREAM_INTERVAL seconds, so the Results tab fills in while the sweep runs
+    without one queue message per combo.
+    """
+
+    def __init__(self, q: queue.Queue, interval: float = ROW_STREAM_INTERVAL):
+        self.q = q
+        self.interval = interval
+        self._pending: List[Dict] = []
+        self._last = time.monotonic()
+
+    def add(self, row: Dict) -> None:
+        self._pending.append(row)
+        if time.monotonic() - self._last >= self.interval:
+            self.flush()
+
+    def extend(self, rows: List[Dict]) -> None:
+        self._pending.extend(rows)
+        if time.monotonic() - self._last >= self.interval:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending and self.q is not None:
+            self.q.put(("rows", self._pending))
+        self._pending = []
+        self._last = time.monotonic()
+
+class ComboBatcher:
+    """
+    Chooses how many combos go into the next task from an exponential moving average of
+    the measured seconds per combo, aiming at TARGET_TASK_SECONDS per task. Starts at one
+    combo per task until the first measurement arrives, and never makes batches so large
+    that the remaining combos could not be spread over all workers.
+    Batches are whole multiples of `group` combos (the starting balances of one point), so a
+    worker can rescale a point's run to its other balances instead of simulating them again.
+    """
+
+    def __init__(self, target: float = TARGET_TASK_SECONDS, max_batch: int = MAX_COMBO_BATCH,
+                 smoothing: float = 0.3, group: int = 1):
+        self.target = target
+        self.max_batch = max_batch
+        self.smoothing = smoothing
+        self.group = group if 1 <= group <= max_batch else 1
+        self.per_combo: float = 0.0
+
+    def record(self, elapsed: float, n: int) -> None:
+        if n <= 0:
+            return
+        sample = elapsed / n
+        if self.per_combo == 0.0:
+            self.per_combo = sample
+        else:
+            self.per_combo += self.smoothing * (sample - self.per_combo)
+
+    def size(self, remaining: int, workers: int) -> int:
+        if self.per_combo <= 0.0:
+            return self.group
+        size = int(self.target / self.per_combo)
+        fair_share = max(1, remaining // max(1, workers))
+        size = max(1, min(size, self.max_batch, fair_share))
+        return max(self.group, size // self.group * self.group)
 
 def parse_range(text: str, integer: bool = False) -> List:
     """
@@ -66,78 +196,424 @@ def parse_range(text: str, integer: bool = False) -> List:
     except Exception:
         return []
 
-def _run_one_combo(args):
-    (bet_div, profit_mult, w, l, buffer, starting_balance, n_trials) = args
-    params = SimParams(starting_balance, bet_div, profit_mult, w, l, buffer, n_trials)
-   
-    avg_high, std_high, max_high, avg_cycles, avg_rounds, cycle_success_rate, bust_rate = run_trials_collect_stats(params, stop_event=None, parallel=False)
-    score = (avg_high - starting_balance) / std_high if std_high != 0 else 0.0
-    return {
-        "StartingBalance": round(float(starting_balance), 2),
-        "Trials": int(n_trials),
-        "BetDiv": round(float(bet_div), 2),
-        "ProfitMult": round(float(profit_mult), 2),
-        "W%": round(w * 100, 2),
-        "L": int(l),
-        "Buffer%": round((buffer - 1) * 100, 2),
-        "AvgHigh": round(avg_high, 2),
-        "StdDev": round(std_high, 2),
-        "MaxHigh": round(max_high, 2),
-        "AvgCycles": round(avg_cycles, 2),
-        "AvgRounds": round(avg_rounds, 2),
-        "CycleSuccess%": round(cycle_success_rate, 2),
-        "Bust%": round(bust_rate, 2),
-        "Score": round(score, 2)
-    }
+def _iter_combos(opt_params: OptParams):
+    """
+    Lazily yield worker argument tuples for every combination in the parameter grid, or for
+    opt_params.samples space-filling points inside the ranges' bounds in a sampling mode.
+    The starting balances of a point follow each other, so they usually share a task batch.
+    """
+    opts = opt_params.run_options()
+    if opt_params.sampling != "grid":
+        points = sample_box(opt_params.sampling, opt_params.point_count(), opt_params.bounds(),
+                            (False, False, False, True, False), opt_params.sample_seed)
+    else:
+        points = product(opt_params.bet_div_range, opt_params.profit_mult_range, opt_params.w_range,
+                         opt_params.l_range, opt_params.buffer_range)
+    for point in points:
+        yield from _point_combos(opt_params, opts, point)
+
+def _point_combos(opt_params: OptParams, opts: Dict, point: Tuple, n_trials: Optional[int] = None):
+    """Worker argument tuples of a point at each of opt_params.balances()."""
+    for balance in opt_params.balances():
+        yield _combo_args(opt_params, opts, point, n_trials, balance)
+
+def _combo_args(opt_params: OptParams, opts: Dict, point: Tuple, n_trials: Optional[int] = None,
+                balance: Optional[float] = None) -> Tuple:
+    """Worker argument tuple for a (bet_div, profit_mult, w%, l, buffer%) point."""
+    bet_div, profit_mult, w, l, buffer = point
+    return (bet_div, profit_mult, w / 100.0, l, 1 + buffer / 100.0,
+            opt_params.starting_balance if balance is None else balance,
+            opt_params.n_trials if n_trials is None else n_trials, opts)
+
+def _point_key(point: Tuple) -> Tuple:
+    """Identity of a combo as it appears in result rows (2-decimal parameters, integer L)."""
+    bet_div, profit_mult, w, l, buffer = point
+    return (round(bet_div, 2), round(profit_mult, 2), round(w, 2), int(l), round(buffer, 2))
+
+class RefinementPlan:
+    """
+    Zoom-in search over the parameter box. Each level takes the refine_top_k best rows by
+    Score evaluated so far and lays a 3-point grid (centre and +/- one step) on every axis
+    around each of them, clipped to the original bounds. The step is half the spacing of the
+    first sweep at level 1 (the midpoints between its values) and halves every level; Loss
+    Reset steps stay whole numbers and stop at 1.
+    Points already evaluated at any level are skipped, and refine_budget caps the total
+    number of new combos.
+    """
+
+    def __init__(self, opt_params: OptParams, rows: List[Dict]):
+        self.opt_params = opt_params
+        self.bounds = opt_params.bounds()
+        self.level = 0
+        self.spent = 0
+        self.rows: Dict[Tuple, Dict] = {}
+        self.add(rows)
+        ranges = (opt_params.bet_div_range, opt_params.profit_mult_range, opt_params.w_range,
+                  opt_params.l_range, opt_params.buffer_range)
+        if opt_params.sampling != "grid":
+            per_axis = max(1, round(max(1, opt_params.samples) ** (1 / len(ranges))))
+            self.steps = [(hi - lo) / per_axis for lo, hi in self.bounds]
+        else:
+            self.steps = [(max(r) - min(r)) / (len(set(r)) - 1) if len(set(r)) > 1 else 0.0 for r in ranges]
+
+    def add(self, rows: List[Dict]) -> None:
+        for row in rows:
+            if "BetDiv" in row and row.get("Trials", 0):
+                key = (row["BetDiv"], row["ProfitMult"], row["W%"], int(row["L"]), row["Buffer%"])
+                self.rows[key] = row
+
+    def _axis_values(self, axis: int, centre: float) -> List[float]:
+        lo, hi = self.bounds[axis]
+        offset = self.steps[axis]
+        if axis == 3:
+            # whole steps that never halve below 1 (0 only when L was not varied at all)
+            offset = max(1, int(round(offset))) if offset > 0 else 0
+            values = {int(centre) - offset, int(centre), int(centre) + offset}
+        else:
+            values = {centre - offset, centre, centre + offset}
+        return sorted(v for v in values if lo <= v <= hi)
+
+    def next_level(self) -> List[Tuple]:
+        """New points of the next level (empty when there is nothing left to refine)."""
+        self.level += 1
+        self.steps = [s / 2 for s in self.steps]
+        budget = self.opt_params.refine_budget
+        if budget and self.spent >= budget:
+            return []
+        best = sorted(self.rows.values(), key=lambda r: r["Score"], reverse=True)[:max(1, self.opt_params.refine_top_k)]
+        seen = set(self.rows)
+        points: List[Tuple] = []
+        for row in best:
+            centre = (row["BetDiv"], row["ProfitMult"], row["W%"], row["L"], row["Buffer%"])
+            axes = [self._axis_values(i, c) for i, c in enumerate(centre)]
+            for point in product(*axes):
+                key = _point_key(point)
+                if key in seen:
+                    continue
+                seen.add(key)
+                points.append(key)
+                if budget and self.spent + len(points) >= budget:
+                    self.spent += len(points)
+                    return points
+        self.spent += len(points)
+        return points
+
+
+class BudgetClock:
+    """Stands in for the stop event: also counts as set once the wall-clock deadline passes."""
+
+    def __init__(self, stop_event: threading.Event, seconds: float):
+        self.stop_event = stop_event
+        self.deadline = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.deadline
+
+    def is_set(self) -> bool:
+        return self.stop_event.is_set() or self.expired()
+
+class BudgetPlan:
+    """
+    Successive halving inside a wall-clock budget. A coarse rung runs many Sobol points of the
+    parameter box (snapped to the listed values in Full grid mode) with few trials; every
+    following rung keeps the best 1/BUDGET_ETA by Score and gives them BUDGET_ETA times the
+    trials, ending at Trials per Combo. The number of coarse points is chosen from the measured
+    wall time per combo-trial so that the rungs fill (1 - BUDGET_REFINE_SHARE) of the time left;
+    the ladder is shortened from the top when even one combo cannot get all its trials, and
+    grows back (see extend) when later rungs measure a better throughput.
+    """
+
+    def __init__(self, opt_params: OptParams):
+        self.opt_params = opt_params
+        self.seconds_per_trial = 0.0
+        top = max(1, opt_params.n_trials)
+        self.trials = [top]
+        while self.trials[0] // BUDGET_ETA >= BUDGET_MIN_TRIALS:
+            self.trials.insert(0, self.trials[0] // BUDGET_ETA)
+        self._points = self._point_source()
+        self.drawn: List[Tuple] = []
+
+    def record(self, elapsed: float, combo_trials: int) -> None:
+        """Folds a measured (wall seconds, combos x trials) pair into the throughput estimate."""
+        if combo_trials <= 0 or elapsed <= 0:
+            return
+        rate = elapsed / combo_trials
+        self.seconds_per_trial = rate if not self.seconds_per_trial else 0.5 * (self.seconds_per_trial + rate)
+
+    def space_size(self) -> int:
+        """Distinct points available (grid size, or the sample cap in a sampling mode; 0 = unbounded)."""
+        if self.opt_params.sampling == "grid":
+            return self.opt_params.point_count()
+        return max(0, self.opt_params.samples)
+
+    def schedule(self, seconds: float) -> int:
+        """Fixes the ladder for `seconds` of rung time and returns the coarse rung size."""
+        spt = max(self.seconds_per_trial, 1e-9)
+        while True:
+            cost = sum(t / BUDGET_ETA ** k for k, t in enumerate(self.trials))
+            n = int(seconds / (spt * cost))
+            if len(self.trials) == 1 or n >= BUDGET_ETA ** (len(self.trials) - 1):
+                break
+            self.trials.pop()
+        size = self.space_size()
+        n = max(n, BUDGET_PROBE_COMBOS)
+        return min(n, size) if size else n
+
+    def extend(self, n_combos: int, seconds: float) -> bool:
+        """Adds a rung above the top one if n_combos fit into `seconds` with its trials."""
+        top = self.trials[-1]
+        if top >= self.opt_params.n_trials:
+            return False
+        trials = min(self.opt_params.n_trials, top * BUDGET_ETA)
+        if n_combos * trials * max(self.seconds_per_trial, 1e-9) > seconds:
+            return False
+        self.trials.append(trials)
+        return True
+
+    def draw(self, n: int) -> List[Tuple]:
+        """The next n new points of the coarse sequence (fewer when the space runs out)."""
+        out = list(islice(self._points, n))
+        self.drawn.extend(out)
+        return out
+
+    def _point_source(self):
+        op = self.opt_params
+        ranges = (op.bet_div_range, op.profit_mult_range, op.w_range, op.l_range, op.buffer_range)
+        if op.sampling == "grid" and op.point_count() <= BUDGET_PROBE_COMBOS * 4:
+            yield from product(*ranges)
+            return
+        integer = (False, False, False, True, False)
+        grid = [sorted(set(r)) for r in ranges]
+        seen = set()
+        size = self.space_size()
+        misses = 0
+        for u in sobol((1 << 31) - 1, len(ranges), op.sample_seed):
+            point = scale_point(u, op.bounds(), integer)
+            if op.sampling == "grid":
+                point = tuple(_snap(values, x) for values, x in zip(grid, point))
+            key = _point_key(point)
+            if key in seen:
+                # Sobol points keep filling gaps, but a small grid can be exhausted
+                misses += 1
+                if misses > 64 * max(1, len(seen)) or (size and len(seen) >= size):
+                    return
+                continue
+            misses = 0
+            seen.add(key)
+            yield point
+
+    def survivors(self, rows: List[Dict]) -> List[Dict]:
+        """Best row of each of the top 1/BUDGET_ETA points (a point has a row per starting balance)."""
+        best: Dict[Tuple, Dict] = {}
+        for row in sorted((r for r in rows if r.get("Trials", 0)), key=_as_score, reverse=True):
+            best.setdefault(_point_key((row["BetDiv"], row["ProfitMult"], row["W%"], row["L"], row["Buffer%"])), row)
+        keep = max(1, len(best) // BUDGET_ETA)
+        return list(best.values())[:keep]
+
+def _snap(values: List[float], x: float) -> float:
+    """Nearest of the sorted `values` to x."""
+    i = bisect_left(values, x)
+    if i == 0:
+        return values[0]
+    if i == len(values):
+        return values[-1]
+    return values[i] if values[i] - x < x - values[i - 1] else values[i - 1]
+
+def _as_score(row: Dict) -> float:
+    score = row.get("Score", float("-inf"))
+    return score if score == score else float("-inf")
+
+def _evaluate_combos(exe: Executor, shared, window: int, combos, total: int,
+                     q: queue.Queue, stop_event: threading.Event, progress: Optional[ProgressChannel],
+                     stream: "RowStream", batcher: "ComboBatcher") -> Tuple[List[Dict], bool]:
+    """
+    Feeds `combos` (an iterator of worker argument tuples, `total` long) through the pool with
+    at most `window` tasks in flight. Returns (rows, stopped).
+    """
+    results: List[Dict] = []
+    if progress:
+        progress.reset(total)
+    if stream is None:
+        stream = RowStream(None)
+    free_blocks = list(range(window))
+    pending: Dict = {}
+    done = 0
+    exhausted = False
+    while True:
+        while not exhausted and len(pending) < window and not stop_event.is_set():
+            batch = list(islice(combos, batcher.size(total - done, window // IN_FLIGHT_PER_WORKER)))
+            if not batch:
+                exhausted = True
+                break
+            block = free_blocks.pop()
+            if shared is not None:
+                fut = exe.submit(_run_combo_batch, batch, shared.handle, block * MAX_COMBO_BATCH)
+            else:
+                fut = exe.submit(_run_combo_batch, batch)
+            pending[fut] = (block, batch)
+        if stop_event.is_set():
+            return results, True
+        if not pending:
+            return results, False
+        finished, _ = wait(pending, timeout=STOP_POLL_SECONDS, return_when=FIRST_COMPLETED)
+        for fut in finished:
+            block, batch = pending.pop(fut)
+            n = len(batch)
+            free_blocks.append(block)
+            try:
+                elapsed, rows = fut.result()
+                if shared is not None:
+                    first = block * MAX_COMBO_BATCH
+                    rows = [combo_row(shared.array, first + i) for i in range(n)]
+                    shared.array["done"][first:first + n] = False
+                batcher.record(elapsed, n)
+            except Exception:
+                rows = [_failed_result(combo) for combo in batch]
+            results.extend(rows)
+            stream.extend(rows)
+            done += n
+            if progress:
+                progress.finish_unit(int(sum(r["AvgRounds"] * r.get("Trials", 0) for r in rows)), count=n)
+            else:
+                q.put(("progress", done / total))
+
+def _run_budgeted(opt_params: OptParams, exe: Executor, shared, window: int, q: queue.Queue,
+                  stop_event: threading.Event, progress: Optional[ProgressChannel],
+                  batcher: "ComboBatcher") -> Tuple[List[Dict], bool]:
+    """
+    Time-budgeted search (opt_params.time_budget seconds): probe, successive-halving rungs
+    (see BudgetPlan), then refinement around the leaders with full trials until the deadline.
+    Returns the latest row of every combo evaluated and whether the run was cut short.
+    """
+    clock = BudgetClock(stop_event, opt_params.time_budget)
+    opts = opt_params.run_options()
+    plan = BudgetPlan(opt_params)
+    n_balances = len(opt_params.balances())
+    latest: Dict[Tuple, Dict] = {}
+
+    def run(points, trials, label):
+        points = list(dict.fromkeys(points))   # a point survives once however many balances it led at
+        total = len(points) * n_balances
+        left = int(clock.remaining())
+        q.put(("status", f"{label}: {total} combos x {trials} trials, {left // 60}:{left % 60:02d} left"))
+        start = time.monotonic()
+        # most rows of a screening rung are dropped, so only the top rung pays for intervals
+        run_opts = opts if trials >= plan.trials[-1] else dict(opts, ci=False)
+        combos = (c for p in points for c in _point_combos(opt_params, run_opts, p, trials))
+        rows, cut = _evaluate_combos(exe, shared, window, combos, total, q, clock, progress, None, batcher)
+        plan.record(time.monotonic() - start, len(rows) * trials)
+        for row in rows:
+            if row.get("Trials", 0):
+                key = _point_key((row["BetDiv"], row["ProfitMult"], row["W%"], row["L"], row["Buffer%"]))
+                latest[key + (row.get("StartingBalance"),)] = row
+        return rows, cut
+
+    rows, cut = run(plan.draw(BUDGET_PROBE_COMBOS), plan.trials[0], "Budget probe")
+    if not cut:
+        n = plan.schedule(clock.remaining() * (1 - BUDGET_REFINE_SHARE))
+        extra = plan.draw(max(0, n - len(plan.drawn)))
+        if extra:
+            more, cut = run(extra, plan.trials[0], f"Rung 1/{len(plan.trials)}")
+            rows += more
+    level = 1
+    while not cut:
+        survivors = plan.survivors(rows)
+        if level == len(plan.trials) and not plan.extend(len(survivors),
+                                                         clock.remaining() * (1 - BUDGET_REFINE_SHARE)):
+            break
+        level += 1
+        rows, cut = run([_point_key((r["BetDiv"], r["ProfitMult"], r["W%"], r["L"], r["Buffer%"])) for r in survivors],
+                        plan.trials[level - 1], f"Rung {level}/{len(plan.trials)}")
+
+    top = plan.trials[-1]
+    refine_params = replace(opt_params, sampling="sobol", samples=max(1, len(plan.drawn)))
+    refine = RefinementPlan(refine_params, [r for r in latest.values() if r["Trials"] >= top])
+    while not cut and (not opt_params.refine_levels or refine.level < opt_params.refine_levels):
+        points = refine.next_level()
+        if not points:
+            break
+        rows, cut = run(points, top, f"Refining leaders (level {refine.level})")
+        refine.add(rows)
+    return list(latest.values()), cut
 
 def optimize_parameters_manual(opt_params: OptParams,
                                q: queue.Queue,
-                               stop_event: threading.Event) -> None:
+                               stop_event: threading.Event,
+                               progress: ProgressChannel = None) -> None:
     """
     Runs optimization over parameter combinations and reports results via queue.
-    Uses ProcessPoolExecutor to parallelize combos. Each worker runs per-combo trials sequentially.
-    stop_event is checked between combo submissions and while collecting results to allow early termination.
-    """
-    combos: List[Tuple[float, float, float, int, float, float, int]] = [
-        (bet_div, profit_mult, w / 100.0, l, 1 + buffer / 100.0, opt_params.starting_balance, opt_params.n_trials)
-        for bet_div in opt_params.bet_div_range
-        for profit_mult in opt_params.profit_mult_range
-        for w in opt_params.w_range
-        for l in opt_params.l_range
-        for buffer in opt_params.buffer_range
-    ]
-    total = len(combos)
-    results = []
+    Uses a process pool (or a thread pool, see OptParams.executor) to parallelize combos.
+    Each worker runs per-combo trials sequentially.
+    Combos are generated lazily and at most IN_FLIGHT_PER_WORKER tasks per worker are queued
+    at a time, so memory does not grow with the grid and Stop only waits for the combos that
+    are actually running. Stop (or a budget deadline) also sets the progress channel's stop
+    flag, so tasks still running in the pool end after their current trial.
+    Each task carries a batch of combos sized by ComboBatcher from the measured time per combo,
+    so cheap combos are not dominated by per-task scheduling overhead.
+    With a progress channel, workers count rounds into it and finished combos are marked on it
+    instead of putting a ("progress", fraction) message on the queue per combo.
+    When NumPy is available, workers write result rows into a small shared-memory array with
+    one block of MAX_COMBO_BATCH slots per in-flight task and return only the row count; the
+    parent copies the rows out and frees the block.
+    With opt_params.refine_levels > 0 the sweep continues with finer local grids around the
+    best rows (see RefinementPlan); the progress channel is reset for every level.
+    Finished rows are also streamed as ("rows", [...]) batches (see RowStream) before the
+    final ("done", df).
+    With opt_params.time_budget > 0 the grid or sample budget is not run as given: the
+    search fits itself into the budget instead (see _run_budgeted), rows are not streamed
+    because combos are re-run with more trials, and ("done", df) holds the latest row of
+    every combo with its confidence intervals at the deadline.
+    """
+    total = opt_params.combo_count()
 
     if total == 0:
         q.put(("done", pd.DataFrame()))
         return
 
-    
     cpu_count = min(32, (os.cpu_count() or 1))
-    max_workers = min(cpu_count, total)
-
-    with ProcessPoolExecutor(max_workers=max_workers) as exe:
-        futures = {exe.submit(_run_one_combo, combo): combo for combo in combos}
-
-        done = 0
-        for fut in as_completed(futures):
-            if stop_event.is_set():
-                
+    # refinement levels and budgeted runs add combos later, so do not shrink the pool to the first sweep
+    max_workers = cpu_count if opt_params.refine_levels or opt_params.time_budget > 0 else min(cpu_count, total)
+    window = max_workers * IN_FLIGHT_PER_WORKER
+    kind = resolve_executor(opt_params.engine, opt_params.executor)
+    batcher = ComboBatcher(VECTOR_TASK_SECONDS if opt_params.engine in LOCKSTEP_ENGINES else TARGET_TASK_SECONDS,
+                           group=len(opt_params.balances()))
+    stream = RowStream(q)
+    # thread workers hand rows back directly; shared memory only pays off across processes
+    shared = SharedResults(COMBO_DTYPE, window * MAX_COMBO_BATCH) if _HAS_SHARED and kind == "process" else None
+    exe = make_executor(kind, max_workers, progress)
+    stopped = False
+    try:
+        if opt_params.time_budget > 0:
+            results, stopped = _run_budgeted(opt_params, exe, shared, window, q, stop_event, progress, batcher)
+        else:
+            results, stopped = _evaluate_combos(exe, shared, window, _iter_combos(opt_params), total,
+                                                q, stop_event, progress, stream, batcher)
+        plan = RefinementPlan(opt_params, results)
+        while not stopped and opt_params.time_budget <= 0 and plan.level < opt_params.refine_levels:
+            points = plan.next_level()
+            if not points:
                 break
-            try:
-                res = fut.result()
-            except Exception:
-            
-                res = {
-                    "BetDiv": 0.0, "ProfitMult": 0.0, "W%": 0.0, "L": 0, "Buffer%": 0.0,
-                    "AvgHigh": 0.0, "StdDev": 0.0, "MaxHigh": 0.0, "AvgCycles": 0.0, "AvgRounds": 0.0,
-                    "CycleSuccess%": 0.0, "Bust%": 100.0, "Score": 0.0
-                }
-            results.append(res)
-            done += 1
-            q.put(("progress", done / total))
-
+            stream.flush()
+            total = len(points) * len(opt_params.balances())
+            q.put(("status", f"Refinement level {plan.level}/{opt_params.refine_levels}: {total} combos"))
+            opts = opt_params.run_options()
+            combos = (c for p in points for c in _point_combos(opt_params, opts, p))
+            rows, stopped = _evaluate_combos(exe, shared, window, combos, total,
+                                             q, stop_event, progress, stream, batcher)
+            plan.add(rows)
+            results.extend(rows)
+        stream.flush()
+    finally:
+        # On Stop, queued tasks are cancelled and running ones are abandoned rather than awaited;
+        # the channel's stop flag makes them end between trials instead of occupying the workers.
+        if stopped and progress is not None:
+            progress.stop_event.set()
+        exe.shutdown(wait=not stopped, cancel_futures=True)
+        if shared is not None:
+            shared.close()
     df = pd.DataFrame(results)
     if not df.empty:
         df = df.sort_values(by=["Score"], ascending=[False]).reset_index(drop=True)
@@ -0,0 +1,134 @@
+# Dice_Tool/pareto.py
+"""
+Non-dominated (Pareto) filtering of optimizer rows over user-chosen metrics.
+
+Two objectives use an O(n log n) sort-and-sweep; three or more use sort-filter-skyline:
+rows are visited in decreasing order of their objective sum (a row can only be dominated
+by rows earlier in that order) and checked block-wise against the frontier found so far.
+ParetoFrontier keeps only the current frontier, so streamed rows are folded in cheaply.
+"""
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+# metric -> True when larger is better
+PARETO_METRICS: Dict[str, bool] = {
+    "AvgHigh": True,
+    "MaxHigh": True,
+    "AvgCycles": True,
+    "CycleSuccess%": True,
+    "Score": True,
+    "Bust%": False,
+    "StdDev": False,
+}
+
+DEFAULT_OBJECTIVES = ("AvgHigh", "Bust%", "CycleSuccess%")
+
+_BLOCK = 256
+
+
+def oriented(values: np.ndarray, metrics: Sequence[str]) -> np.ndarray:
+    """Flip minimised metrics so that every column is 'larger is better'."""
+    signs = np.array([1.0 if PARETO_METRICS.get(m, True) else -1.0 for m in metrics])
+    return np.asarray(values, dtype=np.float64) * signs
+
+
+def _mask_2d(v: np.ndarray) -> np.ndarray:
+    n = len(v)
+    order = np.lexsort((-v[:, 1], -v[:, 0]))
+    x, y = v[order, 0], v[order, 1]
+    # Identical points never dominate each other, so compare against the best y of
+    # all strictly earlier *distinct* points.
+    new_group = np.ones(n, dtype=bool)
+    new_group[1:] = (x[1:] != x[:-1]) | (y[1:] != y[:-1])
+    group_id = np.cumsum(new_group) - 1
+    group_y = y[new_group]
+    best_before = np.empty(len(group_y))
+    best_before[0] = -np.inf
+    if len(group_y) > 1:
+        best_before[1:] = np.maximum.accumulate(group_y)[:-1]
+    dominated_sorted = best_before[group_id] >= y
+    mask = np.empty(n, dtype=bool)
+    mask[order] = ~dominated_sorted
+    return mask
+
+
+def _dominated_by(cands: np.ndarray, front: np.ndarray) -> np.ndarray:
+    """For each candidate row, whether some row of `front` dominates it."""
+    out = np.zeros(len(cands), dtype=bool)
+    if len(front) == 0:
+        return out
+    step = max(1, (1 << 22) // max(1, len(front) * cands.shape[1]))
+    for i in range(0, len(cands), step):
+        c = cands[i:i + step, None, :]
+        ge = (front[None, :, :] >= c).all(axis=2)
+        gt = (front[None, :, :] > c).any(axis=2)
+        out[i:i + step] = (ge & gt).any(axis=1)
+    return out
+
+
+def _mask_nd(v: np.ndarray) -> np.ndarray:
+    n = len(v)
+    span = v.max(axis=0) - v.min(axis=0)
+    span[span == 0] = 1.0
+    order = np.argsort(-((v - v.min(axis=0)) / span).sum(axis=1), kind="stable")
+    keep_sorted = np.zeros(n, dtype=bool)
+    front = np.empty((0, v.shape[1]))
+    for start in range(0, n, _BLOCK):
+        idx = np.arange(start, min(n, start + _BLOCK))
+        block = v[order[idx]]
+        alive = ~_dominated_by(block, front)
+        block, idx = block[alive], idx[alive]
+        alive = ~_dominated_by(block, block)
+        block, idx = block[alive], idx[alive]
+        keep_sorted[idx] = True
+        front = np.vstack([front, block])
+    mask = np.empty(n, dtype=bool)
+    mask[order] = keep_sorted
+    return mask
+
+
+def nondominated_mask(values: np.ndarray, metrics: Sequence[str]) -> np.ndarray:
+    """Boolean mask of the rows of `values` (n x len(metrics)) that no other row dominates."""
+    v = oriented(values, metrics)
+    if v.ndim != 2 or len(v) == 0:
+        return np.zeros(len(v), dtype=bool)
+    valid = np.isfinite(v).all(axis=1)
+    mask = np.zeros(len(v), dtype=bool)
+    vv = v[valid]
+    if len(vv) == 0:
+        return mask
+    if vv.shape[1] == 1:
+        sub = vv[:, 0] == vv[:, 0].max()
+    elif vv.shape[1] == 2:
+        sub = _mask_2d(vv)
+    else:
+        sub = _mask_nd(vv)
+    mask[np.flatnonzero(valid)] = sub
+    return mask
+
+
+class ParetoFrontier:
+    """Running frontier over rows that arrive in batches; keeps row ids of the current frontier."""
+
+    def __init__(self, metrics: Sequence[str] = DEFAULT_OBJECTIVES):
+        self.metrics = tuple(metrics)
+        self.ids: List = []
+        self._values = np.empty((0, len(self.metrics)))
+
+    def add(self, values: np.ndarray, ids: Sequence) -> None:
+        values = np.asarray(values, dtype=np.float64).reshape(-1, len(self.metrics))
+        if len(values) == 0:
+            return
+        all_values = np.vstack([self._values, values])
+        all_ids = list(self.ids) + list(ids)
+        mask = nondominated_mask(all_values, self.metrics)
+        self._values = all_values[mask]
+        self.ids = [i for i, keep in zip(all_ids, mask) if keep]
+
+    def clear(self) -> None:
+        self.ids = []
+        self._values = np.empty((0, len(self.metrics)))
+
+    def __contains__(self, row_id) -> bool:
+        return row_id in set(self.ids)
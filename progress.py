@@ -0,0 +1,151 @@
+# Dice_Tool/progress.py
+"""
+Shared-memory progress counters for long simulations and sweeps.
+
+Workers add to the counters in place (rounds played, updated every roll batch) and the
+orchestrating thread marks whole units (trials or combos) as finished. The UI samples a
+snapshot at a fixed frame rate instead of draining one queue message per finished unit.
+"""
+import time
+import multiprocessing
+from dataclasses import dataclass
+from typing import Optional
+
+UI_FRAME_MS = 50  # sampling period of the Tk progress display (20 fps)
+
+
+@dataclass
+class ProgressSnapshot:
+    """Point-in-time view of a ProgressChannel."""
+    done: int
+    total: int
+    rounds: int
+    elapsed: float
+    fraction: float          # includes partial progress of units still running
+    units_per_sec: float
+    rounds_per_sec: float
+    eta: Optional[float]     # seconds, None until the rate is known
+
+    def describe(self, unit: str = "trials") -> str:
+        """One-line status text, e.g. '120/1000 trials | 35.1 trials/s | 2.4M rounds/s | ETA 0:25'."""
+        eta = "--:--" if self.eta is None else _format_duration(self.eta)
+        return (f"{self.done}/{self.total} {unit} | {self.units_per_sec:.1f} {unit}/s | "
+                f"{_format_count(self.rounds_per_sec)} rounds/s | ETA {eta}")
+
+
+class ProgressChannel:
+    """
+    Three shared int64 counters: finished units, rounds played (live, including units
+    still running) and rounds belonging to finished units. The difference of the last two
+    is the in-flight work used to estimate partial progress inside running trials.
+    `ctx` is the multiprocessing context of the pool the counters are handed to (default context
+    when None); a forkserver pool cannot take locks made in the default fork context.
+    `stop_event` travels to the workers with the counters: the orchestrating thread sets it on
+    Stop so tasks already running in the pool give up between trials (see compute_tasks).
+    A pool channel is reused by later runs; new_lease() numbers each run, and workers report
+    through a ChannelLease of their run's number.
+    """
+
+    def __init__(self, total: int = 0, ctx=None):
+        ctx = ctx or multiprocessing
+        self._done = ctx.Value("q", 0)
+        self._rounds = ctx.Value("q", 0)
+        self._rounds_done = ctx.Value("q", 0)
+        self.stop_event = ctx.Event()
+        self._lease = ctx.Value("q", 0)
+        self.total = total
+        self.started = time.monotonic()
+
+    @property
+    def lease_id(self) -> int:
+        return self._lease.value
+
+    def new_lease(self, total: int) -> None:
+        """Hands the channel to a new run: tasks of earlier leases stop and no longer count."""
+        with self._lease.get_lock():
+            self._lease.value += 1
+        self.reset(total)
+
+    def reset(self, total: int) -> None:
+        for v in (self._done, self._rounds, self._rounds_done):
+            with v.get_lock():
+                v.value = 0
+        self.stop_event.clear()
+        self.total = total
+        self.started = time.monotonic()
+
+    def add_rounds(self, n: int) -> None:
+        with self._rounds.get_lock():
+            self._rounds.value += n
+
+    def finish_unit(self, rounds: int = 0, count: int = 1) -> None:
+        with self._done.get_lock():
+            self._done.value += count
+        if rounds:
+            with self._rounds_done.get_lock():
+                self._rounds_done.value += rounds
+
+    def snapshot(self) -> ProgressSnapshot:
+        done = self._done.value
+        rounds = self._rounds.value
+        rounds_done = self._rounds_done.value
+        total = max(1, self.total)
+        elapsed = max(1e-9, time.monotonic() - self.started)
+
+        partial = 0.0
+        if done > 0 and rounds_done > 0:
+            partial = min(max(0, total - done), max(0, rounds - rounds_done) / (rounds_done / done))
+        progress_units = min(total, done + partial)
+        rate = progress_units / elapsed
+        eta = (total - progress_units) / rate if rate > 0 else None
+        return ProgressSnapshot(done, total, rounds, elapsed, progress_units / total,
+                                done / elapsed, rounds / elapsed, eta)
+
+
+class _LeaseStop:
+    """Stop flag of one lease: set on Stop, and for good once the channel is leased again."""
+
+    def __init__(self, channel: ProgressChannel, lease: int):
+        self._channel = channel
+        self._lease = lease
+
+    def is_set(self) -> bool:
+        return self._channel.stop_event.is_set() or self._channel.lease_id != self._lease
+
+
+class ChannelLease:
+    """
+    A worker's view of a ProgressChannel for the run that leased it as number `lease`.
+    Clearing stop_event for the next run cannot restart a task of a stopped run that is still
+    running: its stop_event stays set, and its rounds and units are dropped.
+    """
+
+    def __init__(self, channel: ProgressChannel, lease: int):
+        self.channel = channel
+        self.lease = lease
+        self.stop_event = _LeaseStop(channel, lease)
+
+    def current(self) -> bool:
+        return self.channel.lease_id == self.lease
+
+    def add_rounds(self, n: int) -> None:
+        if self.current():
+            self.channel.add_rounds(n)
+
+    def finish_unit(self, rounds: int = 0, count: int = 1) -> None:
+        if self.current():
+            self.channel.finish_unit(rounds, count)
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
+
+
+def _format_count(x: float) -> str:
+    for div, suffix in ((1e9, "G"), (1e6, "M"), (1e3, "k")):
+        if x >= div:
+            return f"{x / div:.1f}{suffix}"
+    return f"{x:.0f}"
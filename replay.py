@@ -0,0 +1,383 @@
+# Dice_Tool/replay.py
+"""
+Provably-fair replay: play the strategy on the actual rolls of a (server seed, client seed)
+pair over a nonce range, and verify recorded rolls against the seeds.
+
+Rolls follow the site's dice scheme, one roll per nonce:
+    word  = first 4 bytes (big-endian) of HMAC_SHA256(server_seed, f"{client_seed}:{nonce}:0")
+    roll  = floor(word / 2^32 * 10001) / 100          (0.00 .. 100.00)
+Rolls are kept as integer hundredths, so verification is exact. (StakeRNG in simulation_core
+is the simulator's own stream and packs many rolls into each digest; it is not used here.)
+
+The HMAC inner and outer SHA-256 states are keyed once per seed pair and copied per nonce,
+which roughly doubles the per-core rate over hmac.digest. Long ranges are split into chunks
+of NONCE_CHUNK nonces generated on a process pool and consumed in nonce order.
+
+Command line:
+    python replay.py rolls  --server S --client C --start 0 --count 1000000 [--out rolls.csv]
+    python replay.py run    --server S --client C --start 0 --count 100000 --balance 20 \\
+                            --bet-div 256 --profit-mult 50 --w 50 --l 3 --buffer 25 [--path path.csv]
+                            [--max-rounds N] [--min-bet 0.01] [--bet-decimals 8]
+    python replay.py verify --server S --client C --history bets.csv [--server-hash H]
+"""
+import argparse
+import csv
+import hashlib
+import multiprocessing
+import os
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from simulation_core import SimParams, floor_amount, quantize_bet
+
+NONCE_CHUNK = 1 << 18       # nonces per pool task
+FIRST_CHUNK = 1 << 12       # in-process chunks start small and double, so an early bust stays cheap
+PARALLEL_MIN_NONCES = 1 << 17  # below this, generating in-process beats starting a pool
+_BLOCK = 64                 # SHA-256 block size in bytes
+
+
+def _hmac_states(server_seed: str, client_seed: str):
+    """SHA-256 states after the HMAC inner pad plus f"{client_seed}:", and after the outer pad."""
+    key = server_seed.encode()
+    if len(key) > _BLOCK:
+        key = hashlib.sha256(key).digest()
+    key = key.ljust(_BLOCK, b"\0")
+    inner = hashlib.sha256(bytes(b ^ 0x36 for b in key) + f"{client_seed}:".encode())
+    outer = hashlib.sha256(bytes(b ^ 0x5C for b in key))
+    return inner, outer
+
+
+def _hundredths_range(server_seed: str, client_seed: str, start: int, count: int) -> array:
+    """Rolls of nonces start .. start + count - 1 in hundredths (0 .. 10000)."""
+    inner, outer = _hmac_states(server_seed, client_seed)
+    out = array("H", bytes(2 * max(0, count)))
+    from_bytes = int.from_bytes
+    for i in range(count):
+        h = inner.copy()
+        h.update(b"%d:0" % (start + i))
+        o = outer.copy()
+        o.update(h.digest())
+        out[i] = (from_bytes(o.digest()[:4], "big") * 10001) >> 32
+    return out
+
+
+def _hundredths_list(server_seed: str, client_seed: str, nonces: Sequence[int]) -> array:
+    """Rolls of arbitrary nonces in hundredths."""
+    inner, outer = _hmac_states(server_seed, client_seed)
+    out = array("H", bytes(2 * len(nonces)))
+    from_bytes = int.from_bytes
+    for i, nonce in enumerate(nonces):
+        h = inner.copy()
+        h.update(b"%d:0" % nonce)
+        o = outer.copy()
+        o.update(h.digest())
+        out[i] = (from_bytes(o.digest()[:4], "big") * 10001) >> 32
+    return out
+
+
+def roll_for_nonce(server_seed: str, client_seed: str, nonce: int) -> float:
+    """The dice roll of one nonce (0.00 .. 100.00)."""
+    return _hundredths_list(server_seed, client_seed, [nonce])[0] / 100
+
+
+def hash_server_seed(server_seed: str) -> str:
+    """SHA-256 hex digest of the server seed, as published before the seed is revealed."""
+    return hashlib.sha256(server_seed.encode()).hexdigest()
+
+
+def _pool_size(workers: Optional[int], nonces: int) -> int:
+    """Processes to generate the rolls of `nonces` nonces on; 0 = generate them in-process."""
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or nonces < PARALLEL_MIN_NONCES:
+        return 0
+    return min(workers, -(-nonces // NONCE_CHUNK))
+
+
+def iter_roll_chunks(server_seed: str, client_seed: str, start: int, count: int,
+                     workers: Optional[int] = None, chunk: int = NONCE_CHUNK) -> Iterator[array]:
+    """
+    Yields the rolls (hundredths) of nonces start .. start + count - 1 in order, one chunk at a
+    time. Chunks are generated on up to `workers` processes (default: all cores), at most two
+    per worker ahead of the consumer, so a replay that stops early does not pay for the rest.
+    """
+    n_workers = _pool_size(workers, count)
+    if not n_workers:
+        pos, end, size = start, start + count, min(FIRST_CHUNK, chunk)
+        while pos < end:
+            n = min(size, end - pos)
+            yield _hundredths_range(server_seed, client_seed, pos, n)
+            pos += n
+            size = min(2 * size, chunk)
+        return
+    starts = list(range(start, start + count, chunk))
+    sizes = [min(chunk, start + count - s) for s in starts]
+    ahead = 2 * n_workers
+    exe = ProcessPoolExecutor(max_workers=n_workers)
+    try:
+        pending = []
+        for s, n in zip(starts, sizes):
+            pending.append(exe.submit(_hundredths_range, server_seed, client_seed, s, n))
+            if len(pending) > ahead:
+                yield pending.pop(0).result()
+        for fut in pending:
+            yield fut.result()
+    finally:
+        exe.shutdown(wait=False, cancel_futures=True)
+
+
+def generate_rolls(server_seed: str, client_seed: str, start: int, count: int,
+                   workers: Optional[int] = None) -> array:
+    """Rolls (hundredths) of a whole nonce range as one array("H")."""
+    out = array("H")
+    for part in iter_roll_chunks(server_seed, client_seed, start, count, workers):
+        out.extend(part)
+    return out
+
+
+@dataclass
+class ReplayResult:
+    """Outcome of playing the strategy on a nonce range; `path` is the balance after every bet."""
+    start_nonce: int
+    rounds: int = 0
+    final_balance: float = 0.0
+    peak: float = 0.0
+    cycles: int = 0
+    wins: int = 0
+    losses: int = 0
+    longest_loss_streak: int = 0
+    max_drawdown: float = 0.0
+    busted: bool = False
+    bust_nonce: Optional[int] = None
+    path: array = field(default_factory=lambda: array("d"))
+
+    def stats(self) -> List[Tuple[str, str]]:
+        """(statistic, value) rows in the Calculator's results format."""
+        return [
+            ("Nonces played", f"{self.rounds} (from {self.start_nonce})"),
+            ("Final balance", f"${self.final_balance:.2f}"),
+            ("Highest balance", f"${self.peak:.2f}"),
+            ("Cycles completed", f"{self.cycles}"),
+            ("Wins / losses", f"{self.wins} / {self.losses}"),
+            ("Longest losing streak", f"{self.longest_loss_streak}"),
+            ("Max drawdown", f"${self.max_drawdown:.2f}"),
+            ("Busted", f"at nonce {self.bust_nonce}" if self.busted else "no"),
+        ]
+
+
+def replay_strategy(params: SimParams, server_seed: str, client_seed: str, start: int, count: int,
+                    workers: Optional[int] = None, record_path: bool = True) -> ReplayResult:
+    """
+    Plays the compounding reverse-martingale strategy of run_compounded_trial on nonces
+    start .. start + count - 1, one bet per nonce, until the range ends, the balance busts,
+    params.max_rounds bets are played or params.max_cycles is reached. Each profit cycle simply
+    continues on the next nonce. The bet model is the simulator's: with a minimum bet or
+    bet_decimals, bets are quantized (quantize_bet), winnings floored to bet_decimals, and the
+    replay busts once the balance cannot cover the smallest bet. params.max_seconds is not applied.
+    """
+    res = ReplayResult(start_nonce=start, final_balance=params.starting_balance, peak=params.starting_balance)
+    if params.max_rounds > 0:
+        count = min(count, params.max_rounds)
+    balance = peak = params.starting_balance
+    granular = not params.scale_invariant
+    unit = params.bet_unit
+    m = ((1 + params.w) * params.l) * params.buffer
+    threshold = 0.0 if m == 0 else max(0.0, min(1.0, (1 - 0.01) / m)) * 10000  # in hundredths
+    bet = balance / params.bet_div
+    if granular:
+        bet = quantize_bet(bet, params)
+    target = balance + bet * params.profit_mult
+    current_bet = bet
+    loss_streak = 0
+    nonce = start
+    path = res.path
+    done = balance <= 0
+    for chunk in iter_roll_chunks(server_seed, client_seed, start, count, workers):
+        if done:
+            break
+        for roll in chunk:
+            if roll < threshold:
+                if granular:
+                    balance += floor_amount(current_bet * (m - 1), params.bet_decimals)
+                    current_bet = quantize_bet(current_bet * (1 + params.w), params)
+                else:
+                    balance += current_bet * (m - 1)
+                    current_bet *= (1 + params.w)
+                loss_streak = 0
+                res.wins += 1
+            else:
+                balance -= current_bet
+                loss_streak += 1
+                res.losses += 1
+                if loss_streak > res.longest_loss_streak:
+                    res.longest_loss_streak = loss_streak
+                if loss_streak >= params.l:
+                    current_bet = bet
+                    loss_streak = 0
+            res.rounds += 1
+            if record_path:
+                path.append(balance)
+            if balance > peak:
+                peak = balance
+            elif peak - balance > res.max_drawdown:
+                res.max_drawdown = peak - balance
+            if balance <= 0 or (granular and balance < unit):
+                res.busted = True
+                res.bust_nonce = nonce
+                done = True
+                break
+            if balance >= target:
+                res.cycles += 1
+                if params.max_cycles > 0 and res.cycles >= params.max_cycles:
+                    done = True
+                    break
+                bet = balance / params.bet_div
+                if granular:
+                    bet = quantize_bet(bet, params)
+                target = balance + bet * params.profit_mult
+                current_bet = bet
+                loss_streak = 0
+            nonce += 1
+    res.final_balance = balance
+    res.peak = peak
+    return res
+
+
+@dataclass
+class VerifyReport:
+    checked: int = 0
+    mismatches: List[Tuple[int, float, float]] = field(default_factory=list)  # (nonce, recorded, expected)
+    server_seed_ok: Optional[bool] = None
+
+    @property
+    def ok(self) -> bool:
+        return not self.mismatches and self.server_seed_ok is not False
+
+
+def verify_rolls(server_seed: str, client_seed: str, records: Iterable[Tuple[int, float]],
+                 server_seed_hash: Optional[str] = None, workers: Optional[int] = None) -> VerifyReport:
+    """
+    Checks recorded (nonce, roll) pairs against the seeds; rolls are compared in whole hundredths.
+    With server_seed_hash, also checks that the revealed server seed matches the published hash.
+    Long histories are split into NONCE_CHUNK pieces checked on a process pool.
+    """
+    report = VerifyReport()
+    if server_seed_hash is not None:
+        report.server_seed_ok = hash_server_seed(server_seed) == server_seed_hash.strip().lower()
+    records = list(records)
+    nonces = [int(n) for n, _ in records]
+    pieces = [nonces[i:i + NONCE_CHUNK] for i in range(0, len(nonces), NONCE_CHUNK)]
+    n_workers = _pool_size(workers, len(nonces))
+    if not n_workers:
+        expected = [_hundredths_list(server_seed, client_seed, p) for p in pieces]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as exe:
+            expected = list(exe.map(_hundredths_list, [server_seed] * len(pieces), [client_seed] * len(pieces),
+                                    pieces))
+    i = 0
+    for part in expected:
+        for exp in part:
+            nonce, recorded = records[i]
+            if round(float(recorded) * 100) != exp:
+                report.mismatches.append((int(nonce), float(recorded), exp / 100))
+            i += 1
+    report.checked = i
+    return report
+
+
+def read_history(path: str) -> List[Tuple[int, float]]:
+    """(nonce, roll) pairs from a CSV with "nonce" and "roll" columns (or the first two columns)."""
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    if not rows:
+        return []
+    header = [c.strip().lower() for c in rows[0]]
+    if "nonce" in header and "roll" in header:
+        ni, ri = header.index("nonce"), header.index("roll")
+        rows = rows[1:]
+    else:
+        ni, ri = 0, 1
+        try:
+            int(rows[0][0])
+        except ValueError:
+            rows = rows[1:]
+    return [(int(r[ni]), float(r[ri])) for r in rows if len(r) > max(ni, ri)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dice Tools provably-fair replay and verification")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, text in (("rolls", "generate the rolls of a nonce range"),
+                       ("run", "play the strategy on a nonce range"),
+                       ("verify", "check recorded rolls against the seeds")):
+        p = sub.add_parser(name, help=text)
+        p.add_argument("--server", required=True, help="revealed server seed")
+        p.add_argument("--client", required=True, help="client seed")
+        p.add_argument("--workers", type=int, default=None, help="processes to use (default: all cores)")
+        if name in ("rolls", "run"):
+            p.add_argument("--start", type=int, default=0, help="first nonce")
+            p.add_argument("--count", type=int, required=True, help="number of nonces")
+    sub.choices["rolls"].add_argument("--out", help="write nonce,roll rows to this CSV")
+    run = sub.choices["run"]
+    run.add_argument("--balance", type=float, required=True)
+    run.add_argument("--bet-div", type=float, required=True)
+    run.add_argument("--profit-mult", type=float, required=True)
+    run.add_argument("--w", type=float, required=True, help="win increase in percent")
+    run.add_argument("--l", type=int, required=True, help="loss reset")
+    run.add_argument("--buffer", type=float, required=True, help="buffer in percent")
+    run.add_argument("--max-cycles", type=int, default=0)
+    run.add_argument("--max-rounds", type=int, default=0, help="stop after this many bets (0 = whole range)")
+    run.add_argument("--min-bet", type=float, default=0.0, help="smallest bet the site accepts")
+    run.add_argument("--bet-decimals", type=int, default=None, help="decimal places of bets and payouts")
+    run.add_argument("--path", help="write nonce,balance rows to this CSV")
+    ver = sub.choices["verify"]
+    ver.add_argument("--history", required=True, help="CSV of recorded nonce,roll pairs")
+    ver.add_argument("--server-hash", help="published SHA-256 of the server seed")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if args.command == "rolls":
+        rolls = generate_rolls(args.server, args.client, args.start, args.count, args.workers)
+        elapsed = time.perf_counter() - started
+        if args.out:
+            with open(args.out, "w", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                w.writerow(["nonce", "roll"])
+                w.writerows((args.start + i, f"{r / 100:.2f}") for i, r in enumerate(rolls))
+        else:
+            for i, r in enumerate(rolls[:20]):
+                print(f"{args.start + i}\t{r / 100:.2f}")
+        print(f"{len(rolls)} rolls in {elapsed:.2f}s ({len(rolls) / max(elapsed, 1e-9):,.0f} nonces/s)")
+    elif args.command == "run":
+        params = SimParams(args.balance, args.bet_div, args.profit_mult, args.w / 100.0, args.l,
+                           1 + args.buffer / 100.0, 1, max_rounds=args.max_rounds, max_cycles=args.max_cycles,
+                           min_bet=args.min_bet, bet_decimals=args.bet_decimals)
+        res = replay_strategy(params, args.server, args.client, args.start, args.count, args.workers,
+                              record_path=bool(args.path))
+        elapsed = time.perf_counter() - started
+        for stat, value in res.stats():
+            print(f"{stat}: {value}")
+        print(f"Replayed in {elapsed:.2f}s")
+        if args.path:
+            with open(args.path, "w", newline="", encoding="utf-8") as f:
+                w = csv.writer(f)
+                w.writerow(["nonce", "balance"])
+                w.writerows((args.start + i, f"{b:.8f}") for i, b in enumerate(res.path))
+    else:
+        report = verify_rolls(args.server, args.client, read_history(args.history),
+                              args.server_hash, args.workers)
+        if report.server_seed_ok is not None:
+            print(f"Server seed hash: {'matches' if report.server_seed_ok else 'DOES NOT MATCH'}")
+        print(f"Checked {report.checked} rolls, {len(report.mismatches)} mismatches "
+              f"({time.perf_counter() - started:.2f}s)")
+        for nonce, recorded, expected in report.mismatches[:20]:
+            print(f"  nonce {nonce}: recorded {recorded:.2f}, expected {expected:.2f}")
+        sys.exit(0 if report.ok else 1)
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
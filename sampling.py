@@ -0,0 +1,110 @@
+# Dice_Tool/sampling.py
+"""
+Space-filling samples of the optimizer's parameter box, as an alternative to the full grid.
+
+- sobol: Sobol low-discrepancy sequence (Joe-Kuo direction numbers, Gray-code order).
+  Every prefix of 2^m points puts exactly one point into each of the 2^m equal slices
+  of every axis. An optional seed applies a random digital shift.
+- lhs: Latin hypercube; each axis is cut into n equal strata and every stratum is hit once.
+
+Points are generated in the unit cube and scaled to [min, max] of each range; integer
+axes (Loss Reset) are mapped so that every integer in the range gets an equal share.
+"""
+import random
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+SAMPLING_MODES = {
+    "grid": "Full grid",
+    "sobol": "Sobol",
+    "lhs": "Latin hypercube",
+}
+
+_BITS = 32
+_SCALE = float(1 << _BITS)
+
+# (degree s, coefficient a, initial direction numbers m) for dimensions 2..8
+_JOE_KUO = [
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+]
+
+MAX_SOBOL_DIMS = len(_JOE_KUO) + 1
+
+
+def _direction_numbers(dims: int) -> List[List[int]]:
+    """V[d][k] for k = 1.._BITS (index 0 unused), scaled to _BITS-bit integers."""
+    table = [[0] + [1 << (_BITS - k) for k in range(1, _BITS + 1)]]
+    for s, a, m in _JOE_KUO[:dims - 1]:
+        v = [0] * (_BITS + 1)
+        for k in range(1, s + 1):
+            v[k] = m[k - 1] << (_BITS - k)
+        for k in range(s + 1, _BITS + 1):
+            v[k] = v[k - s] ^ (v[k - s] >> s)
+            for j in range(1, s):
+                if (a >> (s - 1 - j)) & 1:
+                    v[k] ^= v[k - j]
+        table.append(v)
+    return table
+
+
+def sobol(n: int, dims: int, seed: Optional[int] = None) -> Iterator[Tuple[float, ...]]:
+    """Lazily yields the first n points of the dims-dimensional Sobol sequence in [0, 1)."""
+    if not 1 <= dims <= MAX_SOBOL_DIMS:
+        raise ValueError(f"Sobol sampling supports 1..{MAX_SOBOL_DIMS} dimensions")
+    if n >= 1 << _BITS:
+        raise ValueError("Too many Sobol points requested")
+    v = _direction_numbers(dims)
+    shift = [0] * dims
+    if seed is not None:
+        rng = random.Random(seed)
+        shift = [rng.getrandbits(_BITS) for _ in range(dims)]
+    x = [0] * dims
+    for i in range(n):
+        if i:
+            # index of the lowest zero bit of i - 1, counted from 1
+            c = ((i - 1) ^ i).bit_length()
+            x = [x[d] ^ v[d][c] for d in range(dims)]
+        yield tuple((x[d] ^ shift[d]) / _SCALE for d in range(dims))
+
+
+def latin_hypercube(n: int, dims: int, seed: Optional[int] = None) -> Iterator[Tuple[float, ...]]:
+    """Yields n Latin-hypercube points in [0, 1): one point per stratum on every axis."""
+    rng = random.Random(seed)
+    columns = []
+    for _ in range(dims):
+        strata = list(range(n))
+        rng.shuffle(strata)
+        columns.append(strata)
+    for i in range(n):
+        yield tuple((columns[d][i] + rng.random()) / n for d in range(dims))
+
+
+def scale_point(u: Sequence[float], bounds: Sequence[Tuple[float, float]],
+                integer: Sequence[bool]) -> Tuple:
+    """Maps a unit-cube point into the box; integer axes cover lo..hi inclusive evenly."""
+    out = []
+    for x, (lo, hi), is_int in zip(u, bounds, integer):
+        if is_int:
+            lo, hi = int(round(lo)), int(round(hi))
+            out.append(min(hi, lo + int(x * (hi - lo + 1))))
+        else:
+            out.append(round(lo + x * (hi - lo), 4))
+    return tuple(out)
+
+
+def sample_box(mode: str, n: int, bounds: Sequence[Tuple[float, float]], integer: Sequence[bool],
+               seed: Optional[int] = None) -> Iterator[Tuple]:
+    """Lazily yields n points of the given sampling mode scaled to `bounds`."""
+    if mode == "sobol":
+        points = sobol(n, len(bounds), seed)
+    elif mode == "lhs":
+        points = latin_hypercube(n, len(bounds), seed)
+    else:
+        raise ValueError(f"Unknown sampling mode: {mode}")
+    for u in points:
+        yield scale_point(u, bounds, integer)
@@ -0,0 +1,107 @@
+# Dice_Tool/sensitivity.py
+"""
+Local sensitivity of a parameter set: every input is nudged by +/- a step and all points are
+simulated on common random numbers (the same seeded roll stream per trial index), so the
+differences between points reflect the parameter change rather than independent noise.
+"""
+import os
+import secrets
+import threading
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import as_completed
+
+from simulation_core import SimParams, run_many_trials, make_executor
+from sim_stats import summarize_trials
+
+SENSITIVITY_METRICS = ("Score", "Bust%", "MedianHigh")
+
+# (label, getter, setter) in the units shown in the UI
+_PARAMS = (
+    ("BetDiv", lambda p: p.bet_div, lambda p, v: replace(p, bet_div=v)),
+    ("ProfitMult", lambda p: p.profit_mult, lambda p, v: replace(p, profit_mult=v)),
+    ("W%", lambda p: p.w * 100, lambda p, v: replace(p, w=v / 100)),
+    ("L", lambda p: p.l, lambda p, v: replace(p, l=int(v))),
+    ("Buffer%", lambda p: (p.buffer - 1) * 100, lambda p, v: replace(p, buffer=1 + v / 100)),
+)
+
+
+@dataclass
+class SensitivityRow:
+    """Finite-difference sensitivities of the metrics with respect to one parameter."""
+    param: str
+    value: float
+    step: float
+    gradient: Dict[str, float]     # d metric / d param (per UI unit)
+    elasticity: Dict[str, float]   # % change in metric per % change in param
+
+
+def _evaluate_point(params: SimParams) -> Dict[str, float]:
+    st = summarize_trials(run_many_trials(params, parallel=False))
+    score = (st["median_high"] - params.starting_balance) / st["std_high"] if st["std_high"] != 0 else 0.0
+    return {"Score": score, "Bust%": st["bust_rate"], "MedianHigh": st["median_high"]}
+
+
+def perturbation_points(params: SimParams, rel_step: float = 0.05) -> List[Tuple[str, int, float, SimParams]]:
+    """
+    (param label, direction, parameter value, SimParams) for the base point (label "base")
+    and each parameter moved down (-1) and up (+1). L moves by whole losses and is never below 1.
+    """
+    points = [("base", 0, 0.0, params)]
+    for label, get, set_ in _PARAMS:
+        x = get(params)
+        if label == "L":
+            step = 1
+            candidates = [(-1, x - 1), (1, x + 1)] if x > 1 else [(1, x + 1)]
+        else:
+            step = abs(x) * rel_step or rel_step
+            candidates = [(-1, x - step), (1, x + step)]
+        for direction, value in candidates:
+            if label != "L" and label != "Buffer%" and value <= 0:
+                continue
+            points.append((label, direction, value, set_(params, value)))
+    return points
+
+
+def run_sensitivity(params: SimParams,
+                    rel_step: float = 0.05,
+                    seed: Optional[str] = None,
+                    stop_event: Optional[threading.Event] = None,
+                    max_workers: Optional[int] = None) -> Tuple[Dict[str, float], List[SensitivityRow]]:
+    """
+    Evaluates the base point and every +/- perturbation in parallel on common random numbers,
+    then returns (base metrics, one SensitivityRow per parameter). Gradients are central
+    differences where both neighbours exist and one-sided otherwise.
+    """
+    params = replace(params, seed=seed or params.seed or secrets.token_hex(16))
+    points = perturbation_points(params, rel_step)
+    values: Dict[Tuple[str, int], Tuple[float, Dict[str, float]]] = {}
+
+    workers = max_workers or min(len(points), os.cpu_count() or 1)
+    with make_executor("process", workers) as exe:
+        futures = {exe.submit(_evaluate_point, p): (label, d, x) for label, d, x, p in points}
+        for fut in as_completed(futures):
+            if stop_event and stop_event.is_set():
+                for f in futures:
+                    f.cancel()
+                break
+            label, d, x = futures[fut]
+            values[(label, d)] = (x, fut.result())
+
+    base = values.get(("base", 0), (0.0, {m: 0.0 for m in SENSITIVITY_METRICS}))[1]
+    rows = []
+    for label, get, _ in _PARAMS:
+        x0 = get(params)
+        lo = values.get((label, -1), (x0, base))
+        hi = values.get((label, 1), (x0, base))
+        dx = hi[0] - lo[0]
+        if dx == 0:
+            continue
+        gradient, elasticity = {}, {}
+        for m in SENSITIVITY_METRICS:
+            g = (hi[1][m] - lo[1][m]) / dx
+            gradient[m] = g
+            elasticity[m] = g * x0 / base[m] if base[m] else 0.0
+        rows.append(SensitivityRow(label, x0, dx / 2 if (label, -1) in values and (label, 1) in values else dx,
+                                   gradient, elasticity))
+    return base, rows
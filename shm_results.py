@@ -0,0 +1,117 @@
+# Dice_Tool/shm_results.py
+"""
+Shared-memory result transport for the process pools.
+
+The parent preallocates a structured NumPy array in `multiprocessing.shared_memory`,
+one row per trial (or per combo). Worker tasks receive the segment name and a row index,
+write their result straight into that row and return only the index, so nothing but a
+completion notice goes through the executor's pickled IPC. The parent computes stats
+and builds the results table from a view of the same memory.
+"""
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+TRIAL_DTYPE = np.dtype([
+    ("highest_balance", "f8"),
+    ("cycles", "i8"),
+    ("rounds", "i8"),
+    ("censored", "?"),
+    ("done", "?"),
+])
+
+COMBO_DTYPE = np.dtype([
+    ("StartingBalance", "f8"), ("Trials", "i8"), ("BetDiv", "f8"), ("ProfitMult", "f8"),
+    ("W%", "f8"), ("L", "i8"), ("Buffer%", "f8"), ("AvgHigh", "f8"), ("AvgHigh±", "f8"), ("StdDev", "f8"),
+    ("MaxHigh", "f8"), ("AvgCycles", "f8"), ("AvgRounds", "f8"), ("CycleSuccess%", "f8"),
+    ("CycleSuccess%±", "f8"), ("Bust%", "f8"), ("Bust%±", "f8"), ("Score", "f8"), ("Score±", "f8"),
+    ("Censored%", "f8"), ("Caps", "U24"),
+    ("done", "?"),
+])
+
+RESULT_FIELDS = tuple(name for name in COMBO_DTYPE.names if name != "done")
+
+
+class SharedResults:
+    """A structured array of `n` rows living in a named shared-memory segment (owned by the parent)."""
+
+    def __init__(self, dtype: np.dtype, n: int):
+        self.dtype = dtype
+        self.n = n
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, dtype.itemsize * n))
+        self.array = np.ndarray((n,), dtype=dtype, buffer=self.shm.buf)
+        self.array[:] = np.zeros(n, dtype=dtype)
+
+    @property
+    def handle(self) -> Tuple[str, str, int]:
+        """(segment name, dtype kind, rows) passed to worker tasks."""
+        return self.shm.name, "trial" if self.dtype == TRIAL_DTYPE else "combo", self.n
+
+    def completed(self) -> np.ndarray:
+        """Copy of the rows whose `done` flag is set (the segment is released afterwards)."""
+        return self.array[self.array["done"]].copy()
+
+    def close(self) -> None:
+        self.array = None
+        try:
+            self.shm.close()
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_attached: Dict[str, Tuple[shared_memory.SharedMemory, np.ndarray]] = {}
+
+
+def _attach(handle: Tuple[str, str, int]) -> np.ndarray:
+    """Worker side: map the parent's segment once per process and return the row view."""
+    name, kind, n = handle
+    entry = _attached.get(name)
+    if entry is None:
+        for old_shm, _ in _attached.values():
+            try:
+                old_shm.close()
+            except Exception:
+                pass
+        _attached.clear()
+        shm = shared_memory.SharedMemory(name=name)
+        dtype = TRIAL_DTYPE if kind == "trial" else COMBO_DTYPE
+        entry = (shm, np.ndarray((n,), dtype=dtype, buffer=shm.buf))
+        _attached[name] = entry
+    return entry[1]
+
+
+def write_trial(handle: Tuple[str, str, int], index: int, result: Dict) -> int:
+    arr = _attach(handle)
+    arr[index] = (result["highest_balance"], result["cycles"], result["rounds"],
+                  bool(result.get("censored", False)), True)
+    return index
+
+
+def write_combo(arr_or_handle, index: int, row: Dict) -> int:
+    """Store an optimizer result row; accepts the parent's array or a worker handle."""
+    arr = arr_or_handle if isinstance(arr_or_handle, np.ndarray) else _attach(arr_or_handle)
+    for name in RESULT_FIELDS:
+        if name in row:
+            arr[name][index] = row[name]
+    arr["done"][index] = True
+    return index
+
+
+def combo_row(arr: np.ndarray, index: int) -> Dict:
+    """One completed combo row as a plain dict of Python scalars."""
+    return {name: arr[name][index].item() for name in RESULT_FIELDS}
+
+
+def rows_to_frame(arr: np.ndarray):
+    """DataFrame over the completed combo rows (without the `done` flag)."""
+    import pandas as pd
+    done = arr[arr["done"]]
+    return pd.DataFrame({name: done[name] for name in RESULT_FIELDS})
@@ -0,0 +1,414 @@
+# Dice_Tool/sim_stats.py
+"""
+Aggregate statistics over per-trial results, shared by the simulator and the optimizer.
+Trials stopped by a round/cycle/time cap are censored: their outcome is only known
+up to the cap, so they count as "still alive" rather than as busts or failures.
+"""
+import math
+import random
+from statistics import mean, stdev, median, NormalDist
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    from shm_results import TRIAL_DTYPE
+    _HAS_NUMPY = True
+except Exception:
+    _HAS_NUMPY = False
+
+
+def trial_columns(results) -> Tuple[Sequence[float], Sequence[int], Sequence[int], Sequence[bool]]:
+    """
+    (highest_balance, cycles, rounds, censored) columns of trial results.
+    Accepts a list of result dicts or a TRIAL_DTYPE structured array; for arrays the
+    columns are views of the same memory (no copy).
+    """
+    if hasattr(results, "dtype"):
+        return results["highest_balance"], results["cycles"], results["rounds"], results["censored"]
+    return ([r["highest_balance"] for r in results], [r["cycles"] for r in results],
+            [r["rounds"] for r in results], [bool(r.get("censored", False)) for r in results])
+
+
+def concat_trials(a, b):
+    """Concatenate two batches of trial results (lists of dicts and/or structured arrays)."""
+    if not hasattr(a, "dtype") and not hasattr(b, "dtype"):
+        return list(a) + list(b)
+    parts = []
+    for part in (a, b):
+        if not hasattr(part, "dtype"):
+            part = np.array([(r["highest_balance"], r["cycles"], r["rounds"], bool(r.get("censored", False)), True)
+                             for r in part], dtype=TRIAL_DTYPE)
+        parts.append(part)
+    return np.concatenate(parts)
+
+
+def scale_trials(results, factor: float):
+    """
+    Trial results of a scale-invariant run (SimParams.scale_invariant) carried over to a starting
+    balance `factor` times larger: highest balances scale, cycles, rounds and censoring do not.
+    """
+    if hasattr(results, "dtype"):
+        scaled = results.copy()
+        scaled["highest_balance"] *= factor
+        return scaled
+    return [dict(r, highest_balance=r["highest_balance"] * factor) for r in results]
+
+
+def km_median(values: Sequence[float], censored: Sequence[bool]) -> float:
+    """
+    Kaplan-Meier median of `values` where censored entries are right-censored lower bounds.
+    Falls back to the largest observed value when survival never drops to one half.
+    """
+    n = len(values)
+    if n == 0:
+        return 0.0
+    order = sorted(range(n), key=lambda i: (values[i], censored[i]))
+    at_risk = n
+    survival = 1.0
+    i = 0
+    while i < n:
+        v = values[order[i]]
+        events = removed = 0
+        while i < n and values[order[i]] == v:
+            if not censored[order[i]]:
+                events += 1
+            removed += 1
+            i += 1
+        if events:
+            survival *= 1.0 - events / at_risk
+            if survival <= 0.5:
+                return float(v)
+        at_risk -= removed
+    return float(values[order[-1]])
+
+
+def summarize_trials(results) -> Dict[str, float]:
+    """
+    Censoring-aware summary of run_compounded_trial results.
+    - median_high: Kaplan-Meier median of highest balance (plain median when nothing is censored)
+    - cycle_success_rate: successes / (successes + observed failures); every uncensored trial
+      ends in exactly one failed cycle, so this is the per-cycle MLE under censoring
+    - avg_cycles: successes / observed failures, the geometric-mean estimate that equals the
+      plain average when no trial is censored
+    - bust_rate: first-cycle failures among trials whose first cycle finished
+    - avg_rounds: observed average (a lower bound when trials are censored)
+    `results` is a list of result dicts or a TRIAL_DTYPE array (see trial_columns).
+    """
+    n = len(results)
+    if n == 0:
+        return {"trials": 0, "median_high": 0.0, "std_high": 0.0, "max_high": 0.0, "avg_cycles": 0.0,
+                "avg_rounds": 0.0, "cycle_success_rate": 0.0, "bust_rate": 0.0, "censored_rate": 0.0}
+
+    highest, cycles, rounds, censored = trial_columns(results)
+    if _HAS_NUMPY:
+        highest = np.asarray(highest, dtype=np.float64)
+        cycles = np.asarray(cycles, dtype=np.int64)
+        censored = np.asarray(censored, dtype=bool)
+        n_censored = int(np.count_nonzero(censored))
+        successes = int(cycles.sum())
+        busts = int(np.count_nonzero((cycles == 0) & ~censored))
+        first_cycle_known = int(np.count_nonzero((cycles > 0) | ~censored))
+        if n_censored:
+            median_high = km_median(highest.tolist(), censored.tolist())
+        else:
+            median_high = float(np.median(highest))
+        std_high = float(highest.std(ddof=1)) if n > 1 else 0.0
+        max_high = float(highest.max())
+        mean_cycles = float(cycles.mean())
+        avg_rounds = float(np.asarray(rounds, dtype=np.float64).mean())
+    else:
+        n_censored = sum(censored)
+        successes = sum(cycles)
+        busts = sum(1 for c, cen in zip(cycles, censored) if c == 0 and not cen)
+        first_cycle_known = sum(1 for c, cen in zip(cycles, censored) if c > 0 or not cen)
+        median_high = km_median(highest, censored) if n_censored else median(highest)
+        std_high = stdev(highest) if n > 1 else 0.0
+        max_high = max(highest)
+        mean_cycles = mean(cycles)
+        avg_rounds = mean(rounds)
+    failures = n - n_censored
+
+    return {
+        "trials": n,
+        "median_high": median_high,
+        "std_high": std_high,
+        "max_high": max_high,
+        "avg_cycles": successes / failures if failures else mean_cycles,
+        "avg_rounds": avg_rounds,
+        "cycle_success_rate": successes / (successes + failures) * 100 if successes + failures else 0.0,
+        "bust_rate": busts / first_cycle_known * 100 if first_cycle_known else 0.0,
+        "censored_rate": n_censored / n * 100,
+    }
+
+
+PRECISION_METRICS = {
+    "median_high": "Median highest balance",
+    "bust_rate": "Bust%",
+    "score": "Score",
+}
+
+
+def z_score(confidence: float) -> float:
+    """Two-sided normal quantile for the given confidence level."""
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def _median_ci(values: List[float], z: float) -> Tuple[float, float, float]:
+    """Distribution-free order-statistic confidence interval for the median."""
+    xs = sorted(values)
+    n = len(xs)
+    half = z * math.sqrt(n) / 2
+    lo = max(0, int(math.floor(n / 2 - half)))
+    hi = min(n - 1, int(math.ceil(n / 2 + half)))
+    return median(xs), xs[lo], xs[hi]
+
+
+def _wilson_ci(k: int, n: int, z: float) -> Tuple[float, float, float]:
+    """Wilson score interval for a proportion, in percent."""
+    if n == 0:
+        return 0.0, 0.0, 100.0
+    p = k / n
+    denom = 1 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return p * 100, max(0.0, centre - half) * 100, min(1.0, centre + half) * 100
+
+
+def _score(values: Sequence[float], starting_balance: float) -> float:
+    if len(values) < 2:
+        return 0.0
+    sd = stdev(values)
+    return (median(values) - starting_balance) / sd if sd != 0 else 0.0
+
+
+def _score_ci(values: List[float], starting_balance: float, confidence: float,
+              n_boot: int = 200, seed: int = 0) -> Tuple[float, float, float]:
+    """Percentile bootstrap interval for Score = (median - start) / std dev."""
+    rng = random.Random(seed)
+    n = len(values)
+    boots = sorted(_score([values[rng.randrange(n)] for _ in range(n)], starting_balance) for _ in range(n_boot))
+    alpha = (1 - confidence) / 2
+    return (_score(values, starting_balance),
+            boots[int(alpha * (n_boot - 1))], boots[int((1 - alpha) * (n_boot - 1))])
+
+
+BOOTSTRAP_METRICS = {
+    "median_high": "Median highest balance",
+    "bust_rate": "Bust%",
+    "cycle_success_rate": "CycleSuccess%",
+    "score": "Score",
+}
+
+BOOTSTRAP_SAMPLES = 200     # resamples per interval
+BOOTSTRAP_MAX_DRAWS = 1024  # trials drawn per resample; larger runs use the m-out-of-n bootstrap
+BOOTSTRAP_BATCH = 50        # resamples per index matrix (and per task when spread over a pool)
+
+
+def _bootstrap_stats(h: "np.ndarray", c: "np.ndarray", cen: "np.ndarray", starting_balance: float) -> "np.ndarray":
+    """
+    (4, rows) array of the BOOTSTRAP_METRICS over each row of the (rows, draws) highest balance,
+    cycles and censored matrices. A metric with no defined value in a resample (e.g. Bust%
+    with no finished first cycle) is NaN.
+    """
+    rows = len(h)
+    med = np.median(h, axis=1)
+    sd = h.std(axis=1, ddof=1) if h.shape[1] > 1 else np.zeros(rows)
+    score = np.divide(med - starting_balance, sd, out=np.zeros(rows), where=sd != 0)
+    failures = np.count_nonzero(~cen, axis=1)
+    successes = c.sum(axis=1)
+    busts = np.count_nonzero((c == 0) & ~cen, axis=1)
+    known = np.count_nonzero((c > 0) | ~cen, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        success = np.where(successes + failures > 0, successes / (successes + failures) * 100, np.nan)
+        bust = np.where(known > 0, busts / known * 100, np.nan)
+    return np.vstack([med, bust, success, score])
+
+
+def bootstrap_cis(results, starting_balance: float, confidence: float = 0.95,
+                  n_boot: int = BOOTSTRAP_SAMPLES, seed: int = 0) -> Dict[str, Tuple[float, float]]:
+    """
+    Percentile bootstrap intervals {metric: (low, high)} for the BOOTSTRAP_METRICS of trial
+    results. Resamples are rows of NumPy index matrices built BOOTSTRAP_BATCH at a time.
+    Each resample draws m = min(n, BOOTSTRAP_MAX_DRAWS) trials. When m < n the spread of the
+    resampled values around the full-sample value is shrunk by sqrt(m / n) (m-out-of-n
+    bootstrap), so the cost does not grow with the number of trials.
+    Like metric_ci, censored peaks count as observed values. Without NumPy the intervals
+    fall back to metric_ci's order-statistic, Wilson and (slow) Score bootstrap intervals.
+    """
+    n = len(results)
+    if n < 2:
+        return {m: (float("nan"), float("nan")) for m in BOOTSTRAP_METRICS}
+    if not _HAS_NUMPY:
+        out = {m: metric_ci(results, m, starting_balance, confidence)[1:]
+               for m in ("median_high", "bust_rate", "score")}
+        _, cycles, _, censored = trial_columns(results)
+        successes = sum(cycles)
+        failures = sum(1 for cen in censored if not cen)
+        out["cycle_success_rate"] = _wilson_ci(successes, successes + failures, z_score(confidence))[1:]
+        return out
+
+    highest, cycles, _, censored = trial_columns(results)
+    # contiguous copies: gathering from strided structured-array columns is several times slower
+    highest = np.ascontiguousarray(highest, dtype=np.float64)
+    cycles = np.ascontiguousarray(cycles, dtype=np.int64)
+    censored = np.ascontiguousarray(censored, dtype=bool)
+    m = min(n, BOOTSTRAP_MAX_DRAWS)
+    full = _bootstrap_stats(highest[None, :], cycles[None, :], censored[None, :], starting_balance)[:, 0]
+
+    seeds = np.random.SeedSequence(seed).spawn(-(-n_boot // BOOTSTRAP_BATCH))
+    sizes = [min(BOOTSTRAP_BATCH, n_boot - i * BOOTSTRAP_BATCH) for i in range(len(seeds))]
+
+    def batch(seed_seq, size):
+        idx = np.random.default_rng(seed_seq).integers(0, n, size=(size, m), dtype=np.int32 if n < 2 ** 31 else np.int64)
+        return _bootstrap_stats(highest[idx], cycles[idx], censored[idx], starting_balance)
+
+    boots = np.hstack([batch(s, k) for s, k in zip(seeds, sizes)])
+
+    alpha = (1 - confidence) / 2
+    shrink = math.sqrt(m / n)
+    out = {}
+    for k, metric in enumerate(BOOTSTRAP_METRICS):
+        vals = boots[k][np.isfinite(boots[k])]
+        if len(vals) == 0 or not np.isfinite(full[k]):
+            out[metric] = (float("nan"), float("nan"))
+            continue
+        lo, hi = np.quantile(vals, [alpha, 1 - alpha])
+        out[metric] = (float(full[k] + shrink * (lo - full[k])), float(full[k] + shrink * (hi - full[k])))
+    return out
+
+
+def metric_ci(results, metric: str, starting_balance: float,
+              confidence: float = 0.95) -> Tuple[float, float, float]:
+    """
+    Returns (estimate, ci_low, ci_high) of a precision metric over trial results.
+    Censored peaks are treated as observed values here; with heavy censoring the interval
+    describes the capped peak distribution.
+    """
+    z = z_score(confidence)
+    highest, cycles, _, censored = trial_columns(results)
+    if metric == "bust_rate":
+        busts = sum(1 for c, cen in zip(cycles, censored) if c == 0 and not cen)
+        known = sum(1 for c, cen in zip(cycles, censored) if c > 0 or not cen)
+        return _wilson_ci(busts, known, z)
+    values = [float(v) for v in highest]
+    if len(values) < 2:
+        v = values[0] if values else 0.0
+        return (v, float("-inf"), float("inf")) if metric == "median_high" else (0.0, float("-inf"), float("inf"))
+    if metric == "median_high":
+        return _median_ci(values, z)
+    if metric == "score":
+        return _score_ci(values, starting_balance, confidence)
+    raise ValueError(f"Unknown precision metric: {metric}")
+
+
+def ks_2samp(a: Sequence[float], b: Sequence[float]) -> Tuple[float, float]:
+    """
+    Two-sample Kolmogorov-Smirnov test: (D, p) where D is the largest gap between the empirical
+    distribution functions of a and b and p its asymptotic p-value. Ties (round counts, capped
+    peaks) make the test conservative.
+    """
+    xs, ys = sorted(float(v) for v in a), sorted(float(v) for v in b)
+    n, m = len(xs), len(ys)
+    if n == 0 or m == 0:
+        return 0.0, 1.0
+    i = j = 0
+    d = 0.0
+    while i < n and j < m:
+        x = min(xs[i], ys[j])
+        while i < n and xs[i] <= x:
+            i += 1
+        while j < m and ys[j] <= x:
+            j += 1
+        d = max(d, abs(i / n - j / m))
+    en = math.sqrt(n * m / (n + m))
+    return d, _kolmogorov_sf((en + 0.12 + 0.11 / en) * d)
+
+
+def _kolmogorov_sf(lam: float) -> float:
+    """P(K > lam) of the Kolmogorov distribution."""
+    if lam < 0.2:
+        return 1.0
+    total = 0.0
+    for k in range(1, 101):
+        term = 2 * (-1) ** (k - 1) * math.exp(-2 * k * k * lam * lam)
+        total += term
+        if abs(term) < 1e-12:
+            break
+    return min(1.0, max(0.0, total))
+
+
+def chi2_2samp(a: Sequence[int], b: Sequence[int], min_expected: float = 5.0) -> Tuple[float, float, int]:
+    """
+    Chi-square test that two samples of counts (e.g. cycles per trial) share one distribution:
+    (statistic, p, degrees of freedom). Neighbouring values are pooled until every bin expects
+    at least `min_expected` entries from each sample.
+    """
+    n, m = len(a), len(b)
+    if n == 0 or m == 0:
+        return 0.0, 1.0, 0
+    count_a: Dict[int, int] = {}
+    count_b: Dict[int, int] = {}
+    for v in a:
+        count_a[int(v)] = count_a.get(int(v), 0) + 1
+    for v in b:
+        count_b[int(v)] = count_b.get(int(v), 0) + 1
+    share = min(n, m) / (n + m)
+    bins: List[List[int]] = []
+    open_bin = [0, 0]
+    for v in sorted(set(count_a) | set(count_b)):
+        open_bin[0] += count_a.get(v, 0)
+        open_bin[1] += count_b.get(v, 0)
+        if (open_bin[0] + open_bin[1]) * share >= min_expected:
+            bins.append(open_bin)
+            open_bin = [0, 0]
+    if open_bin[0] + open_bin[1]:
+        if bins:
+            bins[-1] = [bins[-1][0] + open_bin[0], bins[-1][1] + open_bin[1]]
+        else:
+            bins.append(open_bin)
+    if len(bins) < 2:
+        return 0.0, 1.0, 0
+    stat = 0.0
+    for obs_a, obs_b in bins:
+        total = obs_a + obs_b
+        exp_a, exp_b = total * n / (n + m), total * m / (n + m)
+        stat += (obs_a - exp_a) ** 2 / exp_a + (obs_b - exp_b) ** 2 / exp_b
+    dof = len(bins) - 1
+    return stat, _gamma_q(dof / 2, stat / 2), dof
+
+
+def _gamma_q(s: float, x: float) -> float:
+    """Regularized upper incomplete gamma function Q(s, x), the chi-square survival function."""
+    if x <= 0:
+        return 1.0
+    log_prefix = s * math.log(x) - x - math.lgamma(s)
+    if x < s + 1:
+        # series for P(s, x)
+        term = total = 1.0 / s
+        k = s
+        for _ in range(500):
+            k += 1
+            term *= x / k
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_prefix))
+    # continued fraction for Q(s, x) (modified Lentz)
+    tiny = 1e-300
+    b = x + 1 - s
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 500):
+        an = -i * (i - s)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return min(1.0, math.exp(log_prefix) * h)
@@ -1,21 +1,47 @@
 # Dice_Tool/simulation_core.py
 import os
 import hmac
+import struct
 import secrets
 from hashlib import sha256
-from dataclasses import dataclass
-from typing import List, Dict, Callable, Optional, Tuple
+from dataclasses import dataclass, replace
+from typing import List, Dict, Callable, Optional, Tuple, Union
 import threading
-from statistics import mean, stdev, median
-from concurrent.futures import ProcessPoolExecutor, as_completed
+import time
+import math
+import random
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from sim_stats import summarize_trials, metric_ci, z_score, concat_trials
+from progress import ProgressChannel
 
 
 try:
     import numpy as np
+    from shm_results import SharedResults, TRIAL_DTYPE, write_trial
     _HAS_NUMPY = True
 except Exception:
     _HAS_NUMPY = False
 
+ENGINES = {
+    "scalar": "Scalar (one trial at a time)",
+    "vector": "Vectorized (NumPy lock-step)",
+    "fixed": "Fixed-point (exact integer units)",
+}
+LOCKSTEP_ENGINES = ("vector", "fixed")   # engines that run trials as lanes of one NumPy pass
+
+# Trial results: a list of run_compounded_trial dicts, or a TRIAL_DTYPE structured array with
+# the same field names; sim_stats accepts either.
+TrialResults = Union[List[Dict[str, float]], "np.ndarray"]
+
+EXECUTORS = {
+    "auto": "Auto (by engine)",
+    "thread": "Threads",
+    "process": "Processes",
+}
+
+VECTOR_CHUNK_TRIALS = 64   # fewer trials than this per chunk are not worth another thread/process
+MAX_BET_DECIMALS = 12      # finest bet granularity accepted (bet_decimals)
+
 @dataclass
 class SimParams:
     """Parameters for a single simulation run."""
@@ -26,6 +52,51 @@ class SimParams:
     l: int    
     buffer: float 
     n_trials: int = 1  
+    max_rounds: int = 0      # 0 = no cap; trials hitting a cap are reported as censored
+    max_cycles: int = 0
+    max_seconds: float = 0.0
+    seed: Optional[str] = None   # when set, trial i replays the fixed stream (seed, "trial-i")
+    engine: str = "scalar"       # "vector" / "fixed": trials run as lanes of one vector_engine / fixed_point pass
+    strategy: Optional["Strategy"] = None  # strategy.Strategy replacing bet_div..buffer; always vector
+    min_bet: float = 0.0                 # smallest bet the site accepts; 0 = any amount
+    bet_decimals: Optional[int] = None   # bets and payouts floored to this many decimals (e.g. 8); None = exact
+    rounding: str = "floor"              # "fixed" engine: rounding of products (fixed_point.ROUNDING_MODES)
+
+    def __post_init__(self):
+        if self.min_bet < 0:
+            raise ValueError("min_bet must not be negative")
+        if self.bet_decimals is not None and not 0 <= self.bet_decimals <= MAX_BET_DECIMALS:
+            raise ValueError(f"bet_decimals must be between 0 and {MAX_BET_DECIMALS}")
+
+    @property
+    def scale_invariant(self) -> bool:
+        """
+        True without a minimum bet or rounding: every balance and bet is then proportional to
+        starting_balance, so trials at one starting balance rescale to any other (see
+        sim_stats.scale_trials) and round, cycle and bust counts do not depend on it.
+        """
+        return self.min_bet <= 0 and self.bet_decimals is None
+
+    @property
+    def bet_unit(self) -> float:
+        """Smallest bet that can be placed: min_bet, or one unit of the last decimal; 0 when exact."""
+        unit = 10.0 ** -self.bet_decimals if self.bet_decimals is not None else 0.0
+        return max(self.min_bet, unit)
+
+    @property
+    def has_caps(self) -> bool:
+        return self.max_rounds > 0 or self.max_cycles > 0 or self.max_seconds > 0
+
+    def caps_label(self) -> str:
+        """Short description of the active horizon caps, e.g. 'R:100000 C:50 T:2s'."""
+        parts = []
+        if self.max_rounds > 0:
+            parts.append(f"R:{self.max_rounds}")
+        if self.max_cycles > 0:
+            parts.append(f"C:{self.max_cycles}")
+        if self.max_seconds > 0:
+            parts.append(f"T:{self.max_seconds:g}s")
+        return " ".join(parts) if parts else "none"
 
 class StakeRNG:
     """
@@ -40,28 +111,28 @@ class StakeRNG:
         self.server_seed = server_seed or secrets.token_hex(32)
         self.client_seed = client_seed or secrets.token_hex(32)
         self.nonce = nonce
-        self._byte_iter = self._byte_generator()
-        self._cache: List[int] = []
-
-    def _byte_generator(self):
-        """Yield bytes deterministically from HMAC_SHA256(server_seed, f'{client_seed}:{nonce}:{round}')."""
-        round_idx = 0
-        while True:
-            msg = f"{self.client_seed}:{self.nonce}:{round_idx}".encode()
-            h = hmac.new(self.server_seed.encode(), msg, sha256)
-            buffer = h.digest()
-            for b in buffer:
-                yield b
-            round_idx += 1
+        self._key = self.server_seed.encode()
+        self._round = 0
+        self._cache = bytearray()
 
     def _ensure_bytes(self, n: int):
-        """Ensure there are at least n bytes in the cache."""
+        """
+        Ensure there are at least n bytes in the cache, appending whole
+        HMAC_SHA256(server_seed, f'{client_seed}:{nonce}:{round}') digests. Each digest is
+        computed only when needed and reads the nonce current at that time.
+        """
         while len(self._cache) < n:
-            try:
-                self._cache.append(next(self._byte_iter))
-            except StopIteration:
-                self._byte_iter = self._byte_generator()
-                self._cache.append(next(self._byte_iter))
+            msg = f"{self.client_seed}:{self.nonce}:{self._round}".encode()
+            self._cache += hmac.digest(self._key, msg, sha256)
+            self._round += 1
+
+    def _take_words(self, count: int) -> bytes:
+        needed_bytes = count * 4
+        self._ensure_bytes(needed_bytes)
+        words = bytes(self._cache[:needed_bytes])
+        del self._cache[:needed_bytes]
+        self.nonce += count
+        return words
 
     def next_roll_batch(self, count: int) -> List[float]:
         """
@@ -72,32 +143,100 @@ class StakeRNG:
         """
         if count <= 0:
             return []
-        needed_bytes = count * 4
-        self._ensure_bytes(needed_bytes)
-        floats = []
-        for i in range(count):
-            chunk = self._cache[i*4:(i+1)*4]
-            result = sum(value / (256 ** (j + 1)) for j, value in enumerate(chunk))
-            roll = result * 10001 / 100
-            floats.append(roll)
-        del self._cache[:needed_bytes]
-        self.nonce += count
-        return floats
+        # b0/256 + b1/256^2 + b2/256^3 + b3/256^4 is exactly the big-endian word / 2^32
+        words = struct.unpack(f">{count}I", self._take_words(count))
+        return [x / 4294967296 * 10001 / 100 for x in words]
+
+    def next_roll_array(self, count: int) -> "np.ndarray":
+        """next_roll_batch as a float64 NumPy array (same values, same stream position)."""
+        words = np.frombuffer(self._take_words(max(0, count)), dtype=">u4").astype(np.float64)
+        return words / 4294967296 * 10001 / 100
+
+# per thread, so a thread pool's channel (and its stop flag) never reaches the UI thread or
+# the threads of another run
+_worker_local = threading.local()
+
+def set_worker_progress(channel: Optional[ProgressChannel]) -> None:
+    """Pool initializer: trials run by the calling worker thread report rounds to `channel`."""
+    _worker_local.progress = channel
+
+def worker_progress() -> Optional[ProgressChannel]:
+    """The progress channel installed in this worker thread by set_worker_progress, if any."""
+    return getattr(_worker_local, "progress", None)
 
-def run_compounded_trial(params: SimParams, batch_size: int = 1024) -> Dict[str, float]:
+def resolve_executor(engine: str, executor: str = "auto") -> str:
+    """
+    "thread" or "process". Auto picks threads for the lock-step engines, whose time is spent in
+    NumPy calls that release the GIL, and processes for the pure-Python scalar engine.
+    """
+    if executor in ("thread", "process"):
+        return executor
+    return "thread" if engine in LOCKSTEP_ENGINES and _HAS_NUMPY else "process"
+
+def make_executor(kind: str, max_workers: int, progress: Optional[ProgressChannel] = None) -> Executor:
+    """
+    Thread or process pool whose workers report rounds to `progress` (see set_worker_progress;
+    in a thread pool only the pool's own threads do).
+    Process runs borrow the app's warm worker_pool when it is running and `progress` is None or
+    one of its leased channels; otherwise a new pool is started for the run.
+    """
+    pool_kwargs = {"initializer": set_worker_progress, "initargs": (progress,)} if progress else {}
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=max_workers, **pool_kwargs)
+    from worker_pool import leased_executor   # imports this module, so not at the top
+    exe = leased_executor(progress)
+    if exe is not None:
+        return exe
+    return ProcessPoolExecutor(max_workers=max_workers, **pool_kwargs)
+
+def floor_amount(x, decimals: Optional[int]):
+    """Amount (float or NumPy array) floored to `decimals` places, as a site settles it; x when None."""
+    if decimals is None:
+        return x
+    scale = 10.0 ** decimals
+    # the tiny offset keeps amounts that are exact in decimal (0.29 * 1e8 = 28999999.999...) from dropping a unit
+    if _HAS_NUMPY and isinstance(x, np.ndarray):
+        return np.floor(x * scale + 1e-6) / scale
+    return math.floor(x * scale + 1e-6) / scale
+
+def quantize_bet(x, params: SimParams):
+    """Bet (float or NumPy array) as the site accepts it: floored to bet_decimals, at least bet_unit."""
+    x = floor_amount(x, params.bet_decimals)
+    if _HAS_NUMPY and isinstance(x, np.ndarray):
+        return np.maximum(x, params.bet_unit)
+    return max(x, params.bet_unit)
+
+def run_compounded_trial(params: SimParams, batch_size: int = 1024,
+                         progress: Optional[ProgressChannel] = None,
+                         trial_index: int = 0) -> Dict[str, float]:
     """
     Runs a single compounded trial simulation preserving Stake logic.
     Uses StakeRNG.next_roll_batch to fetch rolls in batches for efficiency.
-    Returns {"highest_balance": float, "cycles": int, "rounds": int}
+    The trial stops early (censored=True) when max_rounds, max_cycles or max_seconds is reached.
+    Rounds played are added to `progress` (or the worker's channel) once per roll batch.
+    With params.seed set, the roll stream is fixed by (seed, trial_index), so different
+    parameter sets can be compared on common random numbers.
+    With a minimum bet or bet_decimals, bets are quantized (quantize_bet), winnings are floored
+    to bet_decimals and the trial busts once the balance cannot cover the smallest bet.
+    Returns {"highest_balance": float, "cycles": int, "rounds": int, "censored": bool}
     """
-    rng = StakeRNG()  
+    rng = StakeRNG(params.seed, f"trial-{trial_index}") if params.seed else StakeRNG()
     balance = params.starting_balance
     peak = balance
     cycles = 0
     rounds = 0
+    censored = False
+    max_rounds = params.max_rounds if params.max_rounds > 0 else None
+    deadline = time.monotonic() + params.max_seconds if params.max_seconds > 0 else None
+    progress = progress or worker_progress()
+    reported = 0
+    granular = not params.scale_invariant
+    unit = params.bet_unit
 
     while balance > 0:
         bet = balance / params.bet_div
+        if granular:
+            bet = quantize_bet(bet, params)
         profit_stop = bet * params.profit_mult
         target = balance + profit_stop
         m = ((1 + params.w) * params.l) * params.buffer
@@ -111,7 +250,16 @@ def run_compounded_trial(params: SimParams, batch_size: int = 1024) -> Dict[str,
         batch: List[float] = []
         idx = 0
         while balance > 0 and balance < target:
+            if max_rounds is not None and rounds >= max_rounds:
+                censored = True
+                break
             if idx >= len(batch):
+                if progress is not None and rounds > reported:
+                    progress.add_rounds(rounds - reported)
+                    reported = rounds
+                if deadline is not None and time.monotonic() >= deadline:
+                    censored = True
+                    break
                 batch = rng.next_roll_batch(batch_size)
                 idx = 0
                 if not batch:
@@ -121,8 +269,12 @@ def run_compounded_trial(params: SimParams, batch_size: int = 1024) -> Dict[str,
 
             rounds += 1
             if roll < win_chance * 100:
-                balance += current_bet * (m - 1)
-                current_bet *= (1 + params.w)
+                if granular:
+                    balance += floor_amount(current_bet * (m - 1), params.bet_decimals)
+                    current_bet = quantize_bet(current_bet * (1 + params.w), params)
+                else:
+                    balance += current_bet * (m - 1)
+                    current_bet *= (1 + params.w)
                 loss_streak = 0
             else:
                 balance -= current_bet
@@ -133,59 +285,201 @@ def run_compounded_trial(params: SimParams, batch_size: int = 1024) -> Dict[str,
 
             if balance > peak:
                 peak = balance
+            if granular and balance < unit:
+                break   # cannot place even the smallest bet: bust
 
-        if balance < target:
+        if censored or balance < target:
             break
         cycles += 1
+        if params.max_cycles > 0 and cycles >= params.max_cycles:
+            censored = True
+            break
+
+    if progress is not None and rounds > reported:
+        progress.add_rounds(rounds - reported)
+    return {"highest_balance": peak, "cycles": cycles, "rounds": rounds, "censored": censored}
 
-    return {"highest_balance": peak, "cycles": cycles, "rounds": rounds}
+def _trial_into_shared(handle, index: int, params: SimParams) -> int:
+    """Worker task: run one trial and write it into row `index` of the parent's shared array."""
+    return write_trial(handle, index, run_compounded_trial(params, trial_index=index))
 
 def run_many_trials(params: SimParams,
                     stop_event: Optional[threading.Event] = None,
                     progress_callback: Optional[Callable[[int, int], None]] = None,
-                    parallel: bool = True) -> List[Dict[str, float]]:
+                    parallel: bool = True,
+                    progress: Optional[ProgressChannel] = None,
+                    executor: str = "auto") -> TrialResults:
     """
-    Run multiple trials and return the list of results.
+    Run multiple trials and return their results (see TrialResults): a list of result dicts
+    from the sequential and thread-pool scalar paths, a TRIAL_DTYPE array from the process
+    pool (with NumPy) and the vector / fixed engines.
     - parallel: if True, uses ProcessPoolExecutor to parallelize independent trials.
       If False, runs sequentially in current process (used by optimizer workers to avoid oversubscription).
     - progress_callback(done, total) is called as trials complete.
+    - progress: shared counters; workers add rounds in place and each finished trial is marked
+      on it, so the UI can sample progress without per-trial messages.
+    In parallel mode with NumPy available, workers write into a shared-memory TRIAL_DTYPE array
+    and only their row index comes back over IPC; the completed rows are returned as that
+    structured array (same field names, accepted by sim_stats) instead of a list of dicts.
     - stop_event if set will prevent further submissions. Already-started worker processes cannot be forcibly killed here.
+    - executor: "auto", "thread" or "process" pool for the parallel path (see resolve_executor).
+      Threads start in milliseconds; processes pay spawn and import cost but sidestep the GIL.
+    With params.engine == "vector" the trials run as lock-step lanes (vector_engine), split into
+    chunks of at least VECTOR_CHUNK_TRIALS per worker; a run that fits one chunk needs no pool.
+    "fixed" runs the same way on the integer kernel of fixed_point.
+    A params.strategy always runs on the vector engine, which executes its compiled rule table.
     """
     results: List[Dict[str, float]] = []
     total = max(1, params.n_trials)
+    if params.strategy is not None:
+        if not _HAS_NUMPY:
+            raise ValueError("Custom strategies need NumPy (vector engine)")
+        params = replace(params, engine="vector")
+    kind = resolve_executor(params.engine, executor)
+
+    if params.engine in LOCKSTEP_ENGINES and _HAS_NUMPY:
+        return _run_vector_chunks(params, stop_event, progress_callback, parallel, progress, kind)
 
     if not parallel or params.n_trials <= 1:
         for i in range(params.n_trials):
             if stop_event and stop_event.is_set():
                 break
-            r = run_compounded_trial(params)
+            r = run_compounded_trial(params, progress=progress, trial_index=i)
             results.append(r)
+            if progress:
+                progress.finish_unit(r["rounds"])
             if progress_callback:
                 progress_callback(i + 1, params.n_trials)
         return results
 
     cpu_count = os.cpu_count() or 1
     max_workers = min(cpu_count, params.n_trials,  max(1, cpu_count))
-    futures = []
-    with ProcessPoolExecutor(max_workers=max_workers) as exe:
-        submitted = 0
-        for _ in range(params.n_trials):
-            if stop_event and stop_event.is_set():
-                break
-            futures.append(exe.submit(run_compounded_trial, params))
-            submitted += 1
-        done_count = 0
-        for fut in as_completed(futures):
-            try:
-                res = fut.result()
-            except Exception:
-                res = {"highest_balance": 0.0, "cycles": 0, "rounds": 0}
-            results.append(res)
-            done_count += 1
-            if progress_callback:
-                progress_callback(done_count, submitted)
-            if stop_event and stop_event.is_set():
-                break
+    futures = {}
+    # threads share the parent's memory, so results come back directly
+    shared = SharedResults(TRIAL_DTYPE, params.n_trials) if _HAS_NUMPY and kind == "process" else None
+    try:
+        with make_executor(kind, max_workers, progress) as exe:
+            submitted = 0
+            for i in range(params.n_trials):
+                if stop_event and stop_event.is_set():
+                    break
+                if shared is not None:
+                    futures[exe.submit(_trial_into_shared, shared.handle, i, params)] = i
+                else:
+                    # mp.Value counters cannot be pickled per task; processes use the initializer's copy
+                    futures[exe.submit(run_compounded_trial, params, 1024,
+                                       progress if kind == "thread" else None, i)] = i
+                submitted += 1
+            done_count = 0
+            for fut in as_completed(futures):
+                i = futures[fut]
+                try:
+                    res = fut.result()
+                except Exception:
+                    res = {"highest_balance": 0.0, "cycles": 0, "rounds": 0, "censored": False}
+                    if shared is not None:
+                        shared.array[i] = (0.0, 0, 0, False, True)
+                if shared is None:
+                    results.append(res)
+                done_count += 1
+                if progress:
+                    progress.finish_unit(int(shared.array["rounds"][i]) if shared is not None else res["rounds"])
+                if progress_callback:
+                    progress_callback(done_count, submitted)
+                if stop_event and stop_event.is_set():
+                    break
+        if shared is not None:
+            return shared.completed()
+    finally:
+        if shared is not None:
+            shared.close()
+    return results
+
+def _vector_chunk(params: SimParams, first_trial: int, stop_event: Optional[threading.Event] = None,
+                  progress: Optional[ProgressChannel] = None):
+    """Worker task: trials first_trial.. of a lock-step run (stop_event only works in threads)."""
+    if params.engine == "fixed":
+        from fixed_point import run_trials_fixed as run_trials
+    else:
+        from vector_engine import run_trials_vectorized as run_trials
+    return run_trials(params, progress or worker_progress(), first_trial, stop_event)
+
+def _run_vector_chunks(params: SimParams, stop_event, progress_callback, parallel: bool,
+                       progress: Optional[ProgressChannel], kind: str):
+    """Lock-step path of run_many_trials; returns a TRIAL_DTYPE array in trial order."""
+    n = max(0, params.n_trials)
+    workers = min(os.cpu_count() or 1, max(1, n // VECTOR_CHUNK_TRIALS)) if parallel else 1
+    bounds = [(n * k // workers, n * (k + 1) // workers) for k in range(workers)]
+    if not params.seed:
+        # one seed for all chunks keeps trial streams distinct across chunks
+        params = replace(params, seed=secrets.token_hex(16))
+    chunks = [None] * len(bounds)
+    done = 0
+
+    if len(bounds) == 1:
+        chunks[0] = _vector_chunk(params, 0, stop_event, progress)
+    else:
+        with make_executor(kind, len(bounds), progress) as exe:
+            extra = (stop_event, progress) if kind == "thread" else ()
+            futures = {exe.submit(_vector_chunk, replace(params, n_trials=hi - lo), lo, *extra): k
+                       for k, (lo, hi) in enumerate(bounds)}
+            for fut in as_completed(futures):
+                k = futures[fut]
+                chunks[k] = fut.result()
+                if progress:
+                    progress.finish_unit(int(chunks[k]["rounds"].sum()), count=len(chunks[k]))
+                done += len(chunks[k])
+                if progress_callback:
+                    progress_callback(done, n)
+        return np.concatenate(chunks)
+    if progress:
+        progress.finish_unit(int(chunks[0]["rounds"].sum()), count=len(chunks[0]))
+    if progress_callback:
+        progress_callback(len(chunks[0]), n)
+    return chunks[0]
+
+def run_until_precision(params: SimParams,
+                        metric: str,
+                        ci_width: float,
+                        batch_size: int = 0,
+                        confidence: float = 0.95,
+                        stop_event: Optional[threading.Event] = None,
+                        progress_callback: Optional[Callable[[int, int], None]] = None,
+                        interim_callback: Optional[Callable[[int, float, float, float], None]] = None,
+                        parallel: bool = True,
+                        progress: Optional[ProgressChannel] = None,
+                        executor: str = "auto") -> TrialResults:
+    """
+    Sequential stopping: runs trials in batches until the confidence interval of `metric`
+    (see sim_stats.PRECISION_METRICS) is at most `ci_width` wide, or params.n_trials trials have run.
+    - ci_width is in the metric's own units (dollars, Bust percentage points, Score units).
+    - interim_callback(trials_done, estimate, ci_low, ci_high) is called after every batch.
+    - progress_callback(done, max_trials) mirrors run_many_trials.
+    Returns the trial results (TrialResults), like run_many_trials.
+    """
+    max_trials = max(1, params.n_trials)
+    if batch_size <= 0:
+        batch_size = max(10, 2 * (os.cpu_count() or 1)) if parallel else 10
+    results = []
+    while len(results) < max_trials:
+        if stop_event and stop_event.is_set():
+            break
+        n = min(batch_size, max_trials - len(results))
+        done_before = len(results)
+        # Seeded runs get a distinct stream family per batch so trial indices never repeat.
+        batch_params = replace(params, n_trials=n,
+                               seed=f"{params.seed}/{done_before}" if params.seed else None)
+        cb = (lambda d, t: progress_callback(done_before + d, max_trials)) if progress_callback else None
+        results = concat_trials(results, run_many_trials(batch_params, stop_event=stop_event, progress_callback=cb,
+                                                         parallel=parallel, progress=progress,
+                                                         executor=executor))
+        if len(results) < 2:
+            continue
+        est, lo, hi = metric_ci(results, metric, params.starting_balance, confidence)
+        if interim_callback:
+            interim_callback(len(results), est, lo, hi)
+        if hi - lo <= ci_width:
+            break
     return results
 
 def run_trials_collect_stats(params: SimParams,
@@ -196,28 +490,249 @@ def run_trials_collect_stats(params: SimParams,
     Returns tuple:
       (avg_high, std_high, max_high, avg_cycles, avg_rounds, cycle_success_rate, bust_rate)
     parallel: forwarded to run_many_trials to control internal parallelism (optimizer uses parallel=False).
+    See sim_stats.summarize_trials for how censored (capped) trials are counted.
     """
-    results = run_many_trials(params, stop_event=stop_event, progress_callback=None, parallel=parallel)
+    st = summarize_trials(run_many_trials(params, stop_event=stop_event, progress_callback=None, parallel=parallel))
+    return (st["median_high"], st["std_high"], st["max_high"], st["avg_cycles"], st["avg_rounds"],
+            st["cycle_success_rate"], st["bust_rate"])
 
-    highest_list = [r["highest_balance"] for r in results]
-    cycles_list = [r["cycles"] for r in results]
-    rounds_list = [r["rounds"] for r in results]
-    successes = sum(cycles_list)
-    attempts = len(results) + successes
+IS_TILTS = (1.0, 0.97, 0.93, 0.85, 0.7, 0.5, 0.3)   # candidate win-probability factors; 1.0 = plain MC
+IS_PILOT_SAMPLES = 1000      # pilot cycles per candidate tilt
+IS_MIN_ESS_FRACTION = 0.3    # failures whose weights are worth fewer effective failures are too uneven to trust
+IS_MAX_WEIGHT_BIAS = 0.1     # the likelihood ratios must average 1 within this (heavy tails drag it down)
+IS_MIN_GAIN = 2.0            # a tilt must beat plain MC's pilot cost by this factor to be used
+IS_COMMON_FAILURES = 10      # this many failures in the plain pilot: not rare, tilts are not tried
 
-    if _HAS_NUMPY and highest_list:
-        arr = np.array(highest_list, dtype=np.float64)
-        avg_high = float(np.median(arr))
-        std_high = float(arr.std(ddof=1)) if arr.size > 1 else 0.0
-        max_high = float(arr.max())
-    else:
-        avg_high = mean(highest_list) if highest_list else 0.0
-        std_high = stdev(highest_list) if len(highest_list) > 1 else 0.0
-        max_high = max(highest_list) if highest_list else 0.0
 
-    avg_cycles = mean(cycles_list) if cycles_list else 0.0
-    avg_rounds = mean(rounds_list) if rounds_list else 0.0
-    cycle_success_rate = (successes / attempts * 100) if attempts > 0 else 0.0
-    bust_rate = (sum(1 for c in cycles_list if c == 0) / params.n_trials * 100) if params.n_trials > 0 else 0.0
+@dataclass
+class RareEventEstimate:
+    """Importance-sampling estimate of a per-cycle probability and its confidence interval."""
+    probability: float
+    std_error: float
+    ci_low: float
+    ci_high: float
+    samples: int
+    rounds: int
+    tilt: float
+    ess_fraction: float = 1.0    # effective number of failures (by their weights) / failures sampled
+
+    @property
+    def rel_error(self) -> float:
+        return self.std_error / self.probability if self.probability > 0 else float("inf")
+
+
+class _ISTally:
+    """Running sums of one importance-sampling run and its weight diagnostics."""
+
+    def __init__(self):
+        self.n = self.rounds = self.failures = 0
+        self.total = self.total_sq = 0.0
+        self.w_sum = 0.0
+
+    def add(self, x: float, rounds: int, w: float) -> None:
+        self.n += 1
+        self.rounds += rounds
+        if x > 0:
+            self.failures += 1
+            self.total += x
+            self.total_sq += x * x
+        self.w_sum += w
+
+    @property
+    def estimate(self) -> float:
+        return self.total / self.n if self.n else 0.0
 
-    return avg_high, std_high, max_high, avg_cycles, avg_rounds, cycle_success_rate, bust_rate
+    @property
+    def std_error(self) -> float:
+        if self.n < 2:
+            return 0.0
+        est = self.estimate
+        return math.sqrt(max(self.total_sq / self.n - est * est, 0.0) / self.n)
+
+    @property
+    def ess_fraction(self) -> float:
+        """(sum of failure weights)^2 / sum of their squares, per failure sampled; 1 = equal weights."""
+        return self.total * self.total / (self.total_sq * self.failures) if self.failures else 0.0
+
+    def weights_ok(self) -> bool:
+        """
+        Whether the likelihood ratios behave: they must average 1, and the failures must not owe
+        the estimate to a few of their number. Tilts with heavy-tailed ratios fail this long
+        before their standard error shows it: the rare huge weights that would correct the
+        estimate have simply not been drawn yet, so it comes out too low with a tight interval.
+        """
+        if self.n == 0:
+            return False
+        return (abs(self.w_sum / self.n - 1.0) <= IS_MAX_WEIGHT_BIAS
+                and self.ess_fraction >= IS_MIN_ESS_FRACTION)
+
+
+def _roll_win_probability(params: SimParams) -> Tuple[float, float]:
+    """
+    Returns (m, p) where p is the exact probability that a StakeRNG roll is a win.
+    Rolls are f * 10001 / 100 with f uniform on [0, 1), so P(roll < x) = x * 100 / 10001.
+    """
+    m = ((1 + params.w) * params.l) * params.buffer
+    if m == 0:
+        return m, 0.0
+    win_chance = max(0.0, min(1.0, (1 - 0.01) / m))
+    return m, min(1.0, win_chance * 100 * 100 / 10001)
+
+
+def _tilted_cycle(params: SimParams, m: float, p: float, q: float, rng: random.Random) -> Tuple[float, int, float]:
+    """
+    Plays one cycle in normalised units (balance 1) drawing wins with probability q instead of p.
+    Every cycle is scale-invariant (bet, target and stop all scale with balance), so this
+    is the per-cycle failure event of run_compounded_trial.
+    Returns (likelihood-ratio weighted failure indicator, rounds played, likelihood ratio).
+    """
+    balance = 1.0
+    bet = balance / params.bet_div
+    target = balance + bet * params.profit_mult
+    log_win = math.log(p / q)
+    log_loss = math.log((1 - p) / (1 - q))
+    log_w = 0.0
+    current_bet = bet
+    loss_streak = 0
+    rounds = 0
+    while balance > 0 and balance < target:
+        rounds += 1
+        if rng.random() < q:
+            balance += current_bet * (m - 1)
+            current_bet *= (1 + params.w)
+            loss_streak = 0
+            log_w += log_win
+        else:
+            balance -= current_bet
+            loss_streak += 1
+            if loss_streak >= params.l:
+                current_bet = bet
+                loss_streak = 0
+            log_w += log_loss
+    w = math.exp(log_w)
+    return (w if balance < target else 0.0), rounds, w
+
+
+def _choose_tilt(params: SimParams, m: float, p: float, rng: random.Random,
+                 pilot: int) -> Tuple[float, _ISTally, int]:
+    """
+    Pick the loss tilt (q = p * tilt) with the lowest work-normalised variance in a pilot of
+    `pilot` cycles per candidate. Long cycles accumulate likelihood ratios over many rounds, so
+    strong tilts only pay off when the failure path is short. Candidates whose weights fail
+    _ISTally.weights_ok are dropped, and a tilt has to beat plain Monte Carlo (tilt 1.0) by
+    IS_MIN_GAIN, since pilot variances of a few failures are themselves noisy. When plain Monte
+    Carlo alone sees IS_COMMON_FAILURES failures the event is not rare and no tilt is tried.
+    Returns (tilt, the pilot samples of that tilt, rounds of the other candidates' pilots).
+    """
+    tallies: Dict[float, _ISTally] = {}
+    costs: Dict[float, float] = {}
+    for tilt in IS_TILTS:
+        q = p * tilt
+        if q <= 0 or q >= 1:
+            continue
+        tally = tallies[tilt] = _ISTally()
+        for _ in range(pilot):
+            tally.add(*_tilted_cycle(params, m, p, q, rng))
+        est = tally.estimate
+        if est > 0 and (tilt == 1.0 or tally.weights_ok()):
+            costs[tilt] = (tally.std_error / est) ** 2 * tally.rounds   # relative variance x work
+        if tilt == 1.0 and tally.total >= IS_COMMON_FAILURES:
+            break
+    best = 1.0
+    plain_cost = costs.get(1.0, float("inf"))
+    tilted = [t for t in costs if t != 1.0]
+    if tilted:
+        candidate = min(tilted, key=costs.get)
+        if costs[candidate] * IS_MIN_GAIN <= plain_cost:
+            best = candidate
+    other_rounds = sum(t.rounds for tilt, t in tallies.items() if tilt != best)
+    return best, tallies.get(best, _ISTally()), other_rounds
+
+
+def estimate_cycle_failure(params: SimParams,
+                           tilt: Optional[float] = None,
+                           target_rel_error: float = 0.05,
+                           max_samples: int = 200000,
+                           batch: int = 500,
+                           confidence: float = 0.95,
+                           seed: Optional[int] = None,
+                           stop_event: Optional[threading.Event] = None,
+                           pilot: int = IS_PILOT_SAMPLES) -> RareEventEstimate:
+    """
+    Rare-event estimate of the probability that a cycle busts before its profit stop.
+    Rolls are tilted towards losses (win probability p * tilt) and each sample is reweighted
+    by its likelihood ratio, so the estimate stays unbiased while the rare long loss streaks
+    are sampled often. tilt=None picks one from a pilot of `pilot` cycles per candidate tilt;
+    the chosen tilt's pilot cycles count as samples and every pilot round counts in `rounds`.
+    Batches are drawn until the relative standard error drops below target_rel_error.
+    A tilted run whose weights stop passing the diagnostics (see _ISTally.weights_ok) is
+    discarded and continues as plain Monte Carlo; its rounds still count in `rounds`.
+    This probability is the expectation of Bust% (first cycle fails) and one minus CycleSuccess%.
+    """
+    rng = random.Random(seed)
+    m, p = _roll_win_probability(params)
+    z = z_score(confidence)
+    if p <= 0.0 or p >= 1.0 or params.bet_div <= 0:
+        prob = 1.0 if p <= 0.0 else 0.0
+        return RareEventEstimate(prob, 0.0, prob, prob, 0, 0, 1.0)
+
+    tally, discarded_rounds = _ISTally(), 0
+    if tilt is None:
+        tilt, tally, discarded_rounds = _choose_tilt(params, m, p, rng, pilot)
+    q = min(max(p * tilt, 1e-12), 1 - 1e-12)
+
+    while tally.n < max_samples:
+        if stop_event and stop_event.is_set():
+            break
+        for _ in range(min(batch, max_samples - tally.n)):
+            tally.add(*_tilted_cycle(params, m, p, q, rng))
+        if tilt != 1.0 and tally.n >= 2 * batch and not tally.weights_ok():
+            discarded_rounds += tally.rounds
+            tilt, q, tally = 1.0, p, _ISTally()
+            continue
+        est = tally.estimate
+        if est > 0 and tally.n >= 2 * batch and tally.std_error / est <= target_rel_error:
+            break
+    est, se = tally.estimate, tally.std_error
+    return RareEventEstimate(est, se, max(0.0, est - z * se), min(1.0, est + z * se), tally.n,
+                             tally.rounds + discarded_rounds, tilt, tally.ess_fraction)
+
+
+def estimate_tail_risk(params: SimParams, **kwargs) -> Dict[str, RareEventEstimate]:
+    """
+    Bust% and CycleSuccess% (as probabilities) from a single importance-sampled failure estimate.
+    Cycles are independent and identically distributed, so CycleSuccess = 1 - P(cycle fails)
+    and Bust = P(first cycle fails).
+    """
+    fail = estimate_cycle_failure(params, **kwargs)
+    success = RareEventEstimate(1.0 - fail.probability, fail.std_error,
+                                1.0 - fail.ci_high, 1.0 - fail.ci_low,
+                                fail.samples, fail.rounds, fail.tilt, fail.ess_fraction)
+    return {"bust": fail, "cycle_success": success}
+
+
+PREVIEW_TRIALS = 16
+PREVIEW_MAX_ROUNDS = 5000
+PREVIEW_IS_SAMPLES = 300
+
+
+def quick_preview(params: SimParams, stop_event: Optional[threading.Event] = None) -> Optional[Dict[str, float]]:
+    """
+    Cheap risk estimate for the Calculator's live preview, sized to finish in well under a second.
+    - bust: per-cycle failure probability from a short estimate_cycle_failure run (with CI)
+    - median_high: censoring-aware median peak of a few trials capped at PREVIEW_MAX_ROUNDS rounds
+    Returns None as soon as stop_event is set, so superseded previews are dropped without finishing.
+    """
+    bust = estimate_cycle_failure(params, tilt=1.0, target_rel_error=0.2, max_samples=PREVIEW_IS_SAMPLES,
+                                  batch=50, stop_event=stop_event)
+    if stop_event and stop_event.is_set():
+        return None
+    capped = replace(params, n_trials=PREVIEW_TRIALS, max_rounds=PREVIEW_MAX_ROUNDS, max_cycles=0, max_seconds=0.0)
+    results = []
+    for _ in range(PREVIEW_TRIALS):
+        if stop_event and stop_event.is_set():
+            return None
+        results.append(run_compounded_trial(capped))
+    st = summarize_trials(results)
+    return {"bust": bust.probability, "bust_low": bust.ci_low, "bust_high": bust.ci_high,
+            "median_high": st["median_high"], "censored_rate": st["censored_rate"]}
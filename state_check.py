@@ -0,0 +1,91 @@
+# Dice_Tool/state_check.py
+"""
+Check that the optimizer rows of a saved state file are shown after it is loaded.
+
+Older versions saved the Results tab as {"cols": [...], "rows": [[display strings]]}; on load
+those rows are migrated into the results store (ResultsTab.insert_rows). This replays that
+migration without a window: the rows of --state (default: a built-in sample in the old format)
+are converted with rows_from_display, appended to an in-memory ResultsStore, paged back and
+formatted with ResultsTab.format_row, as the table shows them. Every row must come back, and
+every value the file held must display as it was saved.
+The exit status is 1 when any row fails.
+
+    python state_check.py [--state ~/.dice_tool_state.json]
+"""
+import argparse
+import math
+import sys
+from typing import List, Optional
+
+from ui.results_store import LEGACY_COLUMNS, RESULT_COLUMNS, ResultsStore, rows_from_display
+from ui.results_tab import ResultsTab
+from ui.state_manager import load_state
+
+SAMPLE_STATE = {
+    "results": {
+        "cols": list(LEGACY_COLUMNS),
+        "rows": [
+            ["20.00", "100", "1.50", "1.30", "30.00", "4", "2.00", "35.12", "8.40", "61.00",
+             "3.10", "412.50", "71.00", "12.00", "24.83"],
+            ["50.00", "250", "2.00", "1.25", "50.00", "3", "0.00", "58.90", "15.02", "140.25",
+             "1.95", "220.10", "55.60", "31.20", "9.47"],
+            ["20.00", "100", "1.20", "1.10", "10.00", "8", "0.00", "nan", "nan", "nan",
+             "nan", "nan", "nan", "nan", "nan"],
+        ],
+    },
+}
+
+
+def _same(shown: str, saved: str) -> bool:
+    """Whether a displayed value matches the saved display string (numerically when both parse)."""
+    try:
+        a, b = float(shown), float(saved)
+    except ValueError:
+        return shown == saved
+    return (math.isnan(a) and math.isnan(b)) or a == b
+
+
+def check_state(state: dict) -> List[str]:
+    """Failures of migrating the result rows of `state`; empty when every row shows as saved."""
+    results = state.get("results", {})
+    if not isinstance(results, dict):
+        return []
+    rows, cols = results.get("rows", []), results.get("cols")
+    store = ResultsStore(":memory:")
+    try:
+        store.append(rows_from_display(rows, cols))
+        if store.count() != len(rows):
+            return [f"{store.count()} of {len(rows)} rows stored"]
+        failures = []
+        for n, (saved, (_, row)) in enumerate(zip(rows, store.page(0, len(rows)))):
+            try:
+                shown = dict(zip(RESULT_COLUMNS, ResultsTab.format_row(row)))
+            except (TypeError, ValueError) as exc:
+                failures.append(f"row {n}: not displayable ({exc})")
+                continue
+            names = cols or (LEGACY_COLUMNS if len(saved) == len(LEGACY_COLUMNS) else list(RESULT_COLUMNS))
+            for col, value in zip(names, saved):
+                if col in shown and not _same(shown[col], str(value)):
+                    failures.append(f"row {n}: {col} shows {shown[col]!r}, saved {value!r}")
+        return failures
+    finally:
+        store.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check that saved optimizer rows are shown after loading.")
+    parser.add_argument("--state", help="state file to check (default: a built-in sample in the old format)")
+    args = parser.parse_args(argv)
+
+    state = load_state(args.state) if args.state else SAMPLE_STATE
+    results = state.get("results", {})
+    n_rows = len(results.get("rows", [])) if isinstance(results, dict) else 0
+    failures = check_state(state)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{n_rows} saved rows, {len(failures)} failures")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
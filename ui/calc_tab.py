@@ -2,12 +2,16 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import List, Tuple
-from simulation_core import SimParams
+from simulation_core import SimParams, quick_preview, ENGINES
+from sim_stats import PRECISION_METRICS
 from .widgets import ToolTip
 import threading
+from dataclasses import replace
 from http.server import HTTPServer, BaseHTTPRequestHandler
 import json
 
+PREVIEW_DEBOUNCE_MS = 400
+
 
 def make_handler(calc_tab):
     class CustomHandler(BaseHTTPRequestHandler):
@@ -69,11 +73,24 @@ class CalculatorTab(ttk.Frame):
         self.profit_mult_var = tk.StringVar(value="100")
         self.buffer_var = tk.StringVar(value="25")
         self.n_trials_var = tk.StringVar(value="100")
+        self.rare_event_var = tk.BooleanVar(value=False)
+        self.max_rounds_var = tk.StringVar(value="0")
+        self.max_cycles_var = tk.StringVar(value="0")
+        self.max_seconds_var = tk.StringVar(value="0")
+        self.ci_metric_var = tk.StringVar(value=PRECISION_METRICS["median_high"])
+        self.ci_width_var = tk.StringVar(value="0")
+        self.engine_var = tk.StringVar(value=ENGINES["scalar"])
 
         self.multiplier_var = tk.StringVar()
         self.bet_size_var = tk.StringVar()
         self.profit_stop_var = tk.StringVar()
         self.balance_target_var = tk.StringVar()
+        self.preview_var = tk.StringVar(value="")
+        self.live_preview_var = tk.BooleanVar(value=True)
+
+        self._preview_after_id = None
+        self._preview_cancel = None
+        self._preview_generation = 0
 
         self.all_entries = []
 
@@ -137,6 +154,15 @@ class CalculatorTab(ttk.Frame):
             )
             copy_btn.grid(row=i, column=2, sticky="ew", padx=8, pady=5)
 
+        preview_chk = ttk.Checkbutton(frame, text="Live preview", variable=self.live_preview_var,
+                                      command=self.calculate_values)
+        preview_chk.grid(row=len(rows), column=0, sticky="w", padx=12, pady=(5, 0))
+        ToolTip(preview_chk, "After you stop typing, run a quick background estimate of the bust "
+                             "probability and median peak for the current inputs")
+        ttk.Label(frame, textvariable=self.preview_var, wraplength=260, justify="left").grid(
+            row=len(rows) + 1, column=0, columnspan=3, sticky="w", padx=12, pady=(0, 5)
+        )
+
         frame.configure(
             relief="sunken",
             font="-family {Times New Roman} -size 12 -weight bold -slant italic -underline 1",
@@ -262,6 +288,52 @@ class CalculatorTab(ttk.Frame):
         )
         self.sim_progress.grid(row=1, column=1, columnspan=3, sticky="ew", padx=12, pady=4)
 
+        self.sim_status_label = ttk.Label(frame, text="Idle", anchor="center")
+        self.sim_status_label.grid(row=5, column=0, columnspan=4, sticky="ew", padx=12, pady=(0, 4))
+
+        rare_chk = ttk.Checkbutton(
+            frame, text="Rare-event Bust% (importance sampling)", variable=self.rare_event_var
+        )
+        rare_chk.grid(row=2, column=0, columnspan=4, padx=12, pady=(0, 4), sticky="w")
+        ToolTip(rare_chk, "Also estimate Bust% and Cycle success with confidence intervals using "
+                          "loss-tilted rolls reweighted by likelihood ratios")
+
+        caps_frame = ttk.Frame(frame)
+        caps_frame.grid(row=3, column=0, columnspan=4, padx=12, pady=(0, 4), sticky="ew")
+        caps = [
+            ("Max Rounds:", self.max_rounds_var, "Stop each trial after this many rolls (0 = no cap)"),
+            ("Max Cycles:", self.max_cycles_var, "Stop each trial after this many successful cycles (0 = no cap)"),
+            ("Max Seconds:", self.max_seconds_var, "Stop each trial after this much wall time (0 = no cap)"),
+        ]
+        for i, (text, var, tip) in enumerate(caps):
+            caps_frame.columnconfigure(i * 2 + 1, weight=1)
+            ttk.Label(caps_frame, text=text).grid(row=0, column=i * 2, padx=(0, 4), sticky="e")
+            entry = ttk.Entry(caps_frame, textvariable=var, width=7)
+            entry.grid(row=0, column=i * 2 + 1, padx=(0, 10), sticky="ew")
+            self.all_entries.append(entry)
+            ToolTip(entry, tip)
+
+        precision_frame = ttk.Frame(frame)
+        precision_frame.grid(row=4, column=0, columnspan=4, padx=12, pady=(0, 4), sticky="ew")
+        precision_frame.columnconfigure(1, weight=1)
+        ttk.Label(precision_frame, text="Precision Target:").grid(row=0, column=0, padx=(0, 4), sticky="e")
+        metric_combo = ttk.Combobox(precision_frame, textvariable=self.ci_metric_var,
+                                    values=list(PRECISION_METRICS.values()), state="readonly", width=22)
+        metric_combo.grid(row=0, column=1, padx=(0, 10), sticky="ew")
+        ttk.Label(precision_frame, text="CI Width:").grid(row=0, column=2, padx=(0, 4), sticky="e")
+        width_entry = ttk.Entry(precision_frame, textvariable=self.ci_width_var, width=7)
+        width_entry.grid(row=0, column=3, sticky="ew")
+        self.all_entries.append(width_entry)
+        ToolTip(width_entry, "Keep running trials in batches until the 95% confidence interval of the chosen "
+                             "metric is this narrow. Trials becomes the maximum. 0 = off")
+        ttk.Label(precision_frame, text="Engine:").grid(row=1, column=0, padx=(0, 4), pady=(4, 0), sticky="e")
+        engine_combo = ttk.Combobox(precision_frame, textvariable=self.engine_var,
+                                    values=list(ENGINES.values()), state="readonly", width=22)
+        engine_combo.grid(row=1, column=1, padx=(0, 10), pady=(4, 0), sticky="ew")
+        ToolTip(engine_combo, "Vectorized plays all trials side by side in NumPy on threads, so runs "
+                              "start instantly; Scalar plays them one by one in worker processes; "
+                              "Fixed-point is Vectorized with balances in exact whole currency units")
+
         frame.configure(relief="sunken")
         frame.configure(
             font="-family {Times New Roman} -size 12 -weight bold -slant italic -underline 1"
@@ -283,12 +355,14 @@ class CalculatorTab(ttk.Frame):
         frame.columnconfigure(0, weight=1)
 
         self.sim_tree = ttk.Treeview(
-            frame, columns=("Stat", "Value"), show="headings", height=8
+            frame, columns=("Stat", "Value", "CI"), show="headings", height=8
         )
         self.sim_tree.heading("Stat", text="Statistic")
         self.sim_tree.heading("Value", text="Value")
+        self.sim_tree.heading("CI", text="95% CI (bootstrap)")
         self.sim_tree.column("Stat", width=200, anchor="w")
         self.sim_tree.column("Value", width=150, anchor="center")
+        self.sim_tree.column("CI", width=180, anchor="center")
         self.sim_tree.grid(row=0, column=0, sticky="nsew")
 
         scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self.sim_tree.yview)
@@ -332,7 +406,10 @@ class CalculatorTab(ttk.Frame):
             self.bet_size_var.set(f"{bet_size:.4f}")
             self.profit_stop_var.set(f"{profit_stop:.2f}")
             self.balance_target_var.set(f"{balance_target:.2f}")
+            self._schedule_preview()
         except Exception:
+            self._cancel_preview()
+            self.preview_var.set("")
             for var in [
                 self.multiplier_var,
                 self.bet_size_var,
@@ -341,6 +418,67 @@ class CalculatorTab(ttk.Frame):
             ]:
                 var.set("Invalid")
 
+    def _cancel_preview(self):
+        """Drop the pending debounce timer and tell any running preview to stop."""
+        if self._preview_after_id is not None:
+            self.after_cancel(self._preview_after_id)
+            self._preview_after_id = None
+        if self._preview_cancel is not None:
+            self._preview_cancel.set()
+            self._preview_cancel = None
+        self._preview_generation += 1
+
+    def _schedule_preview(self):
+        self._cancel_preview()
+        if not self.live_preview_var.get():
+            self.preview_var.set("")
+            return
+        self.preview_var.set("Preview: waiting...")
+        self._preview_after_id = self.after(PREVIEW_DEBOUNCE_MS, self._start_preview)
+
+    def _start_preview(self):
+        self._preview_after_id = None
+        try:
+            params = replace(self.get_sim_params(), n_trials=1)
+        except (ValueError, tk.TclError):
+            return
+        if params.starting_balance <= 0 or params.bet_div <= 0 or params.l <= 0:
+            return
+        generation = self._preview_generation
+        cancel = threading.Event()
+        self._preview_cancel = cancel
+        self.preview_var.set("Preview: estimating...")
+
+        def worker():
+            try:
+                res = quick_preview(params, stop_event=cancel)
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                if not cancel.is_set():
+                    self.after(0, lambda: self._show_preview_error(generation, error))
+                return
+            if res is not None and not cancel.is_set():
+                self.after(0, lambda: self._show_preview(generation, res))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _show_preview(self, generation: int, res: dict):
+        if generation != self._preview_generation:
+            return
+        self._preview_cancel = None
+        text = (f"Preview: bust ~{res['bust'] * 100:.1f}% "
+                f"[{res['bust_low'] * 100:.1f}-{res['bust_high'] * 100:.1f}], "
+                f"median peak ~${res['median_high']:.2f}")
+        if res["censored_rate"] > 0:
+            text += f" ({res['censored_rate']:.0f}% of preview trials capped)"
+        self.preview_var.set(text)
+
+    def _show_preview_error(self, generation: int, error: str):
+        if generation != self._preview_generation:
+            return
+        self._preview_cancel = None
+        self.preview_var.set(f"Preview unavailable: {error}")
+
     def right_click_menu(self, event, entry):
         menu = tk.Menu(self, tearoff=0)
         menu.add_command(
@@ -387,6 +525,11 @@ class CalculatorTab(ttk.Frame):
             "repeat the process.",
         )
 
+    def get_precision_target(self) -> Tuple[str, float]:
+        """Returns (metric key, CI width); width 0 means run exactly n_trials."""
+        metric = next((k for k, v in PRECISION_METRICS.items() if v == self.ci_metric_var.get()), "median_high")
+        return metric, float(self.ci_width_var.get() or 0)
+
     def get_sim_params(self) -> SimParams:
         return SimParams(
             starting_balance=float(self.balance_var.get()),
@@ -396,13 +539,19 @@ class CalculatorTab(ttk.Frame):
             l=int(self.l_var.get()),
             buffer=1 + float(self.buffer_var.get()) / 100.0,
             n_trials=int(self.n_trials_var.get()),
+            max_rounds=int(self.max_rounds_var.get() or 0),
+            max_cycles=int(self.max_cycles_var.get() or 0),
+            max_seconds=float(self.max_seconds_var.get() or 0),
+            engine=next((k for k, v in ENGINES.items() if v == self.engine_var.get()), "scalar"),
         )
 
-    def display_sim_results(self, stats: List[Tuple[str, str]]):
+    def display_sim_results(self, stats: List[Tuple[str, ...]]):
+        """Rows of (statistic, value) or (statistic, value, confidence interval)."""
         for item in self.sim_tree.get_children():
             self.sim_tree.delete(item)
-        for stat, value in stats:
-            self.sim_tree.insert("", "end", values=(stat, value))
+        for row in stats:
+            stat, value, ci = (tuple(row) + ("",))[:3]
+            self.sim_tree.insert("", "end", values=(stat, value, ci))
 
     def toggle_server(self):
         if self.server:
@@ -0,0 +1,184 @@
+# Dice_Tool/ui/heatmap_window.py
+"""
+Heatmap of optimizer results: one metric aggregated over two chosen parameter axes.
+
+The grids come from heatmap.PivotCache, which the Results tab keeps current as rows stream
+in, so a redraw never reads the results store. The canvas items are kept between redraws and
+only recoloured while the axes and window size stay the same; streamed batches are coalesced
+into one redraw per REDRAW_DELAY_MS.
+"""
+import time
+import tkinter as tk
+from tkinter import ttk
+from typing import Optional
+
+import numpy as np
+
+from heatmap import AGGREGATES, HEATMAP_AXES, HEATMAP_METRICS, PALETTE, PivotCache, PivotGrid, higher_is_better
+from ui.widgets import ToolTip
+
+REDRAW_DELAY_MS = 250
+CANVAS_BG = "#1e1e1e"
+TEXT_FG = "#dddddd"
+MARGIN_LEFT, MARGIN_TOP, MARGIN_RIGHT, MARGIN_BOTTOM = 70, 15, 15, 60
+MIN_LABEL_PX = 36           # axis labels closer than this are thinned out
+LEGEND_WIDTH, LEGEND_HEIGHT = 160, 10
+
+
+def _label(value: float) -> str:
+    return f"{value:g}" if abs(value) < 1e6 else f"{value:.3g}"
+
+
+class HeatmapWindow(tk.Toplevel):
+    def __init__(self, parent, cache: PivotCache):
+        super().__init__(parent)
+        self.title("Results Heatmap")
+        self.geometry("760x560")
+        self.cache = cache
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+
+        controls = ttk.Frame(self)
+        controls.grid(row=0, column=0, sticky="ew", padx=10, pady=(10, 5))
+        self.x_var = tk.StringVar(value=HEATMAP_AXES[0])
+        self.y_var = tk.StringVar(value=HEATMAP_AXES[1])
+        self.metric_var = tk.StringVar(value=HEATMAP_METRICS[0])
+        self.aggregate_var = tk.StringVar(value=AGGREGATES[0])
+        for col, (text, var, values, tip) in enumerate((
+                ("X Axis", self.x_var, HEATMAP_AXES, "Parameter along the horizontal axis"),
+                ("Y Axis", self.y_var, HEATMAP_AXES, "Parameter along the vertical axis"),
+                ("Metric", self.metric_var, HEATMAP_METRICS, "Result column that colours the cells"),
+                ("Aggregate", self.aggregate_var, AGGREGATES,
+                 "How the rows of a cell (every value of the other parameters) are combined"))):
+            ttk.Label(controls, text=text).grid(row=0, column=2 * col, sticky="w", padx=(0 if col == 0 else 10, 4))
+            combo = ttk.Combobox(controls, textvariable=var, values=list(values), state="readonly", width=15)
+            combo.grid(row=0, column=2 * col + 1, sticky="w")
+            combo.bind("<<ComboboxSelected>>", lambda e: self.redraw())
+            ToolTip(combo, tip)
+
+        self.canvas = tk.Canvas(self, background=CANVAS_BG, highlightthickness=0)
+        self.canvas.grid(row=1, column=0, sticky="nsew", padx=10)
+        self.canvas.bind("<Configure>", lambda e: self.schedule_redraw())
+        self.canvas.bind("<Motion>", self._on_motion)
+        self.canvas.bind("<Leave>", lambda e: self.hover_label.config(text=""))
+
+        self.hover_label = ttk.Label(self, text="", anchor="w")
+        self.hover_label.grid(row=2, column=0, sticky="ew", padx=10, pady=(5, 0))
+        self.info_label = ttk.Label(self, text="", anchor="w")
+        self.info_label.grid(row=3, column=0, sticky="ew", padx=10, pady=(0, 10))
+
+        self._pending: Optional[str] = None
+        self._layout = None         # what the canvas items were built for
+        self._items = np.zeros((0, 0), dtype=np.int64)
+        self._colors: Optional[np.ndarray] = None
+        self._grid: Optional[PivotGrid] = None
+        self._geometry = (0.0, 0.0, 1.0, 1.0)   # left, top, cell width, cell height
+        self._legend_text = (None, None)
+
+    def schedule_redraw(self):
+        """Redraws once after REDRAW_DELAY_MS, however many times this is called before then."""
+        if self._pending is None:
+            self._pending = self.after(REDRAW_DELAY_MS, self.redraw)
+
+    def redraw(self):
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+            self._pending = None
+        started = time.perf_counter()
+        x, y, metric, aggregate = self.x_var.get(), self.y_var.get(), self.metric_var.get(), self.aggregate_var.get()
+        if x == y:
+            self._reset("Choose two different axes.")
+            return
+        pivot = self.cache.get(x, y, metric)
+        grid = pivot.grid(aggregate)
+        if grid.values.size == 0:
+            self._reset("No results yet.")
+            return
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        layout = (x, y, grid.x_values.tobytes(), grid.y_values.tobytes(), width, height)
+        if layout != self._layout:
+            self._build(grid, width, height)
+            self._layout = layout
+        better_high = higher_is_better(metric, aggregate)
+        colors = grid.colors(better_high)
+        changed = np.ones(colors.shape, dtype=bool) if self._colors is None else colors != self._colors
+        for i, j in zip(*np.nonzero(changed)):
+            self.canvas.itemconfigure(int(self._items[i, j]), fill=colors[i, j])
+        self._colors = colors
+        self._grid = grid
+
+        finite = grid.values[np.isfinite(grid.values)]
+        low, high = (finite.min(), finite.max()) if len(finite) else (float("nan"), float("nan"))
+        dark, bright = (low, high) if better_high else (high, low)
+        self.canvas.itemconfigure(self._legend_text[0], text=f"{dark:.4g}")
+        self.canvas.itemconfigure(self._legend_text[1], text=f"{bright:.4g}")
+        ny, nx = grid.values.shape
+        self.info_label.config(
+            text=f"{aggregate} {metric} of {pivot.rows:,} rows in {nx} x {ny} cells; "
+                 f"drawn in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    def _reset(self, message: str):
+        self.canvas.delete("all")
+        self._layout, self._colors, self._grid = None, None, None
+        self._items = np.zeros((0, 0), dtype=np.int64)
+        self.info_label.config(text=message)
+
+    def _build(self, grid: PivotGrid, width: int, height: int):
+        """Creates one rectangle per cell plus axis labels and the colour legend."""
+        c = self.canvas
+        c.delete("all")
+        ny, nx = grid.values.shape
+        left, top = MARGIN_LEFT, MARGIN_TOP
+        cw = max(1.0, (width - MARGIN_LEFT - MARGIN_RIGHT) / nx)
+        ch = max(1.0, (height - MARGIN_TOP - MARGIN_BOTTOM) / ny)
+        self._geometry = (left, top, cw, ch)
+        items = np.empty((ny, nx), dtype=np.int64)
+        for i in range(ny):
+            y0 = top + (ny - 1 - i) * ch        # largest y value at the top
+            for j in range(nx):
+                x0 = left + j * cw
+                items[i, j] = c.create_rectangle(x0, y0, x0 + cw, y0 + ch, width=0)
+        self._items = items
+        self._colors = None
+
+        x_step = max(1, int(np.ceil(MIN_LABEL_PX / cw)))
+        bottom = top + ny * ch
+        for j in range(0, nx, x_step):
+            c.create_text(left + (j + 0.5) * cw, bottom + 4, text=_label(grid.x_values[j]),
+                          anchor="n", fill=TEXT_FG)
+        y_step = max(1, int(np.ceil(16 / ch)))
+        for i in range(0, ny, y_step):
+            c.create_text(left - 6, top + (ny - 0.5 - i) * ch, text=_label(grid.y_values[i]),
+                          anchor="e", fill=TEXT_FG)
+        c.create_text(left + nx * cw / 2, bottom + 22, text=self.x_var.get(), anchor="n", fill=TEXT_FG)
+        c.create_text(12, top + ny * ch / 2, text=self.y_var.get(), angle=90, fill=TEXT_FG)
+
+        legend_y = bottom + 42
+        legend_x = left + nx * cw - LEGEND_WIDTH
+        step = LEGEND_WIDTH / len(PALETTE)
+        for k, color in enumerate(PALETTE):
+            c.create_rectangle(legend_x + k * step, legend_y, legend_x + (k + 1) * step, legend_y + LEGEND_HEIGHT,
+                               width=0, fill=color)
+        self._legend_text = (
+            c.create_text(legend_x - 6, legend_y + LEGEND_HEIGHT / 2, anchor="e", fill=TEXT_FG),
+            c.create_text(legend_x + LEGEND_WIDTH + 6, legend_y + LEGEND_HEIGHT / 2, anchor="w", fill=TEXT_FG),
+        )
+
+    def _on_motion(self, event):
+        grid = self._grid
+        if grid is None:
+            return
+        left, top, cw, ch = self._geometry
+        ny, nx = grid.values.shape
+        j = int((event.x - left) // cw)
+        i = ny - 1 - int((event.y - top) // ch)
+        if not (0 <= j < nx and 0 <= i < ny):
+            self.hover_label.config(text="")
+            return
+        value, rows = grid.values[i, j], int(grid.counts[i, j])
+        where = f"{self.x_var.get()} {_label(grid.x_values[j])}, {self.y_var.get()} {_label(grid.y_values[i])}"
+        if rows == 0:
+            self.hover_label.config(text=f"{where}: no rows")
+        else:
+            self.hover_label.config(
+                text=f"{where}: {self.aggregate_var.get()} {self.metric_var.get()} {value:.4g} over {rows:,} rows")
@@ -3,12 +3,19 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import queue
 import threading
-from typing import List, Tuple
-from statistics import mean, stdev, median
+import time
+from typing import Dict, List, Tuple
 import traceback
+from dataclasses import replace
 
-from simulation_core import SimParams, run_many_trials
+from simulation_core import (SimParams, run_many_trials, run_until_precision, estimate_tail_risk, EXECUTORS,
+                             MAX_BET_DECIMALS)
+from sim_stats import summarize_trials, bootstrap_cis, PRECISION_METRICS
 from optimizer import OptParams, parse_range, optimize_parameters_manual
+from distributed import DEFAULT_HOST, new_authkey, optimize_parameters_distributed, unsupported_options
+from progress import ProgressChannel, UI_FRAME_MS
+from sensitivity import run_sensitivity
+import worker_pool
 from .calc_tab import CalculatorTab
 from .opt_tab import OptimizerTab
 from .results_tab import ResultsTab
@@ -75,39 +82,103 @@ THEMES = {
 class AppController:
     def __init__(self, q: queue.Queue):
         self.queue = q
+        self.sim_progress = None
+        self.opt_progress = None
 
-    def start_simulation(self, params: SimParams):
+    def start_simulation(self, params: SimParams, rare_event: bool = False, precision: Tuple[str, float] = None,
+                         executor: str = "auto"):
         stop_event = threading.Event()
-        def target():
-            def progress_cb(done: int, total: int):
-                self.queue.put(("sim_progress", done / total * 100))
-            results = run_many_trials(params, stop_event, progress_cb, parallel=True)
-            highest_balances = [r["highest_balance"] for r in results]
-            cycles = [r["cycles"] for r in results]
-            rounds = [r["rounds"] for r in results]
-            total_successful = sum(cycles)
-            total_cycles = len(results) + total_successful
-            cycle_success = (total_successful / total_cycles * 100) if total_cycles else 0
-            bust_rate = sum(1 for c in cycles if c == 0) / len(results) * 100 if results else 0
+        self.sim_progress = worker_pool.progress_channel(max(1, params.n_trials))
+        progress = self.sim_progress
+        def simulate():
+            if precision and precision[1] > 0:
+                metric, width = precision
+                def interim_cb(done: int, est: float, lo: float, hi: float):
+                    self.queue.put(("sim_interim", [
+                        (f"{PRECISION_METRICS[metric]} (interim)", f"{est:.2f} [{lo:.2f}, {hi:.2f}]"),
+                        ("Trials so far", f"{done} / {params.n_trials}"),
+                        ("CI width (target)", f"{hi - lo:.2f} ({width:g})"),
+                    ]))
+                results = run_until_precision(params, metric, width, stop_event=stop_event,
+                                              interim_callback=interim_cb, progress=progress, executor=executor)
+            else:
+                results = run_many_trials(params, stop_event, parallel=True, progress=progress, executor=executor)
+            st = summarize_trials(results)
+            n = st["trials"]
+            ci = bootstrap_cis(results, params.starting_balance)
+            score = (st["median_high"] - params.starting_balance) / st["std_high"] if st["std_high"] else 0.0
+
+            def interval(metric: str, fmt: str) -> str:
+                lo, hi = ci[metric]
+                return f"[{fmt.format(lo)}, {fmt.format(hi)}]" if lo == lo and hi == hi else ""
 
             stats = [
-                ("Average highest balance", f"${median(highest_balances):.2f}" if highest_balances else "N/A"),
-                ("Std dev (highest)", f"${stdev(highest_balances):.2f}" if len(highest_balances) > 1 else "N/A"),
-                ("Max highest balance", f"${max(highest_balances):.2f}" if highest_balances else "N/A"),
-                ("Average cycles", f"{mean(cycles):.2f}" if cycles else "N/A"),
-                ("Average rounds", f"{mean(rounds):.2f}" if rounds else "N/A"),
-                ("Cycle success rate", f"{cycle_success:.2f}%"),
-                ("Bust rate", f"{bust_rate:.2f}%"),
+                ("Average highest balance", f"${st['median_high']:.2f}" if n else "N/A",
+                 interval("median_high", "${:.2f}")),
+                ("Std dev (highest)", f"${st['std_high']:.2f}" if n > 1 else "N/A"),
+                ("Max highest balance", f"${st['max_high']:.2f}" if n else "N/A"),
+                ("Average cycles", f"{st['avg_cycles']:.2f}" if n else "N/A"),
+                ("Average rounds", f"{st['avg_rounds']:.2f}" if n else "N/A"),
+                ("Cycle success rate", f"{st['cycle_success_rate']:.2f}%", interval("cycle_success_rate", "{:.2f}%")),
+                ("Bust rate", f"{st['bust_rate']:.2f}%", interval("bust_rate", "{:.2f}%")),
+                ("Score", f"{score:.2f}" if n > 1 else "N/A", interval("score", "{:.2f}")),
             ]
-            self.queue.put(("sim_done", stats))
+            if precision and precision[1] > 0:
+                stats.append(("Trials run", f"{n} / {params.n_trials}"))
+            if params.has_caps:
+                stats.append(("Horizon caps", params.caps_label()))
+                stats.append(("Censored trials", f"{st['censored_rate']:.2f}%"))
+            if rare_event and not stop_event.is_set():
+                tail = estimate_tail_risk(params, stop_event=stop_event)
+                for label, est in (("Bust rate (IS, 95% CI)", tail["bust"]),
+                                   ("Cycle success (IS, 95% CI)", tail["cycle_success"])):
+                    stats.append((label, f"{est.probability * 100:.3f}% [{est.ci_low * 100:.3f}, {est.ci_high * 100:.3f}]"))
+                fail = tail["bust"]
+                method = "plain Monte Carlo" if fail.tilt == 1.0 else f"tilt {fail.tilt:g}"
+                stats.append(("IS samples / rounds", f"{fail.samples} / {fail.rounds} ({method})"))
+            return stats
+        def target():
+            try:
+                self.queue.put(("sim_done", simulate()))
+            except Exception as e:
+                self.queue.put(("sim_error", str(e) or type(e).__name__))
+        thread = threading.Thread(target=self._releasing(target, progress), daemon=True)
+        thread.start()
+        return thread, stop_event
+
+    @staticmethod
+    def _releasing(target, progress: ProgressChannel):
+        """Thread target that hands `progress` back to the worker pool when `target` ends."""
+        def run():
+            try:
+                target()
+            finally:
+                worker_pool.release_progress(progress)
+        return run
+
+    def start_sensitivity(self, params: SimParams):
+        stop_event = threading.Event()
+        def target():
+            try:
+                base, rows = run_sensitivity(params, stop_event=stop_event)
+                self.queue.put(("sensitivity_done", (base, rows)))
+            except Exception as e:
+                self.queue.put(("sensitivity_error", str(e)))
         thread = threading.Thread(target=target, daemon=True)
         thread.start()
         return thread, stop_event
 
-    def start_optimizer(self, opt_params: OptParams):
+    def start_optimizer(self, opt_params: OptParams, distributed: dict = None):
         stop_event = threading.Event()
-        thread = threading.Thread(target=optimize_parameters_manual,
-                                 args=(opt_params, self.queue, stop_event), daemon=True)
+        if distributed:
+            thread = threading.Thread(target=optimize_parameters_distributed,
+                                     args=(opt_params, self.queue, stop_event),
+                                     kwargs=distributed, daemon=True)
+            thread.start()
+            return thread, stop_event
+        progress = self.opt_progress = worker_pool.progress_channel()
+        run = lambda: optimize_parameters_manual(opt_params, self.queue, stop_event, progress)
+        thread = threading.Thread(target=self._releasing(run, progress), daemon=True)
         thread.start()
         return thread, stop_event
 
@@ -131,6 +202,15 @@ class MergedApp(tk.Tk):
         self.large_fonts = tk.BooleanVar(value=False)
         self.keep_previous_results = tk.BooleanVar(value=False)
         self.current_theme = tk.StringVar(value="Original")
+        self.use_distributed = tk.BooleanVar(value=False)
+        self.dist_host_var = tk.StringVar(value=DEFAULT_HOST)
+        self.dist_port_var = tk.StringVar(value="50555")
+        # a fresh key every session and never saved: whoever knows it can run code in the app
+        self.dist_authkey_var = tk.StringVar(value=new_authkey())
+        self.dist_local_workers_var = tk.StringVar(value="0")
+        self.executor_var = tk.StringVar(value=EXECUTORS["auto"])
+        self.min_bet_var = tk.StringVar(value="0")
+        self.bet_decimals_var = tk.StringVar(value="")
         self.THEMES = THEMES
 
         # Build UI
@@ -151,6 +231,19 @@ class MergedApp(tk.Tk):
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
         self.after(100, self.process_queue)
+        self.after(UI_FRAME_MS, self.sample_progress)
+        self.opt_started = None
+        self._warm_worker_pool()
+
+    def _warm_worker_pool(self):
+        """Starts the shared worker processes in the background so the first run does not wait for them."""
+        def target():
+            try:
+                stats = worker_pool.start().warm_up()
+                self.queue.put(("pool_ready", stats.describe()))
+            except Exception as e:
+                self.queue.put(("pool_ready", f"not started ({e})"))
+        threading.Thread(target=target, daemon=True).start()
 
     def on_close(self):
         """Save state and close the app."""
@@ -163,6 +256,14 @@ class MergedApp(tk.Tk):
                 traceback.print_exc()
             except Exception:
                 pass
+        try:
+            self.results_tab.close_store()
+        except Exception:
+            pass
+        try:
+            worker_pool.shutdown()
+        except Exception:
+            pass
         # destroy the window and exit
         try:
             self.destroy()
@@ -175,7 +276,14 @@ class MergedApp(tk.Tk):
             "settings": {
                 "current_theme": self.current_theme.get(),
                 "large_fonts": bool(self.large_fonts.get()),
-                "keep_previous_results": bool(self.keep_previous_results.get())
+                "keep_previous_results": bool(self.keep_previous_results.get()),
+                "use_distributed": bool(self.use_distributed.get()),
+                "dist_host": self.dist_host_var.get(),
+                "dist_port": self.dist_port_var.get(),
+                "dist_local_workers": self.dist_local_workers_var.get(),
+                "executor": self.executor_var.get(),
+                "min_bet": self.min_bet_var.get(),
+                "bet_decimals": self.bet_decimals_var.get(),
             },
             "calculator": {},
             "optimizer": {},
@@ -192,6 +300,12 @@ class MergedApp(tk.Tk):
                     "l": self.calc_tab.l_var.get(),
                     "buffer": self.calc_tab.buffer_var.get(),
                     "n_trials": self.calc_tab.n_trials_var.get(),
+                    "max_rounds": self.calc_tab.max_rounds_var.get(),
+                    "max_cycles": self.calc_tab.max_cycles_var.get(),
+                    "max_seconds": self.calc_tab.max_seconds_var.get(),
+                    "ci_metric": self.calc_tab.ci_metric_var.get(),
+                    "ci_width": self.calc_tab.ci_width_var.get(),
+                    "engine": self.calc_tab.engine_var.get(),
                 }
         except Exception:
             pass
@@ -207,31 +321,24 @@ class MergedApp(tk.Tk):
                     "w_range": self.opt_tab.opt_w_var.get(),
                     "l_range": self.opt_tab.opt_l_var.get(),
                     "buffer_range": self.opt_tab.opt_buffer_var.get(),
+                    "max_rounds": self.opt_tab.opt_max_rounds_var.get(),
+                    "max_cycles": self.opt_tab.opt_max_cycles_var.get(),
+                    "max_seconds": self.opt_tab.opt_max_seconds_var.get(),
+                    "ci_metric": self.opt_tab.opt_ci_metric_var.get(),
+                    "ci_width": self.opt_tab.opt_ci_width_var.get(),
+                    "sampling": self.opt_tab.opt_sampling_var.get(),
+                    "samples": self.opt_tab.opt_samples_var.get(),
+                    "refine_levels": self.opt_tab.opt_refine_levels_var.get(),
+                    "refine_top_k": self.opt_tab.opt_refine_top_k_var.get(),
+                    "refine_budget": self.opt_tab.opt_refine_budget_var.get(),
+                    "time_budget": self.opt_tab.opt_time_budget_var.get(),
+                    "engine": self.opt_tab.opt_engine_var.get(),
                 }
         except Exception:
             pass
 
-        # Results table rows and columns (best-effort)
-        try:
-            if hasattr(self, "results_tab"):
-                cols = []
-                try:
-                    # Try known attribute first
-                    cols = list(getattr(self.results_tab, "cols", []))
-                    if not cols:
-                        # Fall back to treeview columns
-                        cols = list(self.results_tab.res_tree["columns"])
-                except Exception:
-                    cols = list(self.results_tab.res_tree["columns"]) if hasattr(self.results_tab, "res_tree") else []
-                rows = []
-                if hasattr(self.results_tab, "res_tree"):
-                    for i in self.results_tab.res_tree.get_children():
-                        vals = self.results_tab.res_tree.item(i).get("values", [])
-                        # Convert to strings for JSON safety
-                        rows.append([str(v) for v in vals])
-                st["results"] = {"cols": cols, "rows": rows}
-        except Exception:
-            st["results"] = {"cols": [], "rows": []}
+        # Result rows are not part of the JSON: the Results tab appends them to its
+        # results store as they arrive.
 
         return st
 
@@ -258,6 +365,17 @@ class MergedApp(tk.Tk):
             kp = s.get("keep_previous_results")
             if kp is not None:
                 self.keep_previous_results.set(bool(kp))
+            ud = s.get("use_distributed")
+            if ud is not None:
+                self.use_distributed.set(bool(ud))
+            for key, var in (("dist_host", self.dist_host_var),
+                             ("dist_port", self.dist_port_var),
+                             ("dist_local_workers", self.dist_local_workers_var),
+                             ("executor", self.executor_var),
+                             ("min_bet", self.min_bet_var),
+                             ("bet_decimals", self.bet_decimals_var)):
+                if s.get(key) is not None:
+                    var.set(str(s[key]))
         except Exception:
             pass
 
@@ -293,6 +411,18 @@ class MergedApp(tk.Tk):
                     "w_range": "opt_w_var",
                     "l_range": "opt_l_var",
                     "buffer_range": "opt_buffer_var",
+                    "max_rounds": "opt_max_rounds_var",
+                    "max_cycles": "opt_max_cycles_var",
+                    "max_seconds": "opt_max_seconds_var",
+                    "ci_metric": "opt_ci_metric_var",
+                    "ci_width": "opt_ci_width_var",
+                    "sampling": "opt_sampling_var",
+                    "samples": "opt_samples_var",
+                    "refine_levels": "opt_refine_levels_var",
+                    "refine_top_k": "opt_refine_top_k_var",
+                    "refine_budget": "opt_refine_budget_var",
+                    "time_budget": "opt_time_budget_var",
+                    "engine": "opt_engine_var",
                 }
                 for k, varname in mapping.items():
                     if k in opt and hasattr(self.opt_tab, varname):
@@ -303,44 +433,14 @@ class MergedApp(tk.Tk):
         except Exception:
             pass
 
-        # Results
+        # Results: state files from older versions carry the rows themselves; move them
+        # into the results store once (later saves no longer include them)
         try:
             results_state = state.get("results", {})
-            if results_state and hasattr(self, "results_tab"):
-                rows = results_state.get("rows", [])
-                # Clear existing rows if possible
-                try:
-                    if hasattr(self.results_tab, "clear_opt_results"):
-                        self.results_tab.clear_opt_results()
-                    else:
-                        # fallback: delete tree children directly
-                        if hasattr(self.results_tab, "res_tree"):
-                            for c in self.results_tab.res_tree.get_children():
-                                self.results_tab.res_tree.delete(c)
-                except Exception:
-                    pass
-
-                # Insert saved rows
-                try:
-                    if hasattr(self.results_tab, "res_tree"):
-                        for row in rows:
-                            # ensure tuple values
-                            try:
-                                self.results_tab.res_tree.insert("", "end", values=tuple(row))
-                            except Exception:
-                                # best-effort insertion
-                                try:
-                                    self.results_tab.res_tree.insert("", "end", values=tuple([str(r) for r in row]))
-                                except Exception:
-                                    pass
-                        # Try to update colors if method present
-                        try:
-                            if hasattr(self.results_tab, "update_row_colors"):
-                                self.results_tab.update_row_colors()
-                        except Exception:
-                            pass
-                except Exception:
-                    pass
+            rows = results_state.get("rows", []) if isinstance(results_state, dict) else []
+            if rows and hasattr(self, "results_tab"):
+                self.results_tab.clear_opt_results()
+                self.results_tab.insert_rows(rows, results_state.get("cols"))
         except Exception:
             pass
 
@@ -460,12 +560,15 @@ class MergedApp(tk.Tk):
         self.opt_tab.opt_stop_button.config(command=self.stop_optimizer)
         self.opt_tab.clear_button.config(command=self.results_tab.clear_opt_results)
         self.results_tab.apply_button.config(command=lambda: self.results_tab.apply_selected_to_calculator(self.calc_tab))
+        self.results_tab.sensitivity_button.config(command=self.run_sensitivity)
 
     def run_simulation(self):
         try:
-            params = self.calc_tab.get_sim_params()
+            params = replace(self.calc_tab.get_sim_params(), **self.get_bet_model())
             self.calc_tab.sim_progress["value"] = 0
-            self.sim_thread, self.sim_stop_event = self.controller.start_simulation(params)
+            self.sim_thread, self.sim_stop_event = self.controller.start_simulation(
+                params, rare_event=self.calc_tab.rare_event_var.get(),
+                precision=self.calc_tab.get_precision_target(), executor=self.get_executor())
             self.calc_tab.sim_stop_button.config(state="normal")
         except ValueError:
             messagebox.showerror("Invalid Input", "Please enter valid positive numbers.")
@@ -477,20 +580,68 @@ class MergedApp(tk.Tk):
 
     def run_optimizer(self):
         try:
-            params = self.opt_tab.get_opt_params()
-            combos = (len(params.bet_div_range) * len(params.profit_mult_range) *
-                     len(params.w_range) * len(params.l_range) * len(params.buffer_range))
-            if combos > 50000:
+            params = replace(self.opt_tab.get_opt_params(), **self.get_bet_model())
+            params.executor = self.get_executor()
+            combos = params.combo_count()
+            if combos > 50000 and params.time_budget <= 0:
                 if not messagebox.askyesno("Large Search", f"{combos} combinations may take a long time. Continue?"):
                     return
+            distributed = self.get_distributed_settings()
+            if distributed is not None:
+                problems = unsupported_options(params)
+                if not distributed["authkey"]:
+                    problems.append("an empty Auth Key")
+                if problems:
+                    messagebox.showerror("Distributed Sweep",
+                                         "Remote workers do not support " + ", ".join(problems) +
+                                         ". Change these settings or turn off Use Remote Workers.")
+                    return
             self.opt_tab.opt_progress["value"] = 0
             self.opt_tab.opt_status_label.config(text="Running...")
             self.opt_tab.opt_run_button.config(state="disabled")
             self.opt_tab.opt_stop_button.config(state="normal")
-            self.opt_thread, self.opt_stop_event = self.controller.start_optimizer(params)
+            self.results_tab.begin_run()
+            self.opt_started = time.perf_counter()
+            self.opt_thread, self.opt_stop_event = self.controller.start_optimizer(params, distributed)
         except ValueError:
             messagebox.showerror("Invalid Range", "Check your range syntax (e.g., 100-500 or 20,30,40)")
 
+    def get_executor(self) -> str:
+        """Executor key chosen in the Settings tab ("auto", "thread" or "process")."""
+        return next((k for k, v in EXECUTORS.items() if v == self.executor_var.get()), "auto")
+
+    def get_bet_model(self) -> Dict:
+        """min_bet / bet_decimals from the Settings tab (blank decimals = exact amounts); ValueError if invalid."""
+        min_bet = float(self.min_bet_var.get() or 0)
+        decimals = self.bet_decimals_var.get().strip()
+        bet_decimals = int(decimals) if decimals else None
+        if min_bet < 0 or (bet_decimals is not None and not 0 <= bet_decimals <= MAX_BET_DECIMALS):
+            raise ValueError("Invalid bet granularity")
+        return {"min_bet": min_bet, "bet_decimals": bet_decimals}
+
+    def get_distributed_settings(self):
+        """Coordinator settings from the Settings tab, or None when running on local cores only."""
+        if not self.use_distributed.get():
+            return None
+        return {
+            "host": self.dist_host_var.get().strip() or DEFAULT_HOST,
+            "port": int(self.dist_port_var.get()),
+            "authkey": self.dist_authkey_var.get().strip(),
+            "local_workers": max(0, int(self.dist_local_workers_var.get() or 0)),
+        }
+
+    def run_sensitivity(self):
+        params = self.results_tab.selected_sim_params()
+        if params is None:
+            return
+        try:
+            params = replace(params, **self.get_bet_model())
+        except ValueError:
+            messagebox.showerror("Invalid Input", "Check Minimum Bet and Bet Decimals in the Settings tab.")
+            return
+        self.results_tab.sensitivity_button.config(state="disabled", text="Running Sensitivity...")
+        self.controller.start_sensitivity(params)
+
     def stop_optimizer(self):
         if self.opt_stop_event:
             self.opt_stop_event.set()
@@ -502,14 +653,62 @@ class MergedApp(tk.Tk):
                 msg, data = self.queue.get_nowait()
                 if msg == "sim_progress":
                     self.calc_tab.sim_progress["value"] = data
+                elif msg == "sim_interim":
+                    self.calc_tab.display_sim_results(data)
                 elif msg == "sim_done":
+                    self.sample_progress(reschedule=False)
+                    self.controller.sim_progress = None
                     self.calc_tab.display_sim_results(data)
                     self.calc_tab.sim_stop_button.config(state="disabled")
+                elif msg == "sim_error":
+                    self.sample_progress(reschedule=False)
+                    self.controller.sim_progress = None
+                    self.calc_tab.sim_stop_button.config(state="disabled")
+                    self.calc_tab.sim_status_label.config(text="Simulation failed")
+                    messagebox.showerror("Simulation Failed", data)
                 elif msg == "progress":
                     self.opt_tab.update_progress(data)
+                elif msg in ("sensitivity_done", "sensitivity_error"):
+                    self.results_tab.sensitivity_button.config(state="normal", text="Sensitivity of Selected")
+                    if msg == "sensitivity_done":
+                        self.results_tab.show_sensitivity(*data)
+                    else:
+                        messagebox.showerror("Sensitivity Failed", data)
+                elif msg == "status":
+                    self.opt_tab.opt_status_label.config(text=data)
+                elif msg == "pool_ready":
+                    self.settings_tab.pool_status_var.set(f"Worker pool: {data}")
+                elif msg == "rows":
+                    self._note_first_results()
+                    self.results_tab.append_rows(data)
                 elif msg == "done":
-                    self.results_tab.display_opt_results(data)
+                    self._note_first_results()
+                    self.controller.opt_progress = None
+                    self.results_tab.finish_run(data)
                     self.opt_tab.job_finished()
         except queue.Empty:
             pass
         self.after(100, self.process_queue)
+
+    def _note_first_results(self):
+        """Shows how long the running sweep took to deliver its first rows."""
+        if self.opt_started is None:
+            return
+        self.settings_tab.sweep_latency_var.set(
+            f"Last sweep: first results after {time.perf_counter() - self.opt_started:.2f}s")
+        self.opt_started = None
+
+    def sample_progress(self, reschedule: bool = True):
+        """Reads the shared progress counters of running jobs at a fixed frame rate."""
+        sim = self.controller.sim_progress
+        if sim is not None:
+            snap = sim.snapshot()
+            self.calc_tab.sim_progress["value"] = snap.fraction * 100
+            self.calc_tab.sim_status_label.config(text=snap.describe("trials"))
+        opt = self.controller.opt_progress
+        if opt is not None and opt.total:
+            snap = opt.snapshot()
+            self.opt_tab.opt_progress["value"] = snap.fraction * 100
+            self.opt_tab.opt_status_label.config(text=snap.describe("combos"))
+        if reschedule:
+            self.after(UI_FRAME_MS, self.sample_progress)
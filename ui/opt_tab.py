@@ -3,6 +3,9 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from typing import List
 from optimizer import OptParams, parse_range
+from sim_stats import PRECISION_METRICS
+from sampling import SAMPLING_MODES
+from simulation_core import ENGINES
 from .widgets import ToolTip
 
 class OptimizerTab(ttk.Frame):
@@ -26,6 +29,18 @@ class OptimizerTab(ttk.Frame):
         self.opt_w_var = tk.StringVar(value="50-100;step=5")
         self.opt_l_var = tk.StringVar(value="3-5;step=1")
         self.opt_buffer_var = tk.StringVar(value="25,30,40")
+        self.opt_max_rounds_var = tk.StringVar(value="0")
+        self.opt_max_cycles_var = tk.StringVar(value="0")
+        self.opt_max_seconds_var = tk.StringVar(value="0")
+        self.opt_ci_metric_var = tk.StringVar(value=PRECISION_METRICS["median_high"])
+        self.opt_ci_width_var = tk.StringVar(value="0")
+        self.opt_sampling_var = tk.StringVar(value=SAMPLING_MODES["grid"])
+        self.opt_samples_var = tk.StringVar(value="256")
+        self.opt_refine_levels_var = tk.StringVar(value="0")
+        self.opt_refine_top_k_var = tk.StringVar(value="5")
+        self.opt_refine_budget_var = tk.StringVar(value="0")
+        self.opt_time_budget_var = tk.StringVar(value="0")
+        self.opt_engine_var = tk.StringVar(value=ENGINES["scalar"])
         
         self._build_param_frame()
         
@@ -61,13 +76,30 @@ class OptimizerTab(ttk.Frame):
         )
         
         labels = [
-            ("Starting Balance", self.opt_balance_var, "Initial simulation balance"),
+            ("Starting Balance", self.opt_balance_var, "Initial simulation balance, or a range such as 10,20,50 "
+                                                       "to test every combo at each balance"),
             ("Trials per Combo", self.opt_n_trials_var, "Number of runs per combo"),
             ("Bet Divisor Range", self.opt_bet_div_var, "e.g., 256-512;step=1 or 25,30,40"),
             ("Profit Multiplier Range", self.opt_profit_mult_var, "e.g., 25-150;step=5"),
             ("Win Increase % Range", self.opt_w_var, "e.g., 50-150;step=5"),
             ("Loss Reset (whole)", self.opt_l_var, "e.g., 3-8 (integers only)"),
             ("Buffer % Range", self.opt_buffer_var, "e.g., 20-40;step=2"),
+            ("Max Rounds / Trial", self.opt_max_rounds_var, "Stop each trial after this many rolls (0 = no cap)"),
+            ("Max Cycles / Trial", self.opt_max_cycles_var, "Stop each trial after this many successful cycles (0 = no cap)"),
+            ("Max Seconds / Trial", self.opt_max_seconds_var, "Stop each trial after this much wall time (0 = no cap)"),
+            ("Precision CI Width", self.opt_ci_width_var,
+             "Run trials per combo until the 95% CI of the precision metric is this narrow "
+             "(Trials per Combo becomes the maximum; 0 = off)"),
+            ("Sample Budget", self.opt_samples_var,
+             "Number of combos drawn in Sobol / Latin hypercube mode (ignored for Full grid)"),
+            ("Refine Levels", self.opt_refine_levels_var,
+             "After the sweep, zoom in this many times around the best rows with finer grids (0 = off)"),
+            ("Refine Top-K", self.opt_refine_top_k_var, "Number of best rows refined at each level"),
+            ("Refine Budget", self.opt_refine_budget_var,
+             "Maximum number of extra combos tested by refinement (0 = no limit)"),
+            ("Time Budget (min)", self.opt_time_budget_var,
+             "Run for this many minutes: screens many combos with few trials, gives the best ones "
+             "more trials, then refines around the leaders (0 = off)"),
         ]
 
         for i, (lbl, var, tip) in enumerate(labels):
@@ -76,24 +108,68 @@ class OptimizerTab(ttk.Frame):
             e.grid(row=i, column=1, padx=5, pady=4, sticky="ew")
             ToolTip(e, tip)
 
+        ttk.Label(frame, text="Precision Metric", anchor="w").grid(row=len(labels), column=0, padx=5, pady=4, sticky="w")
+        metric_combo = ttk.Combobox(frame, textvariable=self.opt_ci_metric_var,
+                                    values=list(PRECISION_METRICS.values()), state="readonly")
+        metric_combo.grid(row=len(labels), column=1, padx=5, pady=4, sticky="ew")
+        ToolTip(metric_combo, "Metric whose confidence interval decides when a combo has enough trials")
+
+        ttk.Label(frame, text="Sampling", anchor="w").grid(row=len(labels) + 1, column=0, padx=5, pady=4, sticky="w")
+        sampling_combo = ttk.Combobox(frame, textvariable=self.opt_sampling_var,
+                                      values=list(SAMPLING_MODES.values()), state="readonly")
+        sampling_combo.grid(row=len(labels) + 1, column=1, padx=5, pady=4, sticky="ew")
+        ToolTip(sampling_combo, "Full grid tests every listed value; Sobol and Latin hypercube spread "
+                                "Sample Budget combos evenly between the lowest and highest value of each range")
+
+        ttk.Label(frame, text="Engine", anchor="w").grid(row=len(labels) + 2, column=0, padx=5, pady=4, sticky="w")
+        engine_combo = ttk.Combobox(frame, textvariable=self.opt_engine_var,
+                                    values=list(ENGINES.values()), state="readonly")
+        engine_combo.grid(row=len(labels) + 2, column=1, padx=5, pady=4, sticky="ew")
+        ToolTip(engine_combo, "Vectorized runs a whole batch of combos in one NumPy pass on shared rolls; "
+                              "fastest for many cheap combos. Fixed-point does the same in exact whole "
+                              "currency units (Precision CI Width always uses Scalar)")
+
         self.opt_run_button = ttk.Button(frame, text="Run Optimizer")
-        self.opt_run_button.grid(row=len(labels), column=0, pady=10, sticky="w")
+        self.opt_run_button.grid(row=len(labels) + 3, column=0, pady=10, sticky="w")
 
     def get_opt_params(self) -> OptParams:
         """Extracts optimization parameters from UI variables."""
         try:
-            starting_balance = float(self.opt_balance_var.get())
+            balances = parse_range(self.opt_balance_var.get())
+            if not balances or min(balances) <= 0:
+                raise ValueError
+            starting_balance = balances[0]
             n_trials = int(self.opt_n_trials_var.get())
             bet_div_range = parse_range(self.opt_bet_div_var.get())
             profit_mult_range = parse_range(self.opt_profit_mult_var.get())
             w_range = parse_range(self.opt_w_var.get())
             l_range = parse_range(self.opt_l_var.get(), integer=True)
             buffer_range = parse_range(self.opt_buffer_var.get())
+            max_rounds = int(self.opt_max_rounds_var.get() or 0)
+            max_cycles = int(self.opt_max_cycles_var.get() or 0)
+            max_seconds = float(self.opt_max_seconds_var.get() or 0)
+            ci_width = float(self.opt_ci_width_var.get() or 0)
+            ci_metric = next((k for k, v in PRECISION_METRICS.items() if v == self.opt_ci_metric_var.get()),
+                             "median_high")
+            sampling = next((k for k, v in SAMPLING_MODES.items() if v == self.opt_sampling_var.get()), "grid")
+            samples = int(self.opt_samples_var.get() or 0) if sampling != "grid" else 0
+            if sampling != "grid" and samples <= 0:
+                raise ValueError
+            refine_levels = max(0, int(self.opt_refine_levels_var.get() or 0))
+            refine_top_k = max(1, int(self.opt_refine_top_k_var.get() or 5))
+            refine_budget = max(0, int(self.opt_refine_budget_var.get() or 0))
+            time_budget = max(0.0, float(self.opt_time_budget_var.get() or 0)) * 60
+            engine = next((k for k, v in ENGINES.items() if v == self.opt_engine_var.get()), "scalar")
             if not all([bet_div_range, profit_mult_range, w_range, l_range, buffer_range]):
                 raise ValueError
         except (ValueError, tk.TclError):
             raise ValueError("Invalid input values")
-        return OptParams(starting_balance, bet_div_range, profit_mult_range, w_range, l_range, buffer_range, n_trials)
+        return OptParams(starting_balance, bet_div_range, profit_mult_range, w_range, l_range, buffer_range, n_trials,
+                         max_rounds=max_rounds, max_cycles=max_cycles, max_seconds=max_seconds,
+                         ci_metric=ci_metric, ci_width=ci_width, sampling=sampling, samples=samples,
+                         refine_levels=refine_levels, refine_top_k=refine_top_k, refine_budget=refine_budget,
+                         engine=engine, time_budget=time_budget,
+                         starting_balance_range=balances if len(balances) > 1 else [])
 
     def update_progress(self, value: float):
         self.opt_progress["value"] = value * 100
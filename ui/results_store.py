@@ -0,0 +1,193 @@
+# Dice_Tool/ui/results_store.py
+"""
+SQLite store for optimizer result rows.
+
+Rows are appended as they stream in from a run, so closing the app has nothing left to
+write and the JSON state file only holds UI settings. The Results tab reads the store one
+page at a time (sorted and filtered in SQL), so launch time does not depend on how many
+rows were kept.
+"""
+import math
+import os
+import sqlite3
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+RESULTS_FILENAME = ".dice_tool_results.sqlite3"
+
+# result column -> SQLite type, in display order
+RESULT_COLUMNS: Dict[str, str] = {
+    "StartingBalance": "REAL",
+    "Trials": "INTEGER",
+    "BetDiv": "REAL",
+    "ProfitMult": "REAL",
+    "W%": "REAL",
+    "L": "INTEGER",
+    "Buffer%": "REAL",
+    "AvgHigh": "REAL",
+    "AvgHigh±": "REAL",
+    "StdDev": "REAL",
+    "MaxHigh": "REAL",
+    "AvgCycles": "REAL",
+    "AvgRounds": "REAL",
+    "CycleSuccess%": "REAL",
+    "CycleSuccess%±": "REAL",
+    "Bust%": "REAL",
+    "Bust%±": "REAL",
+    "Score": "REAL",
+    "Score±": "REAL",
+    "Censored%": "REAL",
+    "Caps": "TEXT",
+}
+
+# columns of the rows older versions saved in the JSON state file (when it names none)
+LEGACY_COLUMNS = ("StartingBalance", "Trials", "BetDiv", "ProfitMult", "W%", "L", "Buffer%",
+                  "AvgHigh", "StdDev", "MaxHigh", "AvgCycles", "AvgRounds",
+                  "CycleSuccess%", "Bust%", "Score")
+
+_MAX_PARAMS = 900          # stay below SQLite's bound-parameter limit in IN (...) lists
+
+
+def default_results_path() -> str:
+    """Return path to the results database in the user's home directory."""
+    return os.path.join(os.path.expanduser("~"), RESULTS_FILENAME)
+
+
+def _quote(col: str) -> str:
+    return '"' + col.replace('"', '""') + '"'
+
+
+def _to_column(col: str, value: Any) -> Any:
+    """Value as stored: numbers for numeric columns (None when missing or not a number)."""
+    kind = RESULT_COLUMNS[col]
+    if kind == "TEXT":
+        return "none" if value is None else str(value)
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(number):
+        return None
+    return int(number) if kind == "INTEGER" else number
+
+
+def _from_column(col: str, value: Any) -> Any:
+    """Stored value as rows are read back: NULL reals become NaN."""
+    return float("nan") if value is None and RESULT_COLUMNS[col] == "REAL" else value
+
+
+def as_result_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """`row` (numbers or display strings) as the store keeps it and page() returns it."""
+    return {c: _from_column(c, _to_column(c, row.get(c))) for c in RESULT_COLUMNS}
+
+
+def rows_from_display(rows: Iterable[Sequence[Any]], cols: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Result rows from rows of display values, such as the "rows" older versions saved in the
+    state file. Without `cols`, rows as long as LEGACY_COLUMNS use those, others RESULT_COLUMNS.
+    """
+    out = []
+    for values in rows:
+        names = cols or (LEGACY_COLUMNS if len(values) == len(LEGACY_COLUMNS) else list(RESULT_COLUMNS))
+        out.append(as_result_row(dict(zip(names, values))))
+    return out
+
+
+class ResultsStore:
+    """Optimizer rows in one SQLite table; row ids are assigned in insertion order."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = default_results_path() if path is None else path
+        try:
+            self._conn = sqlite3.connect(self.path)
+            self._create()
+        except sqlite3.Error:
+            # unusable file (read-only home, corrupt database): keep results for this session only
+            self.path = ":memory:"
+            self._conn = sqlite3.connect(self.path)
+            self._create()
+
+    def _create(self) -> None:
+        cols = ", ".join(f"{_quote(c)} {t}" for c, t in RESULT_COLUMNS.items())
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS results (id INTEGER PRIMARY KEY, {cols})")
+        # stores written before a column existed get it added (NULL for the old rows)
+        present = {rec[1] for rec in self._conn.execute("PRAGMA table_info(results)")}
+        for c, t in RESULT_COLUMNS.items():
+            if c not in present:
+                self._conn.execute(f"ALTER TABLE results ADD COLUMN {_quote(c)} {t}")
+        self._conn.commit()
+
+    def append(self, rows: Iterable[Dict[str, Any]]) -> List[int]:
+        """Appends result rows (dicts keyed by RESULT_COLUMNS) and returns their ids."""
+        names = list(RESULT_COLUMNS)
+        sql = (f"INSERT INTO results ({', '.join(_quote(c) for c in names)}) "
+               f"VALUES ({', '.join('?' for _ in names)})")
+        ids = []
+        cur = self._conn.cursor()
+        for row in rows:
+            cur.execute(sql, [_to_column(c, row.get(c)) for c in names])
+            ids.append(cur.lastrowid)
+        self._conn.commit()
+        return ids
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def clear(self) -> None:
+        self._conn.execute("DELETE FROM results")
+        self._conn.commit()
+
+    def page(self, offset: int, limit: int, order: Optional[Tuple[str, bool]] = None,
+             ids: Optional[Sequence[int]] = None) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        (id, row) pairs of one page. `order` is (column, descending); without it rows come in
+        insertion order. `ids` restricts the page to those rows (e.g. the Pareto frontier).
+        """
+        return list(self._select(order, ids, offset, limit))
+
+    def rows(self, order: Optional[Tuple[str, bool]] = None,
+             ids: Optional[Sequence[int]] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Every (id, row) pair, optionally ordered and restricted like page()."""
+        return self._select(order, ids, 0, -1)
+
+    def column_values(self, columns: Sequence[str]) -> Tuple[List[int], List[Tuple]]:
+        """(ids, value tuples) of the given columns over all rows, for whole-table analyses."""
+        cur = self._conn.execute(
+            f"SELECT id, {', '.join(_quote(c) for c in columns)} FROM results ORDER BY id")
+        ids, values = [], []
+        for rec in cur:
+            ids.append(rec[0])
+            values.append(tuple(float("nan") if v is None else v for v in rec[1:]))
+        return ids, values
+
+    def _select(self, order, ids, offset: int, limit: int) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        names = list(RESULT_COLUMNS)
+        where, params = "", []
+        if ids is not None:
+            # large id lists go through a temporary table instead of one huge IN (...)
+            if len(ids) > _MAX_PARAMS:
+                self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS picked (id INTEGER PRIMARY KEY)")
+                self._conn.execute("DELETE FROM picked")
+                self._conn.executemany("INSERT OR IGNORE INTO picked VALUES (?)", ((i,) for i in ids))
+                where = "WHERE id IN (SELECT id FROM picked)"
+            else:
+                where = f"WHERE id IN ({', '.join('?' for _ in ids)})"
+                params = list(ids)
+        order_by = "id"
+        if order is not None and order[0] in RESULT_COLUMNS:
+            direction = "DESC" if order[1] else "ASC"
+            order_by = f"{_quote(order[0])} IS NULL, {_quote(order[0])} {direction}, id"
+        cur = self._conn.execute(
+            f"SELECT id, {', '.join(_quote(c) for c in names)} FROM results {where} "
+            f"ORDER BY {order_by} LIMIT ? OFFSET ?", params + [limit, offset])
+        for rec in cur:
+            row = {c: _from_column(c, v) for c, v in zip(names, rec[1:])}
+            yield rec[0], row
+
+    def close(self) -> None:
+        try:
+            self._conn.close()
+        except sqlite3.Error:
+            pass
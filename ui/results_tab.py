@@ -5,9 +5,29 @@ from tkinter import messagebox
 from tkinter import filedialog
 import pandas as pd
 from ui.calc_tab import CalculatorTab
+from ui.results_store import ResultsStore, rows_from_display
+from simulation_core import SimParams
+
+try:
+    from pareto import PARETO_METRICS, DEFAULT_OBJECTIVES, ParetoFrontier
+    _HAS_PARETO = True
+except Exception:
+    _HAS_PARETO = False
+
+try:
+    import numpy as np
+    from heatmap import PivotCache
+    from ui.heatmap_window import HeatmapWindow
+    _HAS_HEATMAP = True
+except Exception:
+    _HAS_HEATMAP = False
+
+SENSITIVITY_MIN_TRIALS = 100
+PAGE_ROWS = 500           # rows read from the results store per page
+PAGE_AHEAD = 0.9          # load the next page once the view is scrolled past this fraction
 
 class ResultsTab(ttk.Frame):
-    def __init__(self, parent, *args, **kwargs):
+    def __init__(self, parent, *args, store: ResultsStore = None, **kwargs):
         super().__init__(parent, *args, **kwargs)
         style = ttk.Style()
 
@@ -19,8 +39,9 @@ class ResultsTab(ttk.Frame):
 
         # Updated column order with new columns
         self.cols = ("StartingBalance", "Trials", "BetDiv", "ProfitMult", "W%", "L", "Buffer%",
-                     "AvgHigh", "StdDev", "MaxHigh", "AvgCycles", "AvgRounds",
-                     "CycleSuccess%", "Bust%", "Score")
+                     "AvgHigh", "AvgHigh±", "StdDev", "MaxHigh", "AvgCycles", "AvgRounds",
+                     "CycleSuccess%", "CycleSuccess%±", "Bust%", "Bust%±", "Score", "Score±",
+                     "Censored%", "Caps")
 
         self.res_tree = ttk.Treeview(self, columns=self.cols, show="headings", height=20)
         style.configure('Treeview', rowheight=18)
@@ -28,10 +49,56 @@ class ResultsTab(ttk.Frame):
             self.res_tree.heading(col, text=col, command=lambda c=col: self.sort_res_column(c, False))
             self.res_tree.column(col, anchor="center", minwidth=80, width=100)
         self.res_tree.grid(row=1, column=0, columnspan=2, sticky="nsew", padx=10, pady=10)
+        # The tree shows a prefix of the store's rows in the current view (order and frontier
+        # filter); item ids are the store's row ids as strings.
+        self.store = store if store is not None else ResultsStore()
+        self._order = None        # (column, descending) or None for insertion order
+        self._loaded = 0          # rows of the view paged into the tree
+        self._view_total = 0      # rows in the view
+        self._paging = False
+        self._run_iids = []       # rows streamed in by the optimizer run in progress
+        self._frontier_ready = False   # built from the store on first use, not at launch
+
+        # Pareto frontier filter
+        filter_frame = ttk.Frame(self)
+        filter_frame.grid(row=0, column=0, columnspan=2, sticky="ew", padx=10, pady=(10, 0))
+        self.frontier_only_var = tk.BooleanVar(value=False)
+        self.frontier_check = ttk.Checkbutton(filter_frame, text="Pareto frontier only",
+                                              variable=self.frontier_only_var, command=self.apply_frontier_filter)
+        self.frontier_check.grid(row=0, column=0, sticky="w")
+        self.objective_vars = {}
+        objectives_button = ttk.Menubutton(filter_frame, text="Frontier Metrics")
+        objectives_menu = tk.Menu(objectives_button, tearoff=0)
+        objectives_button["menu"] = objectives_menu
+        objectives_button.grid(row=0, column=1, sticky="w", padx=(10, 0))
+        self.frontier_label = ttk.Label(filter_frame, text="")
+        self.frontier_label.grid(row=0, column=2, sticky="w", padx=(10, 0))
+        if _HAS_PARETO:
+            for metric, higher_better in PARETO_METRICS.items():
+                var = tk.BooleanVar(value=metric in DEFAULT_OBJECTIVES)
+                self.objective_vars[metric] = var
+                objectives_menu.add_checkbutton(
+                    label=f"{metric} ({'max' if higher_better else 'min'})",
+                    variable=var, command=self.rebuild_frontier)
+            self._frontier = ParetoFrontier(self.selected_objectives())
+        else:
+            self._frontier = None
+            self.frontier_check.config(state="disabled")
+            objectives_button.config(state="disabled")
+
+        # Heatmap window; its pivots are built from the store when first shown and then
+        # updated from streamed rows
+        filter_frame.columnconfigure(2, weight=1)
+        self.heatmap_button = ttk.Button(filter_frame, text="Heatmap", command=self.show_heatmap)
+        self.heatmap_button.grid(row=0, column=3, sticky="e")
+        self._pivots = PivotCache(self._pivot_columns) if _HAS_HEATMAP else None
+        self._heatmap = None
+        if self._pivots is None:
+            self.heatmap_button.config(state="disabled")
 
-        v_scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.res_tree.yview)
-        v_scrollbar.grid(row=1, column=2, sticky="ns")
-        self.res_tree.configure(yscrollcommand=v_scrollbar.set)
+        self.v_scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.res_tree.yview)
+        self.v_scrollbar.grid(row=1, column=2, sticky="ns")
+        self.res_tree.configure(yscrollcommand=self._on_yscroll)
 
         h_scrollbar = ttk.Scrollbar(self, orient="horizontal", command=self.res_tree.xview)
         h_scrollbar.grid(row=2, column=0, columnspan=2, sticky="ew")
@@ -40,45 +107,234 @@ class ResultsTab(ttk.Frame):
         ttk.Button(self, text="Save to CSV", command=self.save_opt_csv).grid(row=3, column=0, pady=5, sticky="e")
         self.apply_button = ttk.Button(self, text="Apply Selected to Calculator")
         self.apply_button.grid(row=3, column=0, pady=5, sticky="w")
+        self.sensitivity_button = ttk.Button(self, text="Sensitivity of Selected")
+        self.sensitivity_button.grid(row=3, column=0, pady=5)
 
         # Configure tags for alternating row shading (using dark shades to match common themes)
         self.res_tree.tag_configure("evenrow", background="#2d2d2d")
         self.res_tree.tag_configure("oddrow", background="#383838")
 
-    def display_opt_results(self, df: pd.DataFrame):
+        self.reload_view()
+
+    @staticmethod
+    def format_row(row) -> tuple:
+        """Display values of one optimizer result row (dict or DataFrame row); missing values show as nan."""
+        nan = float("nan")
+        return (
+            f"{row.get('StartingBalance', nan):.2f}",
+            f"{row.get('Trials', nan)}",
+            f"{row.get('BetDiv', nan):.2f}",
+            f"{row.get('ProfitMult', nan):.2f}",
+            f"{row.get('W%', nan):.2f}",
+            f"{row.get('L', nan)}",
+            f"{row.get('Buffer%', nan):.2f}",
+            f"{row.get('AvgHigh', nan):.2f}",
+            _format_pm(row.get('AvgHigh±')),
+            f"{row.get('StdDev', nan):.2f}",
+            f"{row.get('MaxHigh', nan):.2f}",
+            f"{row.get('AvgCycles', nan):.2f}",
+            f"{row.get('AvgRounds', nan):.2f}",
+            f"{row.get('CycleSuccess%', nan):.2f}",
+            _format_pm(row.get('CycleSuccess%±')),
+            f"{row.get('Bust%', nan):.2f}",
+            _format_pm(row.get('Bust%±')),
+            f"{row.get('Score', nan):.2f}",
+            _format_pm(row.get('Score±')),
+            f"{row.get('Censored%', 0.0):.2f}",
+            f"{row.get('Caps', 'none')}",
+        )
+
+    def begin_run(self):
+        """Called when an optimizer run starts; rows then arrive through append_rows."""
         app = self.master.master  # MergedApp instance
         if not app.keep_previous_results.get():
             self.clear_opt_results()
-        if df.empty:
-            messagebox.showinfo("No Results", "No results were produced.")
+        elif self._order is not None and self._loaded < self._view_total:
+            # new rows page in at the end only in insertion order
+            self._order = None
+            self.reload_view()
+        self._run_iids = []
+
+    def append_rows(self, rows: list):
+        """Stores a streamed batch of result rows (dicts) and shows them if the view is fully loaded."""
+        self._run_iids.extend(self._add_rows(rows))
+
+    def finish_run(self, df: pd.DataFrame):
+        """
+        Called with the final DataFrame of a run. Rows that were already streamed are only
+        reordered by Score; a run that streamed nothing (e.g. restored or older callers)
+        is inserted from the DataFrame.
+        """
+        if not self._run_iids:
+            if df.empty:
+                messagebox.showinfo("No Results", "No results were produced.")
+                return
+            self._add_rows(df.to_dict("records"))
             return
-        for _, row in df.iterrows():
-            vals = (
-                f"{row['StartingBalance']:.2f}",
-                f"{row['Trials']}",
-                f"{row['BetDiv']:.2f}",
-                f"{row['ProfitMult']:.2f}",
-                f"{row['W%']:.2f}",
-                f"{row['L']}",
-                f"{row['Buffer%']:.2f}",
-                f"{row['AvgHigh']:.2f}",
-                f"{row['StdDev']:.2f}",
-                f"{row['MaxHigh']:.2f}",
-                f"{row['AvgCycles']:.2f}",
-                f"{row['AvgRounds']:.2f}",
-                f"{row['CycleSuccess%']:.2f}",
-                f"{row['Bust%']:.2f}",
-                f"{row['Score']:.2f}",
-            )
-            self.res_tree.insert("", "end", values=vals)
+        score_idx = self.cols.index("Score")
+        shown = [iid for iid in self._run_iids if self.res_tree.exists(iid)]
+        self._run_iids = []
+        if self.frontier_only_var.get():
+            return
+        ranked = sorted(shown, key=lambda iid: _as_float(self.res_tree.item(iid)["values"][score_idx]),
+                        reverse=True)
+        for iid in ranked:
+            self.res_tree.move(iid, "", "end")
         self.update_row_colors()
 
+    def display_opt_results(self, df: pd.DataFrame):
+        self.begin_run()
+        self.finish_run(df)
+
+    def insert_rows(self, rows: list, cols: list = None) -> list:
+        """
+        Stores rows of display values (e.g. from an older state file) whose columns are `cols`
+        (default: see rows_from_display); returns their item ids. The values are converted to
+        numbers first, as format_row needs them.
+        """
+        return self._add_rows(rows_from_display(rows, cols))
+
+    def _add_rows(self, rows: list) -> list:
+        """Appends row dicts to the store, the frontier and (when fully loaded) the tree."""
+        if not rows:
+            return []
+        ids = self.store.append(rows)
+        iids = [str(i) for i in ids]
+        if self._frontier is not None and self._frontier_ready:
+            self._frontier.add(self._objective_values(rows), ids)
+        if self._pivots is not None:
+            self._pivots.add_rows(rows)
+            self._refresh_heatmap()
+        if self.frontier_only_var.get() and self._frontier is not None:
+            self.reload_view()
+            return iids
+        if self._loaded == self._view_total:
+            self._insert_page(zip(ids, rows))
+        self._view_total += len(ids)
+        self._update_frontier_label()
+        return iids
+
+    def _view_ids(self):
+        """Store ids the view is restricted to, or None for every row."""
+        if self._frontier is not None and self.frontier_only_var.get():
+            self._ensure_frontier()
+            return self._frontier.ids
+        return None
+
+    def reload_view(self):
+        """Empties the tree and pages in the first rows of the current order and filter."""
+        self.res_tree.delete(*self.res_tree.get_children())
+        ids = self._view_ids()
+        self._loaded = 0
+        self._view_total = len(ids) if ids is not None else self.store.count()
+        self.load_next_page()
+        self._update_frontier_label()
+
+    def load_next_page(self):
+        self._paging = False
+        if self._loaded >= self._view_total:
+            return
+        self._insert_page(self.store.page(self._loaded, PAGE_ROWS, self._order, self._view_ids()))
+
+    def _insert_page(self, page):
+        for row_id, row in page:
+            tag = "evenrow" if self._loaded % 2 == 0 else "oddrow"
+            self.res_tree.insert("", "end", iid=str(row_id), values=self.format_row(row), tags=(tag,))
+            self._loaded += 1
+
+    def _on_yscroll(self, first, last):
+        self.v_scrollbar.set(first, last)
+        if float(last) >= PAGE_AHEAD and self._loaded < self._view_total and not self._paging:
+            self._paging = True
+            self.after_idle(self.load_next_page)
+
     def clear_opt_results(self):
-        for i in self.res_tree.get_children():
-            self.res_tree.delete(i)
+        self.store.clear()
+        self._run_iids = []
+        if self._frontier is not None:
+            self._frontier.clear()
+            self._frontier_ready = True
+        if self._pivots is not None:
+            self._pivots.clear()
+            self._refresh_heatmap()
+        self.reload_view()
+
+    def close_store(self):
+        self.store.close()
+
+    def selected_objectives(self) -> tuple:
+        return tuple(m for m, var in self.objective_vars.items() if var.get())
+
+    def _objective_values(self, rows: list) -> list:
+        return [[_as_float(r.get(m)) for m in self._frontier.metrics] for r in rows]
+
+    def rebuild_frontier(self):
+        """Recomputes the frontier over all stored rows after the metric selection changed."""
+        if not _HAS_PARETO:
+            return
+        metrics = self.selected_objectives()
+        if not metrics:
+            metrics = DEFAULT_OBJECTIVES
+            for m, var in self.objective_vars.items():
+                var.set(m in metrics)
+        self._frontier = ParetoFrontier(metrics)
+        self._frontier_ready = False
+        self.apply_frontier_filter()
+
+    def _ensure_frontier(self):
+        if self._frontier_ready:
+            return
+        ids, values = self.store.column_values(self._frontier.metrics)
+        if ids:
+            self._frontier.add([[_as_float(v) for v in vals] for vals in values], ids)
+        self._frontier_ready = True
+
+    def apply_frontier_filter(self):
+        """Shows only frontier rows (or every row when the filter is off)."""
+        if self._frontier is None:
+            return
+        self.reload_view()
+
+    def _update_frontier_label(self):
+        if self._frontier is None:
+            return
+        total = self.store.count()
+        if not total or not self._frontier_ready:
+            self.frontier_label.config(text="")
+            return
+        self.frontier_label.config(
+            text=f"Frontier: {len(self._frontier.ids)} of {total} rows "
+                 f"({', '.join(self._frontier.metrics)})")
+
+    def _pivot_columns(self, columns) -> "np.ndarray":
+        """The given columns over every stored row, one array per column."""
+        _, values = self.store.column_values(columns)
+        return np.array(values, dtype=np.float64).reshape(-1, len(columns)).T
+
+    def show_heatmap(self):
+        """Opens the heatmap window, or raises it when it is already open."""
+        if self._pivots is None:
+            return
+        if self._heatmap is not None and self._heatmap.winfo_exists():
+            self._heatmap.lift()
+            return
+        self._heatmap = HeatmapWindow(self, self._pivots)
+        self._heatmap.bind("<Destroy>", self._on_heatmap_closed, add="+")
+        self._heatmap.schedule_redraw()
+
+    def _on_heatmap_closed(self, event):
+        if event.widget is self._heatmap:
+            self._heatmap = None
+
+    def _refresh_heatmap(self):
+        if self._heatmap is not None:
+            try:
+                self._heatmap.schedule_redraw()
+            except tk.TclError:
+                self._heatmap = None
 
     def save_opt_csv(self):
-        rows = [self.res_tree.item(i)["values"] for i in self.res_tree.get_children()]
+        rows = [self.format_row(row) for _, row in self.store.rows(self._order, self._view_ids())]
         if not rows:
             messagebox.showinfo("No Data", "No results to save.")
             return
@@ -89,15 +345,10 @@ class ResultsTab(ttk.Frame):
         messagebox.showinfo("Saved", f"Results saved to {file}")
 
     def sort_res_column(self, col, reverse):
-        l = [(self.res_tree.set(k, col), k) for k in self.res_tree.get_children("")]
-        try:
-            l.sort(key=lambda t: float(t[0]), reverse=reverse)
-        except ValueError:
-            l.sort(reverse=reverse)
-        for index, (val, k) in enumerate(l):
-            self.res_tree.move(k, "", index)
+        """Sorts the whole result set in the store and pages the view in again from the top."""
+        self._order = (col, reverse)
+        self.reload_view()
         self.res_tree.heading(col, command=lambda: self.sort_res_column(col, not reverse))
-        self.update_row_colors()
 
     def apply_selected_to_calculator(self, calc_tab: "CalculatorTab"):
         sel = self.res_tree.selection()
@@ -123,6 +374,53 @@ class ResultsTab(ttk.Frame):
         except Exception as e:
             messagebox.showerror("Error", f"Could not apply values: {e}")
 
+    def selected_sim_params(self):
+        """SimParams for the selected row (at least SENSITIVITY_MIN_TRIALS trials), or None."""
+        sel = self.res_tree.selection()
+        if not sel:
+            messagebox.showinfo("No Selection", "Select a row in Optimizer Results first.")
+            return None
+        vals = self.res_tree.item(sel[0])["values"]
+        try:
+            return SimParams(
+                starting_balance=float(vals[0]),
+                bet_div=float(vals[2]),
+                profit_mult=float(vals[3]),
+                w=float(vals[4]) / 100.0,
+                l=int(float(vals[5])),
+                buffer=1 + float(vals[6]) / 100.0,
+                n_trials=max(SENSITIVITY_MIN_TRIALS, int(float(vals[1]))),
+            )
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not read the selected row: {e}")
+            return None
+
+    def show_sensitivity(self, base: dict, rows: list):
+        """Opens a window with the gradient / elasticity table returned by run_sensitivity."""
+        win = tk.Toplevel(self)
+        win.title("Local Sensitivity")
+        win.columnconfigure(0, weight=1)
+        win.rowconfigure(1, weight=1)
+        ttk.Label(
+            win,
+            text=(f"Base: Score {base['Score']:.3f} | Bust {base['Bust%']:.2f}% | "
+                  f"Median peak ${base['MedianHigh']:.2f}   (common random numbers, +/- one step)"),
+            anchor="w",
+        ).grid(row=0, column=0, sticky="ew", padx=10, pady=(10, 5))
+        cols = ("Param", "Value", "Step", "dScore", "dBust%", "dMedianHigh",
+                "Elast Score", "Elast Bust%", "Elast MedianHigh")
+        tree = ttk.Treeview(win, columns=cols, show="headings", height=6)
+        for col in cols:
+            tree.heading(col, text=col)
+            tree.column(col, anchor="center", minwidth=70, width=95)
+        tree.grid(row=1, column=0, sticky="nsew", padx=10, pady=(0, 10))
+        for r in rows:
+            tree.insert("", "end", values=(
+                r.param, f"{r.value:.2f}", f"{r.step:.2f}",
+                f"{r.gradient['Score']:.4f}", f"{r.gradient['Bust%']:.4f}", f"{r.gradient['MedianHigh']:.4f}",
+                f"{r.elasticity['Score']:.2f}", f"{r.elasticity['Bust%']:.2f}", f"{r.elasticity['MedianHigh']:.2f}",
+            ))
+
     def update_row_colors(self):
         """Apply alternating row colors based on current display order."""
         children = self.res_tree.get_children()
@@ -130,42 +428,16 @@ class ResultsTab(ttk.Frame):
             tag = "evenrow" if i % 2 == 0 else "oddrow"
             self.res_tree.item(iid, tags=(tag,))
 
-# Add these methods to the ResultsTab class in ui/results_tab.py
 
-    def get_results_state(self) -> dict:
-        """
-        Return a serializable representation of current optimizer results table:
-        { "cols": [...], "rows": [[...], ...] }
-        """
-        try:
-            cols = getattr(self, "cols", None)
-            if not cols:
-                # attempt to get from treeview headings
-                cols = [self.res_tree.heading(c)["text"] for c in self.res_tree["columns"]]
-            rows = [self.res_tree.item(i)["values"] for i in self.res_tree.get_children()]
-            # Convert any non-serializable types to strings
-            serial_rows = []
-            for row in rows:
-                serial_rows.append([str(v) for v in row])
-            return {"cols": list(cols), "rows": serial_rows}
-        except Exception:
-            return {"cols": [], "rows": []}
-
-    def load_results_state(self, state: dict):
-        """
-        Load results state previously saved by get_results_state.
-        Expects { "cols": [...], "rows": [[...], ...] }
-        """
-        try:
-            if not isinstance(state, dict):
-                return
-            rows = state.get("rows", [])
-            # Clear existing rows
-            self.clear_opt_results()
-            # Insert rows (make sure to convert to appropriate types/formatting if necessary)
-            for row in rows:
-                # row is a list of strings; insert as-is
-                self.res_tree.insert("", "end", values=tuple(row))
-            self.update_row_colors()
-        except Exception:
-            pass
+def _format_pm(value) -> str:
+    """Confidence half-width cell: blank when the row has no interval."""
+    value = _as_float(value)
+    return f"{value:.2f}" if value != float("-inf") else ""
+
+
+def _as_float(value) -> float:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return float("-inf")
+    return value if value == value else float("-inf")
@@ -1,6 +1,7 @@
 # Dice_Tool/ui/settings_tab.py
 import tkinter as tk
 from tkinter import ttk
+from simulation_core import EXECUTORS
 
 class SettingsTab(ttk.Frame):
     def __init__(self, parent, app):
@@ -78,6 +79,99 @@ class SettingsTab(ttk.Frame):
         )
         desc_lbl.grid(row=1, column=0, columnspan=2, sticky="w", pady=(2, 10))
 
+        # --- Distributed Section ---
+        dist_frame = ttk.LabelFrame(center_frame, text=" Distributed Sweep ", padding=(20, 10))
+        dist_frame.grid(row=2, column=0, sticky="ew", pady=(20, 0))
+        dist_frame.columnconfigure(1, weight=1)
+
+        lbl_dist = ttk.Label(dist_frame, text="Use Remote Workers", font=("Segoe UI", 10, "bold"))
+        lbl_dist.grid(row=0, column=0, sticky="w", pady=(10, 0))
+        self.setting_labels.append(lbl_dist)
+
+        dist_chk = ttk.Checkbutton(dist_frame, variable=self.app.use_distributed)
+        dist_chk.grid(row=0, column=1, sticky="e", padx=5, pady=(10, 0))
+
+        dist_rows = [
+            ("Listen Host", self.app.dist_host_var),
+            ("Listen Port", self.app.dist_port_var),
+            ("Auth Key", self.app.dist_authkey_var),
+            ("Local Workers", self.app.dist_local_workers_var),
+        ]
+        for i, (text, var) in enumerate(dist_rows, start=1):
+            lbl = ttk.Label(dist_frame, text=text, font=("Segoe UI", 10, "bold"))
+            lbl.grid(row=i, column=0, sticky="w", pady=4)
+            self.setting_labels.append(lbl)
+            ttk.Entry(dist_frame, textvariable=var, width=18).grid(row=i, column=1, sticky="e", padx=5, pady=4)
+
+        dist_desc = ttk.Label(
+            dist_frame,
+            text="If checked, the optimizer serves combos to workers started with\n"
+                 "'python distributed.py worker --host <this pc> --port <port> --authkey <key>'.\n"
+                 "Set Listen Host to this PC's address (or 0.0.0.0) to accept other machines.",
+            font=("Segoe UI", 9, "italic"),
+            foreground="gray"
+        )
+        dist_desc.grid(row=len(dist_rows) + 1, column=0, columnspan=2, sticky="w", pady=(2, 10))
+
+        # --- Execution Section ---
+        exec_frame = ttk.LabelFrame(center_frame, text=" Execution ", padding=(20, 10))
+        exec_frame.grid(row=3, column=0, sticky="ew", pady=(20, 0))
+        exec_frame.columnconfigure(1, weight=1)
+
+        lbl_exec = ttk.Label(exec_frame, text="Worker Pool", font=("Segoe UI", 10, "bold"))
+        lbl_exec.grid(row=0, column=0, sticky="w", pady=(10, 0))
+        self.setting_labels.append(lbl_exec)
+
+        exec_combo = ttk.Combobox(
+            exec_frame,
+            textvariable=self.app.executor_var,
+            values=list(EXECUTORS.values()),
+            state="readonly",
+            width=18
+        )
+        exec_combo.grid(row=0, column=1, sticky="e", padx=5, pady=(10, 0))
+
+        exec_desc = ttk.Label(
+            exec_frame,
+            text="Threads start instantly and suit the Vectorized engine.\n"
+                 "Processes take a moment to start but run Scalar trials in parallel.",
+            font=("Segoe UI", 9, "italic"),
+            foreground="gray"
+        )
+        exec_desc.grid(row=1, column=0, columnspan=2, sticky="w", pady=(2, 10))
+
+        # Instrumentation: filled in when the shared worker pool is warm and after each sweep
+        self.pool_status_var = tk.StringVar(value="Worker pool: starting...")
+        self.sweep_latency_var = tk.StringVar(value="")
+        for i, var in enumerate((self.pool_status_var, self.sweep_latency_var)):
+            ttk.Label(exec_frame, textvariable=var, font=("Segoe UI", 9), foreground="gray").grid(
+                row=2 + i, column=0, columnspan=2, sticky="w")
+
+        # --- Bet Granularity Section ---
+        bet_frame = ttk.LabelFrame(center_frame, text=" Bet Granularity ", padding=(20, 10))
+        bet_frame.grid(row=4, column=0, sticky="ew", pady=(20, 0))
+        bet_frame.columnconfigure(1, weight=1)
+
+        bet_rows = [
+            ("Minimum Bet", self.app.min_bet_var),
+            ("Bet Decimals", self.app.bet_decimals_var),
+        ]
+        for i, (text, var) in enumerate(bet_rows):
+            lbl = ttk.Label(bet_frame, text=text, font=("Segoe UI", 10, "bold"))
+            lbl.grid(row=i, column=0, sticky="w", pady=4)
+            self.setting_labels.append(lbl)
+            ttk.Entry(bet_frame, textvariable=var, width=18).grid(row=i, column=1, sticky="e", padx=5, pady=4)
+
+        bet_desc = ttk.Label(
+            bet_frame,
+            text="Minimum Bet 0 and blank Bet Decimals simulate exact amounts, so a sweep\n"
+                 "over several starting balances runs once and is rescaled. Set them (e.g. 8\n"
+                 "decimals) to model the site's granularity; every balance is then simulated.",
+            font=("Segoe UI", 9, "italic"),
+            foreground="gray"
+        )
+        bet_desc.grid(row=len(bet_rows), column=0, columnspan=2, sticky="w", pady=(2, 10))
+
     def update_fonts(self, base_size: int):
         """Called by main_window to resize manual font definitions"""
         # Update the bold labels
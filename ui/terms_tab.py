@@ -19,11 +19,16 @@ Multiplier – The payout odds or target multiplier determined by input paramete
 Bet Size – The first wager placed based on the current balance and balance divisor.
 Profit Stop – The profit goal for the current cycle, derived from the bet and multiplier.
 Balance Target – The balance amount where the simulation stops a successful cycle.
+Live preview – Shortly after you stop typing, a quick background estimate shows the bust probability (with a 95% range) and median peak for the current inputs. Preview trials are capped, so use Run Simulation for full results.
 
 SIMULATION CONTROLS
 Trials – The number of simulated runs to execute. Higher values improve accuracy but take longer.
 Run Simulation – Starts the simulation with the selected settings.
 Stop – Cancels an ongoing simulation process.
+Max Rounds / Max Cycles / Max Seconds – Optional caps per trial (0 = no cap). A trial that hits a cap is counted as censored: it is treated as still alive rather than as a bust, and the stats are adjusted for it.
+Precision Target / CI Width – When the width is above 0, trials run in batches until the 95% confidence interval of the chosen metric (median highest balance, Bust% or Score) is that narrow. Trials then acts as the maximum, and interim estimates are shown while it runs.
+Engine – Scalar plays each trial on its own in separate worker processes. Vectorized plays all trials side by side with NumPy, which starts almost instantly and is usually faster for short runs. Both engines give the same results for the same rolls. Fixed-point plays like Vectorized but keeps balances and bets as whole numbers of the smallest currency unit (Bet Decimals from the Settings tab, or millionths when blank), rounding every bet and payout down the way the site settles them. Long trials then carry no floating-point drift and replay exactly.
+Rare-event Bust% – Adds importance-sampled estimates of the bust rate and cycle success rate with 95% confidence intervals. Rolls are tilted toward losses and reweighted, so rare busts are measured with fewer simulated rounds. A short pilot checks whether tilting actually helps and whether its weights can be trusted; when it does not (most settings, since busts are rarely very rare), plain Monte Carlo is used instead, shown as "plain Monte Carlo" next to the sample count.
 
 SIMULATION RESULTS
 Cycle – A completed round reaching the profit target or failing (bust).
@@ -34,24 +39,36 @@ Average cycles – The average count of successful profit cycles per trial.
 Average rounds – The average number of dice rolls per trial.
 Cycle success rate – The percentage of total cycles that reached profit target before failure.
 Bust rate – The percentage of trials that failed to meet the first profit stop.
+Censored trials – The percentage of trials stopped by a cap before they busted (shown only when caps are set).
+Score – (Average highest balance - Starting Balance) / Std dev, the same score the optimizer ranks by.
+95% CI (bootstrap) – The range the statistic would likely fall in if the whole simulation were repeated, found by resampling the finished trials a few hundred times. Overlapping ranges mean two settings are not clearly different.
 
 
 OPTIMIZER TAB
 
 PARAMETER RANGES
 Combo – A single set of parameter values tested by the optimizer.
-Starting Balance – The initial balance applied to all combos during optimization.
+Starting Balance – The initial balance applied to all combos during optimization. A range (e.g. 10,20,50 or 10-100;step=10) tests every combo at each balance and adds a row per balance. Without a bet granularity (see Settings) results simply scale with the balance, so each combo is simulated once and rescaled to the other balances, which makes extra balances almost free.
 Trials per Combo – The number of simulations run for each parameter combination.
 Bet Divisor Range – Range or list of values to test for bet divisors.
 Profit Multiplier Range – Range or list of values to test for profit multipliers.
 Win Increase % Range – Range or list of win increase percentages to test.
 Loss Reset – Range or list of loss reset counts to test.
 Buffer % Range – Range or list of buffer percentages to test.
+Precision Metric / CI Width – Gives each combo only as many trials as it needs: trials run in batches until the metric's 95% confidence interval is narrower than the width, up to Trials per Combo (0 = off).
+Max Rounds / Cycles / Seconds per Trial – Caps that keep every trial short so long runs do not stall the sweep (0 = no cap).
+Sampling – Full grid tests every combination of the listed values. Sobol and Latin hypercube instead draw Sample Budget combos spread evenly between the lowest and highest value of each range (Loss Reset stays a whole number), which covers a large search space with far fewer runs.
+Sample Budget – Number of combos tested in Sobol or Latin hypercube mode. Sobol is most even with a power of two (128, 256, 512...).
+Refine Levels – After the first sweep, zooms in this many times: around each of the best rows it tests the midpoints between that row and its neighbours, halving the step at every level. Combos already tested are never run twice (0 = off).
+Refine Top-K – How many of the best rows (by Score) are refined at each level.
+Refine Budget – Upper limit on the extra combos tested by all refinement levels together (0 = no limit).
+Time Budget (min) – Runs for about this many minutes instead of a fixed number of combos. It first times a few combos, then screens as many Sobol points of the ranges as fit (snapped to the listed values in Full grid mode) with few trials, keeps the better half by Score and doubles their trials until the best reach Trials per Combo, and spends the rest of the time refining around the leaders. Sample Budget (in Sobol / Latin hypercube mode), Refine Levels and Refine Budget act as upper limits. Results appear at the deadline with the confidence (±) columns showing how uncertain each row of the final rungs is. Always runs on this computer, even with Distributed Sweep enabled (0 = off).
+Engine – Scalar plays every trial of every combo on its own. Vectorized plays a whole batch of combos side by side in one NumPy pass, with every combo's trial N reading the same dice rolls, which makes sweeps of many quick combos several times faster. Both engines give identical results on the same rolls. Fixed-point works like Vectorized in exact whole currency units (see the Calculator's Engine). Precision CI Width always uses Scalar.
 
 BUTTONS
 Run Optimizer – Begins testing all combinations using the provided ranges.
 Clear Results – Removes existing results from the results tab.
-Stop – Terminates the optimization process currently running. (*Note:* If you get the 'Large Search Warning' popup, you won't be able to use the 'Stop' button to stop the process. Doing so may potentially break the optimizer and you will need to close the app and relaunch it again to use the optimizer.. )
+Stop – Terminates the optimization process currently running. Combos that already finished are kept in the results.
 
 
 OPTIMIZER RESULTS TAB
@@ -70,10 +87,40 @@ AvgRounds – Average number of rolls executed per trial.
 CycleSuccess% – Percentage of cycles that reached profit targets successfully.
 Bust% – Percentage of trials that ended with no successful cycles (busts).
 Score – Performance metric calculated as (AvgHigh - Start) / StdDev.
+AvgHigh±, CycleSuccess%±, Bust%±, Score± – Half the width of the 95% bootstrap confidence interval of the metric to their left. Two combos whose values differ by less than these are not clearly different; more trials make them smaller. Blank for combos with fewer than two trials, and for combos of a Time Budget run that were dropped in a screening rung with fewer than 50 trials.
+Censored% – Percentage of trials stopped by a round, cycle or time cap.
+Caps – The caps used for the combo (R = rounds, C = cycles, T = seconds).
 
 BUTTONS
 Apply Selected to Calculator – Loads parameters from a selected result row into the Calculator tab for testing.
-Save to CSV – Exports all result rows into a CSV file for later review.
+Save to CSV – Exports all result rows (only the frontier rows when that filter is on), in the current sort order, into a CSV file for later review.
+Sensitivity of Selected – Nudges each parameter of the selected row up and down by one step (5%, or 1 for Loss Reset) and simulates every point on the same random rolls. Shows how much Score, Bust% and median peak change per unit (gradient) and per percent (elasticity), so you can see how fragile a combo is.
+
+PARETO FRONTIER
+Rows appear while the optimizer is still running and are ranked by Score when it finishes. Every row is saved to a results file in your home folder as soon as it arrives, so closing the app is instant and results are kept between sessions. Large result sets load a page at a time as you scroll; clicking a column heading sorts the full set, not just the loaded rows.
+Pareto frontier only – Hides every combo that another combo beats or matches on all chosen metrics while being strictly better on at least one. What is left are the best trade-offs, e.g. the highest AvgHigh for each level of Bust%.
+Frontier Metrics – Chooses the metrics compared by the filter (default AvgHigh, Bust% and CycleSuccess%). Bust% and StdDev count as better when lower, the others when higher. The frontier updates as new rows arrive.
+
+HEATMAP
+Heatmap – Opens a window that colours a grid of two parameters (X Axis and Y Axis, e.g. W% against L) by one result metric. Each cell combines every row with those two values, whatever the other parameters were, using the chosen Aggregate: max shows the best any combo reached there, median the typical combo, and count how many rows the cell holds. Brighter cells are better (lower is better for Bust% and StdDev); dark grey cells have no rows. Hover over a cell to see its value and row count. The grid updates while the optimizer is running; the first view of a new axis and metric pair reads every stored row once, later redraws only recolour the cells.
+
+
+SETTINGS TAB
+
+DISTRIBUTED SWEEP
+Use Remote Workers – Runs the optimizer as a coordinator that hands combos to worker processes on other computers. Workers use the same engine and bet granularity as a local run, so results match. Time Budget and Refine Levels only work on this computer; a distributed sweep with either set is refused.
+Listen Host – The network address the coordinator listens on. The default 127.0.0.1 only accepts workers on this computer; enter this PC's address (or 0.0.0.0 for every network) to accept other machines, and only do that on a network you trust.
+Listen Port – The TCP port workers connect to. Start a worker with: python distributed.py worker --host <this pc> --port <port> --authkey <key>
+Auth Key – Shared password workers must present before they receive combos. A new random key is made every time the app starts and is not saved; anyone who knows it can run code on this computer, so keep it private. A sweep with an empty key is refused.
+Local Workers – Extra worker processes started on this computer alongside any remote workers.
+
+EXECUTION
+Worker Pool – How simulations and sweeps are spread over CPU cores. Auto uses threads for the Vectorized and Fixed-point engines and processes for the Scalar engine. Threads start within milliseconds; processes take longer to start (especially in the packaged .exe) but let Scalar trials use every core. To hide that start-up, the app starts its worker processes once in the background when it opens and reuses them for every run. The lines below the setting show how long the workers took to start, how much memory each one uses, and how quickly the last sweep returned its first results.
+
+BET GRANULARITY
+Minimum Bet – Smallest bet the site accepts. Smaller bets are raised to it, and a trial busts once the balance cannot cover it (0 = any amount).
+Bet Decimals – Bets and winnings are rounded down to this many decimal places, as the site settles them (e.g. 8 for most crypto). Blank = exact amounts.
+Either setting makes results depend on the starting balance, so the Calculator, Optimizer and Sensitivity simulate every starting balance in full instead of rescaling one run.
 """
 
 
@@ -152,6 +199,9 @@ class TermsTab(ttk.Frame):
                 "PARAMETER RANGES",
                 "BUTTONS",
                 "RESULTS DEFINITIONS",
+                "DISTRIBUTED SWEEP",
+                "PARETO FRONTIER",
+                "EXECUTION",
             }:
                 self.text.insert("end", stripped + "\n", ("subheading", "base"))
                 continue
@@ -0,0 +1,278 @@
+# Dice_Tool/vector_engine.py
+"""
+Lock-step NumPy engine: many parameter sets x many trials in one vector pass.
+
+Every (strategy, trial) pair is a lane. Per-lane state (balance, bet, win and loss streaks,
+win threshold, rule values, bet_div, profit_mult, ...) lives in flat arrays and all live lanes
+take one roll per step; lanes that bust or hit a cap are written out and compacted away, so a
+step only costs work for lanes still running. Bet changes come from a compiled strategy rule
+table (strategy.compile_table): each rule is one masked array update per step, so no Python
+object is interpreted per round. Optimizer combos run as reverse_martingale presets.
+
+All lanes of trial t read the same StakeRNG stream (seed, "trial-t"), kept once in a shared
+roll buffer, so the HMAC cost of generating rolls is paid once per trial instead of once per
+combo. The stream is consumed exactly like run_compounded_trial does (1024-roll batches,
+a fresh batch at the start of every profit cycle), so with params.seed set every lane
+reproduces the scalar engine's trial bit for bit.
+
+max_seconds is applied to the whole pass: all lanes run concurrently, so each trial's wall
+time is the kernel's wall time.
+"""
+import secrets
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from progress import ProgressChannel
+from shm_results import TRIAL_DTYPE
+from simulation_core import SimParams, StakeRNG, floor_amount, quantize_bet
+from strategy import ACTIONS, STREAK_MODES, RuleTable, Strategy, compile_table, reverse_martingale
+
+ROLL_BATCH = 1024          # must match run_compounded_trial's batch size for parity
+CHECK_STEPS = 256          # steps between wall-clock checks and progress updates
+
+_MULTIPLY, _ADD, _SET, _RESET = (list(ACTIONS).index(a) for a in ("multiply", "add", "set", "reset"))
+_FROM, _EVERY, _AT = (list(STREAK_MODES).index(m) for m in ("from", "every", "at"))
+
+
+class RollBuffer:
+    """
+    Rolls of n_trials StakeRNG streams in one (n_trials, width) array. Row t holds stream
+    positions base[t] .. filled[t]; prefixes no live lane can reach any more are dropped
+    in whole batches when the buffer is extended.
+    """
+
+    def __init__(self, seed: str, n_trials: int, first_trial: int = 0):
+        self.rngs = [StakeRNG(seed, f"trial-{first_trial + t}") for t in range(n_trials)]
+        self.base = np.zeros(n_trials, dtype=np.int64)
+        self.filled = np.zeros(n_trials, dtype=np.int64)
+        self.rolls = np.empty((n_trials, 0), dtype=np.float64)
+
+    def ensure(self, trial: np.ndarray, pos: np.ndarray) -> None:
+        """Makes every (trial, pos) pair readable, with one batch of headroom beyond it."""
+        n = len(self.rngs)
+        low = np.full(n, np.iinfo(np.int64).max)
+        high = np.full(n, -1, dtype=np.int64)
+        np.minimum.at(low, trial, pos)
+        np.maximum.at(high, trial, pos)
+        active = np.flatnonzero(high >= 0)
+        rows = {}
+        for t in active:
+            new_base = (low[t] // ROLL_BATCH) * ROLL_BATCH
+            kept = self.rolls[t, new_base - self.base[t]:self.filled[t] - self.base[t]]
+            parts = [kept]
+            # one next_roll_array call per batch: the nonce in each digest depends on it
+            while self.filled[t] <= high[t] + ROLL_BATCH:
+                parts.append(self.rngs[t].next_roll_array(ROLL_BATCH))
+                self.filled[t] += ROLL_BATCH
+            rows[t] = np.concatenate(parts)
+            self.base[t] = new_base
+        width = max((len(r) for r in rows.values()), default=0)
+        self.rolls = np.full((n, width), np.nan)
+        for t, r in rows.items():
+            self.rolls[t, :len(r)] = r
+
+    def read(self, trial: np.ndarray, pos: np.ndarray) -> np.ndarray:
+        if len(pos) and (pos >= self.filled[trial]).any():
+            self.ensure(trial, pos)
+        return self.rolls[trial, pos - self.base[trial]]
+
+
+def run_lockstep(params: SimParams, combos: Sequence[Tuple[float, float, float, int, float]],
+                 progress: Optional[ProgressChannel] = None, first_trial: int = 0,
+                 stop_event: Optional[threading.Event] = None) -> List[np.ndarray]:
+    """
+    Simulates params.n_trials trials for every (bet_div, profit_mult, w, l, buffer) combo,
+    sharing starting balance, caps and seed from `params`. Returns one TRIAL_DTYPE array
+    per combo. Without params.seed a random seed is drawn for the pass; trials of different
+    combos then still share their rolls (common random numbers).
+    first_trial offsets the trial indices (streams "trial-<first_trial + t>"), so a run can be
+    split into chunks that together replay the unchunked pass. When stop_event is set the
+    pass ends early and only finished trials are returned.
+    """
+    if not combos:
+        return []
+    table = compile_table([reverse_martingale(*c[:5]) for c in combos])
+    return run_table(params, table, progress, first_trial, stop_event)
+
+
+def run_table(params: SimParams, table: RuleTable, progress: Optional[ProgressChannel] = None,
+              first_trial: int = 0, stop_event: Optional[threading.Event] = None) -> List[np.ndarray]:
+    """
+    Simulates params.n_trials trials for every row of a compiled strategy table, with starting
+    balance, caps and seed from `params` (its bet_div .. buffer fields are not used). Returns
+    one TRIAL_DTYPE array per row; first_trial and stop_event work as in run_lockstep.
+    Trials ended by a take-profit stop are reported as censored, by a stop-loss as busted.
+    params.min_bet and bet_decimals quantize bets and payouts as in run_compounded_trial.
+    """
+    n_rows, n_trials = table.rows, max(0, params.n_trials)
+    n = n_rows * n_trials
+    out = np.zeros(n, dtype=TRIAL_DTYPE)
+    if n == 0:
+        return [out[:0] for _ in range(n_rows)]
+
+    row_of = np.repeat(np.arange(n_rows), n_trials)
+    start = float(params.starting_balance)
+    balance = np.full(n, start)
+    bet_div, profit_mult = table.bet_div[row_of], table.profit_mult[row_of]
+    granular = not params.scale_invariant
+    base_bet = quantize_bet(balance / bet_div, params) if granular else balance / bet_div
+    s = {
+        "lane": np.arange(n), "trial": np.tile(np.arange(n_trials), n_rows),
+        "bet_div": bet_div, "profit_mult": profit_mult, "m": table.multiplier[row_of],
+        "threshold": table.threshold[row_of],
+        "balance": balance, "peak": balance.copy(),
+        "cycles": np.zeros(n, dtype=np.int64), "rounds": np.zeros(n, dtype=np.int64),
+        "pos": np.zeros(n, dtype=np.int64), "base_bet": base_bet,
+        "target": balance + base_bet * profit_mult, "current": base_bet.copy(),
+    }
+    if params.starting_balance <= 0:
+        _write_out(out, s, np.ones(n, dtype=bool), False)
+        return [out[c * n_trials:(c + 1) * n_trials] for c in range(n_rows)]
+    # one contiguous column per rule value and streak length; "every" rules count their own
+    # streak and restart it when they fire, which avoids a modulo per step
+    rules = []
+    for k, (on, action, mode) in enumerate(zip(table.on.tolist(), table.action.tolist(), table.mode.tolist())):
+        s[f"value{k}"] = np.ascontiguousarray(table.value[row_of, k])
+        s[f"n{k}"] = np.ascontiguousarray(table.streak[row_of, k])
+        if mode == _EVERY:
+            s[f"count{k}"] = np.zeros(n, dtype=np.int64)
+        # mode "from" with streak 1 on every row fires on each matching outcome: no streak test
+        plain = mode == _FROM and bool((table.streak[:, k] == 1).all())
+        rules.append((k, on, action, mode, plain))
+    track_wins = any(on == 0 and mode != _EVERY and not plain for _, on, _, mode, plain in rules)
+    track_losses = any(on == 1 and mode != _EVERY and not plain for _, on, _, mode, plain in rules)
+    counters = [f"count{k}" for k, _, _, mode, _ in rules if mode == _EVERY]
+    for key, tracked in (("wins", track_wins), ("losses", track_losses)):
+        if tracked:
+            s[key] = np.zeros(n, dtype=np.int64)
+            counters.append(key)
+    has_take_profit = bool((table.take_profit > 0).any())
+    has_stop_loss = bool((table.stop_loss > 0).any())
+    if has_take_profit:
+        s["take_profit"] = table.take_profit[row_of] * start
+    if has_stop_loss:
+        s["stop_loss"] = table.stop_loss[row_of] * start
+
+    buf = RollBuffer(params.seed or secrets.token_hex(16), n_trials, first_trial)
+    max_rounds = params.max_rounds if params.max_rounds > 0 else None
+    deadline = time.monotonic() + params.max_seconds if params.max_seconds > 0 else None
+    unreported = 0
+    step = 0
+
+    while len(s["lane"]):
+        roll = buf.read(s["trial"], s["pos"])
+        s["pos"] += 1
+        s["rounds"] += 1
+        unreported += len(roll)
+
+        win = roll < s["threshold"]
+        current = s["current"]
+        profit = current * (s["m"] - 1)
+        if granular:
+            profit = floor_amount(profit, params.bet_decimals)
+        s["balance"] = np.where(win, s["balance"] + profit, s["balance"] - current)
+        if track_wins:
+            s["wins"] = np.where(win, s["wins"] + 1, 0)
+        if track_losses:
+            s["losses"] = np.where(win, 0, s["losses"] + 1)
+        lose = ~win
+        for k, on, action, mode, plain in rules:
+            fire = win if on == 0 else lose
+            if mode == _EVERY:
+                count = np.where(fire, s[f"count{k}"] + 1, 0)
+                fire = count >= s[f"n{k}"]
+                s[f"count{k}"] = np.where(fire, 0, count)
+            elif not plain:
+                streak = s["wins"] if on == 0 else s["losses"]
+                fire = fire & ((streak >= s[f"n{k}"]) if mode == _FROM else (streak == s[f"n{k}"]))
+            current = _apply_rule(current, s, fire, k, action)
+        s["current"] = quantize_bet(current, params) if granular else current
+        np.maximum(s["peak"], s["balance"], out=s["peak"])
+
+        busted = s["balance"] <= 0
+        if granular:
+            busted |= s["balance"] < params.bet_unit
+        if has_stop_loss:
+            busted |= (s["stop_loss"] > 0) & (s["balance"] <= s["stop_loss"])
+        censored = np.zeros(len(roll), dtype=bool)
+        if has_take_profit:
+            censored |= (s["take_profit"] > 0) & (s["balance"] >= s["take_profit"])
+        hit = s["balance"] >= s["target"]
+        if hit.any():
+            s["cycles"] += hit
+            if params.max_cycles > 0:
+                capped = hit & (s["cycles"] >= params.max_cycles)
+                censored |= capped
+                hit &= ~capped
+            # next cycle: new base bet and target, and a fresh roll batch
+            next_bet = s["balance"] / s["bet_div"]
+            if granular:
+                next_bet = quantize_bet(next_bet, params)
+            s["base_bet"] = np.where(hit, next_bet, s["base_bet"])
+            s["target"] = np.where(hit, s["balance"] + s["base_bet"] * s["profit_mult"], s["target"])
+            s["current"] = np.where(hit, s["base_bet"], s["current"])
+            for key in counters:
+                s[key] = np.where(hit, 0, s[key])
+            s["pos"] = np.where(hit, -(-s["pos"] // ROLL_BATCH) * ROLL_BATCH, s["pos"])
+        if max_rounds is not None:
+            censored |= ~busted & (s["rounds"] >= max_rounds)
+
+        step += 1
+        if step % CHECK_STEPS == 0:
+            if progress is not None:
+                progress.add_rounds(unreported)
+                unreported = 0
+            if deadline is not None and time.monotonic() >= deadline:
+                censored |= ~busted
+            if stop_event is not None and stop_event.is_set():
+                break
+
+        done = busted | censored
+        if done.any():
+            _write_out(out, s, busted, False)
+            _write_out(out, s, censored & ~busted, True)
+            keep = ~done
+            s = {k: v[keep] for k, v in s.items()}
+
+    if progress is not None and unreported:
+        progress.add_rounds(unreported)
+    parts = [out[c * n_trials:(c + 1) * n_trials] for c in range(n_rows)]
+    return [p if p["done"].all() else p[p["done"]] for p in parts]
+
+
+def _apply_rule(current: np.ndarray, s: dict, fire: np.ndarray, k: int, action: int) -> np.ndarray:
+    """Current bets after rule k of the table on the lanes where it fires."""
+    value = s[f"value{k}"]
+    if action == _MULTIPLY:
+        return np.where(fire, current * value, current)
+    if action == _ADD:
+        return np.where(fire, current + value * s["base_bet"], current)
+    if action == _SET:
+        return np.where(fire, value * s["base_bet"], current)
+    return np.where(fire, s["base_bet"], current)
+
+
+def _write_out(out: np.ndarray, s: dict, mask: np.ndarray, censored: bool) -> None:
+    if not mask.any():
+        return
+    lanes = s["lane"][mask]
+    out["highest_balance"][lanes] = s["peak"][mask]
+    out["cycles"][lanes] = s["cycles"][mask]
+    out["rounds"][lanes] = s["rounds"][mask]
+    out["censored"][lanes] = censored
+    out["done"][lanes] = True
+
+
+def run_trials_vectorized(params: SimParams, progress: Optional[ProgressChannel] = None,
+                          first_trial: int = 0, stop_event: Optional[threading.Event] = None) -> np.ndarray:
+    """
+    params.n_trials trials of one parameter set (indices first_trial..) in a single lock-step
+    pass: params.strategy when set, otherwise the reverse martingale of its bet fields.
+    """
+    strategy: Optional[Strategy] = params.strategy
+    if strategy is None:
+        strategy = reverse_martingale(params.bet_div, params.profit_mult, params.w, params.l, params.buffer)
+    return run_table(params, compile_table([strategy]), progress, first_trial, stop_event)[0]
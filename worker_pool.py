@@ -0,0 +1,197 @@
+# Dice_Tool/worker_pool.py
+"""
+Persistent process pool shared by local simulations and sweeps.
+
+A fresh ProcessPoolExecutor per run paid worker start-up (interpreter plus imports) before
+the first result of every run. This pool is started once and warmed up when the app launches;
+make_executor lends it to process-pool runs instead of building a new one.
+- On Linux workers come from a forkserver that has already imported PRELOAD_MODULES, so a
+  new worker is a fork of an initialised process that never imports pandas or Tk. Other
+  platforms and frozen builds use their default start method; the task functions still live
+  in compute_tasks, so those workers import the simulation modules only.
+- Shared progress counters can only be handed to a worker when it starts, so the pool owns
+  PROGRESS_SLOTS channels. A run leases one (progress_channel) and its tasks are wrapped in
+  compute_tasks.run_in_slot to report into it; runs with any other channel get their own pool.
+  Tasks a stopped run abandoned may still be running when the slot is leased again; they
+  carry their lease number and stay stopped (progress.ChannelLease).
+"""
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, wait as wait_futures
+from dataclasses import dataclass
+from functools import partial
+from typing import List, Optional
+
+from compute_tasks import init_worker, run_in_slot, worker_info
+from progress import ProgressChannel
+
+PRELOAD_MODULES = ["numpy", "simulation_core", "compute_tasks"]
+PROGRESS_SLOTS = 4          # concurrent runs (simulation, sweep, ...) that can share the pool
+
+
+def _start_method() -> str:
+    if (sys.platform.startswith("linux") and not getattr(sys, "frozen", False)
+            and "forkserver" in multiprocessing.get_all_start_methods()):
+        return "forkserver"
+    return multiprocessing.get_start_method()
+
+
+@dataclass
+class PoolStats:
+    """Warm-up measurements of the pool, shown in the Settings tab."""
+    workers: int
+    start_method: str
+    spawn_seconds: float            # from creating the pool until every worker has answered
+    rss: List[Optional[int]]        # resident memory per worker in bytes (None when unknown)
+
+    def describe(self) -> str:
+        known = [r for r in self.rss if r]
+        if known:
+            low, high = min(known) / 2 ** 20, max(known) / 2 ** 20
+            memory = f"{low:.0f} MB" if round(low) == round(high) else f"{low:.0f}-{high:.0f} MB"
+            memory = f", {memory} RSS per worker"
+        else:
+            memory = ""
+        return (f"{self.workers} worker{'s' if self.workers != 1 else ''} ({self.start_method}) "
+                f"ready in {self.spawn_seconds:.2f}s{memory}")
+
+
+class LeasedExecutor(Executor):
+    """
+    One run's view of the shared pool. shutdown() cancels or waits for this run's tasks only
+    and leaves the workers running for the next run.
+    """
+
+    def __init__(self, pool: "WarmPool", slot: Optional[int]):
+        self._pool = pool
+        self._slot = slot
+        self._lease = pool.slots[slot].lease_id if slot is not None else 0
+        self._futures = set()
+        self._max_workers = pool.workers
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        if kwargs:
+            fn = partial(fn, **kwargs)
+        fut = self._pool.executor().submit(run_in_slot, self._slot, self._lease, fn, *args)
+        self._futures.add(fut)
+        fut.add_done_callback(self._futures.discard)
+        return fut
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        pending = list(self._futures)
+        if cancel_futures:
+            for fut in pending:
+                fut.cancel()
+        if wait:
+            wait_futures(pending)
+
+
+class WarmPool:
+    """The shared ProcessPoolExecutor plus its leasable progress channels."""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.workers = max_workers or min(32, os.cpu_count() or 1)
+        self.start_method = _start_method()
+        self._ctx = multiprocessing.get_context(self.start_method)
+        if self.start_method == "forkserver":
+            self._ctx.set_forkserver_preload(PRELOAD_MODULES)
+        self.slots = [ProgressChannel(ctx=self._ctx) for _ in range(PROGRESS_SLOTS)]
+        self._free = list(range(PROGRESS_SLOTS))
+        self._lock = threading.Lock()
+        self._executor = self._new_executor()
+        self.stats: Optional[PoolStats] = None
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=self._ctx,
+                                   initializer=init_worker, initargs=(self.slots,))
+
+    def executor(self) -> ProcessPoolExecutor:
+        """The pool, rebuilt first if a worker died and broke it."""
+        with self._lock:
+            if getattr(self._executor, "_broken", False):
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._new_executor()
+            return self._executor
+
+    def warm_up(self) -> PoolStats:
+        """Starts every worker and records spawn time and per-worker memory."""
+        started = time.perf_counter()
+        exe = self.executor()
+        infos = [f.result() for f in [exe.submit(worker_info) for _ in range(self.workers)]]
+        by_pid = {pid: rss for pid, rss, _ in infos}
+        self.stats = PoolStats(len(by_pid), self.start_method, time.perf_counter() - started, list(by_pid.values()))
+        return self.stats
+
+    def lease(self, total: int = 0) -> Optional[ProgressChannel]:
+        with self._lock:
+            if not self._free:
+                return None
+            channel = self.slots[self._free.pop(0)]
+        channel.new_lease(total)
+        return channel
+
+    def release(self, channel: ProgressChannel) -> None:
+        slot = self.slot_of(channel)
+        with self._lock:
+            if slot is not None and slot not in self._free:
+                self._free.append(slot)
+
+    def slot_of(self, channel: ProgressChannel) -> Optional[int]:
+        return next((i for i, c in enumerate(self.slots) if c is channel), None)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool: Optional[WarmPool] = None
+_pool_lock = threading.Lock()
+
+
+def start(max_workers: Optional[int] = None) -> WarmPool:
+    """The shared pool, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WarmPool(max_workers)
+        return _pool
+
+
+def current() -> Optional[WarmPool]:
+    return _pool
+
+
+def progress_channel(total: int = 0) -> ProgressChannel:
+    """A progress channel the shared pool's workers can report into, when a slot is free."""
+    pool = _pool
+    channel = pool.lease(total) if pool is not None else None
+    return channel if channel is not None else ProgressChannel(total)
+
+
+def release_progress(channel: Optional[ProgressChannel]) -> None:
+    """Returns a channel from progress_channel() to the pool once its run has finished."""
+    if channel is not None and _pool is not None:
+        _pool.release(channel)
+
+
+def leased_executor(progress: Optional[ProgressChannel] = None) -> Optional[Executor]:
+    """The shared pool for one run reporting to `progress`, or None when it cannot serve it."""
+    pool = _pool
+    if pool is None:
+        return None
+    slot = None
+    if progress is not None:
+        slot = pool.slot_of(progress)
+        if slot is None:
+            return None
+    return LeasedExecutor(pool, slot)
+
+
+def shutdown() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None